@@ -35,6 +35,19 @@ except ImportError:
 
 # ----- Jarvis Modules Imports -------
 from jarvis_modules.file_handler import FileHandler
+from core.storage import CowDocument, JournalStore, UnitOfWork
+from core.config import get_config_service
+from core.sharded_store import ShardedStore
+from core.note_index import NoteIndex
+from core.conversation_log import ConversationLog
+from core.schedule_archive import ScheduleArchive
+from core.intent_router import Intent, IntentRouter
+from core.fuzzy_index import FuzzyIntentIndex
+from core.handler_registry import HandlerRegistry
+from core.utterance import normalize
+from core.name_matcher import NameMatcher, name_budget
+from core.tts_cache import get_tts_cache
+from core.speech_worker import SpeechJob, SpeechWorker
 #from jarvis_modules.performance_logger import PerformanceLogger
 #from jarvis_modules.module_bridge import ModuleBridge
 try: # Ai Summarizer Module 
@@ -162,9 +175,9 @@ script_dir = os.path.dirname(os.path.abspath(__file__))
 config_path = os.path.join(script_dir, "config.json")
 
 # ---- Config Loading -----
+CONFIG_SERVICE = get_config_service(config_path)  # Shared with jarvis_main; parsed once
 try:
-    with open(config_path, "r") as f:
-        config = json.load(f)
+    config = CONFIG_SERVICE.load()
 except FileNotFoundError:
     print(f"❌ config.json not found at {config_path}. Please create it and fill in your details.")
     exit()
@@ -180,6 +193,48 @@ WAKE_WORD = SETTINGS.get("wake_word", "jarvis")
 SLEEP_TIMEOUT = SETTINGS.get("sleep_timeout", 30)
 ACCESSIBILITY_MODE = SETTINGS.get("accessibility_mode", False)
 DATA_FILE = os.path.join(script_dir, "assistant_data.json")
+STORAGE_BACKEND = SETTINGS.get("storage_backend", "json")  # "json" or "sqlite"
+DATA_BACKEND = None
+if STORAGE_BACKEND == "sqlite":
+    from core.sqlite_store import SQLiteStore
+    DATA_BACKEND = SQLiteStore(os.path.join(script_dir, "assistant_data.db"))
+DATA_DIR = os.path.join(script_dir, "assistant_data")
+if SETTINGS.get("shard_data", True):
+    # One file per collection, loaded on first access; assistant_data.json is split on first run
+    DATA_STORE = ShardedStore(
+        DATA_DIR,
+        legacy_path=DATA_FILE,
+        compact_every=SETTINGS.get("journal_compact_every", 500),
+        collection_backend=DATA_BACKEND,
+        flush_delay=SETTINGS.get("data_flush_delay", 0.5),
+    )
+else:
+    DATA_STORE = JournalStore(
+        DATA_FILE,
+        compact_every=SETTINGS.get("journal_compact_every", 500),
+        collection_backend=DATA_BACKEND,
+        flush_delay=SETTINGS.get("data_flush_delay", 0.5),  # Seconds to coalesce saves (0 = write through)
+    )
+DATA_STORE.install_exit_handlers()
+# Data transactions: load_data()/save_data() inside one share a document, committed once at the end
+DATA_UOW = UnitOfWork(DATA_STORE, default=lambda: {"tasks": [], "reminders": [], "notes": []})
+CONVERSATION_LOG = ConversationLog(
+    os.path.join(script_dir, "conversation_log"),
+    segment_bytes=SETTINGS.get("conversation_segment_kb", 256) * 1024,
+    compress=SETTINGS.get("conversation_log_compress", True),
+    max_age_days=SETTINGS.get("conversation_retention_days", 90),
+    max_bytes=SETTINGS.get("conversation_retention_mb", 20) * 1024 * 1024,
+)
+SCHEDULE_ARCHIVE = ScheduleArchive(
+    os.path.join(script_dir, "schedule_archive"),
+    keep_days=SETTINGS.get("schedule_window_days", 7),  # Past days kept in the live document
+)
+NOTE_INDEX = NoteIndex(os.path.join(DATA_DIR if SETTINGS.get("shard_data", True) else script_dir, "notes.index"))
+# Synthesized phrases, shared with SpeechEngine (fixed lines replay instantly and offline)
+TTS_CACHE = get_tts_cache(
+    os.path.join(script_dir, "tts_cache"),
+    max_bytes=SETTINGS.get("tts_cache_mb", 64) * 1024 * 1024,
+) if SETTINGS.get("tts_cache", True) else None
 #MAILER = EmailManager(speak, API_KEYS, config)
 
 engine = pyttsx4.init()
@@ -546,7 +601,6 @@ def check_tts_engine():
 # The modular personality speak function
 _last_personality = "neutral"  # tone continuity
 import asyncio
-import tempfile
 def format_honorific(text):
     """Replace 'Sir' with user's preferred honorific in text."""
     honorific = get_honorific()
@@ -574,11 +628,20 @@ def update_personality_context(successful_interaction=True):
     else:
         profile["interaction_score"] = max(0, profile["interaction_score"] - 1)
     save_personality(profile)
-def speak(text, allow_interrupt=True):
+# Long-lived speech thread: one event loop and one audio device for every utterance
+SPEECH_WORKER = SpeechWorker(
+    "en-US-EricNeural",  # Human-Like-Resource
+    rate="+10%",
+    pitch="+0Hz",
+    cache=TTS_CACHE,
+    lookahead=SETTINGS.get("tts_lookahead", 2),
+)
+def speak(text, allow_interrupt=True, wait=True):
     """
     Enhanced speak with keyboard interrupt capability.
-    Press ESC key to stop speech (no threading needed).
     Checks mute flag between sentences for clean interruption.
+    Queued on the speech worker; returns a SpeechJob. With wait=False the
+    caller moves on at once (call .wait() on the last job before listening).
     """
     global _last_personality, is_muted
 
@@ -587,7 +650,7 @@ def speak(text, allow_interrupt=True):
     if is_muted:
         #print(f"[Muted] {text}")
         print(f"{Fore.RED}[MUTED]{Style.RESET_ALL} Jarvis: {text}")
-        return
+        return SpeechJob.completed(text)
 
     # Emotion detection
     emotion_map = {
@@ -620,60 +683,18 @@ def speak(text, allow_interrupt=True):
     print(f"Jarvis: {text}")
 
     if ACCESSIBILITY_MODE:
-        return
+        return SpeechJob.completed(text)
 
-    # === Try Edge-TTS ===
+    # === Edge-TTS on the speech worker (pyttsx4 runs in its place, in order, if it fails) ===
     if EDGE_TTS_AVAILABLE:
-        try:
-            voice_id = "en-US-EricNeural" # Human-Like-Resource
-            
-            async def edge_tts_speak():
-                tmp_path = tempfile.mktemp(suffix=".mp3")
-                communicate = edge_tts.Communicate(text, voice=voice_id, rate="+10%", pitch="+0Hz")
-                await communicate.save(tmp_path)
-                
-                # Play audio inline without external popup using pygame or playsound
-                try:
-                    # Try playsound first (already in your imports)
-                    import playsound
-                    playsound.playsound(tmp_path, block=True)
-                except:
-                    # Fallback to pygame if playsound fails
-                    try:
-                        import pygame
-                        pygame.mixer.init()
-                        pygame.mixer.music.load(tmp_path)
-                        pygame.mixer.music.play()
-                        while pygame.mixer.music.get_busy():
-                            # Check mute flag during playback
-                            if is_muted:
-                                pygame.mixer.music.stop()
-                                break
-                            pygame.time.Clock().tick(10)
-                    except:
-                        # Last resort: pydub
-                        try:
-                            from pydub import AudioSegment
-                            from pydub.playback import play
-                            audio = AudioSegment.from_mp3(tmp_path)
-                            play(audio)
-                        except:
-                            print("[Audio Playback Failed] Falling back to pyttsx4")
-                            raise Exception("All audio players failed")
-                
-                # Cleanup temp file immediately after playback
-                try:
-                    os.remove(tmp_path)
-                except:
-                    pass
-
-            asyncio.run(edge_tts_speak())
-            return
-
-        except Exception as e:
-            print(f"[Edge-TTS Error] Fallback to pyttsx4 – {e}")
+        return SPEECH_WORKER.say(
+            text, wait=wait, fallback=lambda: _speak_local(text, personality, allow_interrupt)
+        )
 
-    # === Fallback: pyttsx4 with sentence-level interrupts ===
+    _speak_local(text, personality, allow_interrupt)
+    return SpeechJob.completed(text)
+def _speak_local(text, personality, allow_interrupt=True):
+    """pyttsx4 with emotional modulation and sentence-level interrupts"""
     try:
         base_rate = SETTINGS.get("voice_rate", 170)
         base_volume = SETTINGS.get("voice_volume", 1.0)
@@ -817,6 +838,7 @@ def setup_mute_hotkey():
     def on_esc_press():
         global is_muted
         is_muted = True
+        SPEECH_WORKER.interrupt()
         try:
             engine.stop()
         except:
@@ -940,16 +962,25 @@ def get_honorific():
     """Returns the user's preferred honorific (Sir/Mam)."""
     return SETTINGS.get("honorific", "Sir")
 def load_data():
-    if not os.path.exists(DATA_FILE):
-        return {"tasks": [], "reminders": [], "notes": []}
-    try:
-        with open(DATA_FILE, "r") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        return {"tasks": [], "reminders": [], "notes": []}
+    """Cached document (shared with the running command's transaction, if any)."""
+    return DATA_UOW.load()
+def indexed_backend(collection, data=None):
+    """
+    DATA_BACKEND when `collection` can be answered by its indexed queries:
+    SQLite is on and `data` (default: load_data()) holds no copy of it
+    that may differ from the database (touched, e.g. inside a transaction).
+    """
+    if DATA_BACKEND is None:
+        return None
+    if data is None:
+        data = load_data()
+    if not isinstance(data, CowDocument) or collection in data.touched_keys():
+        return None
+    DATA_STORE.flush()
+    return DATA_BACKEND
 def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    """Commit now, or at the end of the running command's transaction."""
+    DATA_UOW.save(data)
 # --- Memory Context System ---
 def load_memory_context():
     data = load_data()
@@ -984,9 +1015,10 @@ def recall_topics():
     if not topics:
         speak("We haven't discussed any specific topics recently, Sir.")
         return
-    speak("Here are the main things we've talked about so far, Sir:")
+    job = speak("Here are the main things we've talked about so far, Sir:", wait=False)
     for t in topics[-5:]:
-        speak(f"— {t}")
+        job = speak(f"— {t}", wait=False)
+    job.wait()
 def track_last_discussion(query):
     update_memory_context("last_discussion", query)
     update_memory_context("last_active_time", datetime.datetime.now().isoformat())
@@ -1010,19 +1042,28 @@ def summarize_memory_snapshot():
         summary_parts.append(f"Today's focus is on {context['daily_focus']}")
     
     return ". ".join(summary_parts) if summary_parts else "All systems clear and routines are stable."
+_conversations_migrated = False
+def get_conversation_log():
+    """Rotating conversation log; moves any history still kept in the data file into it once."""
+    global _conversations_migrated
+    if not _conversations_migrated:
+        _conversations_migrated = True
+        with DATA_UOW.transaction():
+            data = load_data()
+            if "conversations" in data:
+                conversations = data.pop("conversations") or []
+                save_data(data)
+                # Only once the history is out of the data file, or a rollback duplicates it
+                DATA_UOW.after_commit(lambda: CONVERSATION_LOG.extend(conversations))
+    return CONVERSATION_LOG
 def recall_recent_conversations(days=1):
     """Recall interactions from the past N days."""
-    data = load_data()
-    conversations = data.get("conversations", [])
-    if not conversations:
+    log = get_conversation_log()
+    if not log.total_bytes:
         speak("I don’t have any recorded conversations yet, Sir.")
         return
     
-    cutoff = datetime.datetime.now() - datetime.timedelta(days=days)
-    recent = [
-        c for c in conversations
-        if datetime.datetime.fromisoformat(c["timestamp"]) >= cutoff
-    ]
+    recent = log.recent(days=days)
     
     if not recent:
         speak(f"I found no conversations from the past {days} day{'s' if days > 1 else ''}, Sir.")
@@ -1032,44 +1073,32 @@ def recall_recent_conversations(days=1):
     for c in recent[-5:]:
         speak(f"You said: {c['user']}. I replied: {c['jarvis']}")
 def store_conversation_entry(user_query, jarvis_response):
-    """Append conversation log into assistant_data.json under 'conversations'."""
-    data = load_data()
-    if "conversations" not in data:
-        data["conversations"] = []
-    
-    data["conversations"].append({
+    """Append the exchange to the rotating conversation log (retention by age/size)."""
+    get_conversation_log().append({
         "timestamp": datetime.datetime.now().isoformat(),
         "user": user_query,
         "jarvis": jarvis_response
     })
-    
-    # Keep memory manageable — trim older than 100 entries
-    if len(data["conversations"]) > 100:
-        data["conversations"] = data["conversations"][-100:]
-    
-    save_data(data)
 # --- Conversation Memory System ---
 
 # --- Config helper functions (keep unchanged) ---
+@CONFIG_SERVICE.subscribe
+def _apply_config(service):
+    """Rebind the module-level views after the config service reloads or writes."""
+    global config, SETTINGS, API_KEYS, CONTACTS, ACCESSIBILITY_MODE
+    config = service.load()
+    SETTINGS = config["settings"]
+    API_KEYS = config["api_keys"]
+    CONTACTS = config["contacts"]
+    ACCESSIBILITY_MODE = SETTINGS.get("accessibility_mode", ACCESSIBILITY_MODE)
 def save_config_file():
-    config["settings"] = SETTINGS
-    with open(config_path, "w") as f:
-        json.dump(config, f, indent=2)
+    CONFIG_SERVICE.load()["settings"] = SETTINGS
+    CONFIG_SERVICE.save()
 def reload_settings_live():
-    global SETTINGS, API_KEYS, CONTACTS, ACCESSIBILITY_MODE
-    try:
-        with open(config_path, "r") as f:
-            conf = json.load(f)
-        SETTINGS = conf.get("settings", {})
-        API_KEYS = conf.get("api_keys", {})
-        CONTACTS = conf.get("contacts", [])
-        ACCESSIBILITY_MODE = SETTINGS.get("accessibility_mode", ACCESSIBILITY_MODE)
-    except Exception as e:
-        print("Failed to reload config:", e)
+    """Pick up external edits to config.json (no-op if the file is unchanged)."""
+    CONFIG_SERVICE.reload_if_changed(force=True)
 def update_config_setting(key, value):
-    SETTINGS[key] = value
-    save_config_file()
-    reload_settings_live()
+    CONFIG_SERVICE.set_setting(key, value)
 
 # --- System monitoring integration (synchronous, no threads/subprocess) ---
 def system_status(network_sample_seconds: int = 1):
@@ -1266,11 +1295,11 @@ def handle_weather_query(user_input: str):
     and triggers get_weather_details accordingly.
     """
     city = None
-    lower = user_input.lower()
-    trigger_words = ["in", "at", "for"]
-    for word in trigger_words:
-        if word in lower:
-            city = lower.split(word, 1)[1].strip().title()
+    tokens = normalize(user_input).tokens
+    # City is everything after the first "in"/"at"/"for" word
+    for i, word in enumerate(tokens):
+        if word in ("in", "at", "for"):
+            city = " ".join(tokens[i + 1:]).title()
             break
     if not city or len(city) < 2:
         city = "Kolkata"
@@ -1841,10 +1870,29 @@ def greet_other():
         print("Intro audio file not found at:", greetother_path)
 
 # --- Contact Finding ----
+# N-gram matchers for spoken names; sync() re-vectorizes only what changed
+CONTACT_MATCHER = NameMatcher()
+HABIT_MATCHER = NameMatcher()
+SITE_MATCHER = NameMatcher()
+TASK_MATCHER = NameMatcher()
 def find_contact(name, detail_type="email"):
     for contact in CONTACTS:
         if contact["name"].lower() == name.lower():
             return contact.get(detail_type)
+    # Misheard names: nearest full or first name within a small edit budget
+    candidates, owners = {}, {}
+    for contact in CONTACTS:
+        full_name = contact.get("name", "")
+        candidates[full_name] = full_name
+        owners[full_name] = contact
+        first_name = full_name.split()[0] if full_name.split() else ""
+        if first_name and first_name != full_name:
+            candidates["first:" + full_name] = first_name
+            owners["first:" + full_name] = contact
+    CONTACT_MATCHER.sync(candidates)
+    best = CONTACT_MATCHER.best(name, max_distance=name_budget(name))
+    if best is not None:
+        return owners[best].get(detail_type)
     return None
 # --- Email Function ----
 def send_email(recipient_name, subject, body):
@@ -1887,14 +1935,8 @@ def send_email_notification(recipient_name, subject, body):
 
 # --- Whatsapp Function ----
 def load_contacts():
-    """Load contacts from config JSON file."""
-    try:
-        with open(config_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data.get("contacts", [])
-    except Exception as e:
-        print(f"[Error] Failed to load contacts: {e}")
-        return []
+    """Contacts from the config service (re-read only if config.json changed)."""
+    return CONFIG_SERVICE.contacts
 def list_contacts():
     """List all available contacts with index."""
     contacts = load_contacts()
@@ -1957,22 +1999,14 @@ def send_whatsapp_message(message_text=None):
             list_contacts()
         # Ask for ID input
         speak("Please tell me the contact ID number to send a message to, Sir.")
-        response = listen().lower() if listen else input("Enter contact ID: ").lower()
+        response = listen() if listen else input("Enter contact ID: ")
 
-        # Convert spoken words to numbers
-        word_to_num = {
-            "one": "1", "two": "2", "three": "3",
-            "four": "4", "five": "5", "six": "6",
-            "seven": "7", "eight": "8", "nine": "9", "zero": "0"
-        }
-        for word, num in word_to_num.items():
-            response = response.replace(word, num)
-
-        try:
-            contact_id = int("".join(ch for ch in response if ch.isdigit()))
-        except ValueError:
+        # Digits or spoken words ("three")
+        numbers = normalize(response).numbers
+        if not numbers:
             speak("I couldn't identify a valid contact ID, Sir.")
             return
+        contact_id = int(numbers[0])
 
         # Get the contact based on the ID
         if 1 <= contact_id <= len(CONTACTS):
@@ -2005,8 +2039,11 @@ def store_note(query):
         data = load_data()
         if "notes" not in data:
             data["notes"] = []
-        data["notes"].append({"note": note_text, "timestamp": datetime.datetime.now().isoformat()})
+        note = {"note": note_text, "timestamp": datetime.datetime.now().isoformat()}
+        data["notes"].append(note)
         save_data(data)
+        if DATA_BACKEND is None:        # SQLite keeps its own full-text table
+            DATA_UOW.after_commit(lambda: get_note_index().add(note))
         speak("Noted, Sir. Your information has been securely stored.")
     else:
         speak("Regrettably, I did not catch that, Sir. Please try again.")
@@ -2048,24 +2085,31 @@ def store_note_enhanced(content=None, category=None, title=None):
         data["notes"] = []
     data["notes"].append(note)
     save_data(data)
+    if DATA_BACKEND is None:        # SQLite keeps its own full-text table
+        DATA_UOW.after_commit(lambda: get_note_index().add(note))
     
     speak(f"Note saved under '{category or 'general'}' category, {honorific}.")
     return True
-def search_notes(query):
-    """Search notes by content, title, or category."""
+_note_index_checked = False
+def get_note_index():
+    """Full-text index of notes, rebuilt once per run if it drifted from the data."""
+    global _note_index_checked
+    if not _note_index_checked:
+        _note_index_checked = True
+        notes = load_data().get("notes", [])
+        if len(NOTE_INDEX) != len(notes):
+            NOTE_INDEX.rebuild(notes)
+            print(f"[Notes] Rebuilt search index ({len(notes)} notes)")
+    return NOTE_INDEX
+def search_notes(query, category=None):
+    """Search notes by content, title, or category (ranked, supports "phrases" and prefix*)."""
     honorific = get_honorific()
-    data = load_data()
-    notes = data.get("notes", [])
-    
-    query_lower = query.lower()
     
-    # Search in title, content, and category
-    matching_notes = [
-        n for n in notes
-        if query_lower in n.get("title", "").lower()
-        or query_lower in n.get("content", "").lower()
-        or query_lower in n.get("category", "").lower()
-    ]
+    backend = indexed_backend("notes")
+    if backend is not None:
+        matching_notes = backend.search_notes(query, category)
+    else:
+        matching_notes = get_note_index().search(query, category=category)
     
     if not matching_notes:
         speak(f"No notes found matching '{query}', {honorific}.")
@@ -2131,8 +2175,10 @@ def open_website(query):
         webbrowser.open(url)
         speak(f"{url} has been opened, Sir.")
         return
-    from difflib import get_close_matches
-    close = get_close_matches(target.lower(), KNOWN_SITES.keys(), n=1, cutoff=0.6)
+    SITE_MATCHER.sync({name: name for name in KNOWN_SITES})
+    # As lenient as the old difflib cutoff (0.6): "utube" still opens YouTube
+    best = SITE_MATCHER.closest(target.lower())
+    close = [best] if best is not None else []
     if close:
         url = KNOWN_SITES[close[0]]
         speak(f"Opening {close[0].capitalize()} for you now, Sir.")
@@ -2279,10 +2325,23 @@ def set_habits(habits):
     save_data(data)
 def normalize_name(name):
     return (name or "").strip()
-def find_habit(habits, habit_name):
-    for habit in habits:
+def find_habit(habits, habit_name, max_distance=0):
+    backend = indexed_backend("habits")
+    if backend is not None:
+        # Indexed name lookup; the position maps back into the caller's list
+        position = backend.habit_position(habit_name)
+        candidates = [habits[position]] if position is not None and position < len(habits) else []
+    else:
+        candidates = habits
+    for habit in candidates:
         if habit.get("name", "").lower() == habit_name.lower():
             return habit
+    if max_distance > 0 and habits:
+        # One matrix-vector product scores the name against every habit
+        HABIT_MATCHER.sync({h.get("name", "").lower(): h.get("name", "") for h in habits})
+        best = HABIT_MATCHER.best(habit_name, max_distance=max_distance)
+        if best is not None:
+            return next(h for h in habits if h.get("name", "").lower() == best)
     return None
 def add_habit(habit_name):
     habit_name = normalize_name(habit_name)
@@ -2303,15 +2362,15 @@ def add_habit(habit_name):
 def remove_habit(habit_name):
     habit_name = normalize_name(habit_name)
     habits = get_habits()
-    filtered = [h for h in habits if h.get("name", "").lower() != habit_name.lower()]
-    if len(filtered) == len(habits):
+    habit = find_habit(habits, habit_name, name_budget(habit_name))
+    if not habit:
         return f"Habit '{habit_name}' not found, Sir."
-    set_habits(filtered)
-    return f"Habit '{habit_name}' removed, Sir."
+    set_habits([h for h in habits if h is not habit])
+    return f"Habit '{habit['name']}' removed, Sir."
 def reset_habit(habit_name):
     habit_name = normalize_name(habit_name)
     habits = get_habits()
-    habit = find_habit(habits, habit_name)
+    habit = find_habit(habits, habit_name, name_budget(habit_name))
     if not habit:
         return f"Habit '{habit_name}' not found, Sir."
     habit["streak"] = 0
@@ -2321,7 +2380,7 @@ def reset_habit(habit_name):
 def mark_habit_done(habit_name):
     habit_name = normalize_name(habit_name)
     habits = get_habits()
-    habit = find_habit(habits, habit_name)
+    habit = find_habit(habits, habit_name, name_budget(habit_name))
     if not habit:
         return f"Habit '{habit_name}' not found, Sir."
     today = get_today_date()
@@ -2427,6 +2486,48 @@ def add_task(task_description, priority="medium", deadline=None, category=None):
     deadline_str = f" with deadline {deadline}" if deadline else ""
     speak(f"Task added with {priority} priority{deadline_str}, {honorific}.")
     return task
+def task_budget(description):
+    """Edits tolerated between a spoken and a stored task description (about a quarter of it)"""
+    return max(name_budget(description), len((description or "").strip()) // 4)
+def rank_tasks_by_description(tasks, description, limit=2, min_score=0.5, max_distance=None):
+    """
+    [(task, edit distance)] closest to a spoken description, best first.
+    The n-gram score shortlists candidates; they are re-ranked by bounded
+    edit distance and anything over max_distance (default task_budget) is dropped.
+    """
+    if not tasks or not description:
+        return []
+    if max_distance is None:
+        max_distance = task_budget(description)
+    keyed = {str(t.get("id") or t.get("description", "")): t for t in tasks}
+    TASK_MATCHER.sync({key: t.get("description", "") for key, t in keyed.items()})
+    found = TASK_MATCHER.search(description, limit=limit, min_score=min_score, max_distance=max_distance)
+    return [(keyed[key], distance) for key, _, distance in found]
+def find_task_by_description(tasks, description, min_score=0.5, max_distance=None):
+    """Task whose description is closest to a spoken one, or None"""
+    ranked = rank_tasks_by_description(tasks, description, 1, min_score, max_distance)
+    return ranked[0][0] if ranked else None
+def confirm_task_match(tasks, description, action):
+    """
+    Closest task for a destructive action (complete/delete): None when
+    nothing is close, False when the user declined. An exact, unambiguous
+    match is taken as is; anything else is read back for a yes first.
+    """
+    ranked = rank_tasks_by_description(tasks, description)
+    if not ranked:
+        return None
+    task, distance = ranked[0]
+    runner_up = ranked[1][1] if len(ranked) > 1 else None
+    # Close to the runner-up: within one edit of it
+    if distance == 0 and (runner_up is None or runner_up > 1):
+        return task
+    honorific = get_honorific()
+    speak(f"Did you mean the task '{task.get('description', '')}'? Should I {action} it, {honorific}?")
+    consent = (listen() or "").lower()
+    if "yes" in consent or "sure" in consent or "okay" in consent:
+        return task
+    speak(f"Understood, {honorific}. I'll leave your tasks as they are.")
+    return False
 def mark_task_complete(task_id_or_description):
     """Mark a task as complete by ID or description match."""
     honorific = get_honorific()
@@ -2439,6 +2540,10 @@ def mark_task_complete(task_id_or_description):
     if not task:
         task_id_or_description_lower = task_id_or_description.lower()
         task = next((t for t in tasks if task_id_or_description_lower in t.get("description", "").lower()), None)
+    if not task:
+        task = confirm_task_match(tasks, task_id_or_description, "complete")
+        if task is False:
+            return False
     
     if not task:
         speak(f"Task not found, {honorific}.")
@@ -2463,43 +2568,54 @@ def list_tasks(filter_type="active", priority=None):
         priority: Filter by priority level or None for all
     """
     honorific = get_honorific()
-    tasks = get_tasks()
     
-    # Apply filters
-    if filter_type == "active":
-        tasks = [t for t in tasks if not t.get("completed")]
-    elif filter_type == "completed":
-        tasks = [t for t in tasks if t.get("completed")]
-    
-    if priority:
-        tasks = [t for t in tasks if t.get("priority") == priority.lower()]
+    backend = indexed_backend("tasks")
+    if backend is not None:
+        # Filtered and sorted by the indexed query
+        tasks = backend.query_tasks(filter_type, priority.lower() if priority else None)
+    else:
+        tasks = get_tasks()
+        
+        # Apply filters
+        if filter_type == "active":
+            tasks = [t for t in tasks if not t.get("completed")]
+        elif filter_type == "completed":
+            tasks = [t for t in tasks if t.get("completed")]
+        
+        if priority:
+            tasks = [t for t in tasks if t.get("priority") == priority.lower()]
+        
+        # Sort by priority (high > medium > low) and deadline
+        priority_order = {"high": 0, "medium": 1, "low": 2}
+        tasks.sort(key=lambda t: (
+            priority_order.get(t.get("priority", "medium"), 1),
+            t.get("deadline") or "9999-12-31"
+        ))
     
     if not tasks:
         speak(f"No tasks found with those filters, {honorific}.")
         return []
     
-    # Sort by priority (high > medium > low) and deadline
-    priority_order = {"high": 0, "medium": 1, "low": 2}
-    tasks.sort(key=lambda t: (
-        priority_order.get(t.get("priority", "medium"), 1),
-        t.get("deadline") or "9999-12-31"
-    ))
-    
-    speak(f"You have {len(tasks)} task{'s' if len(tasks) != 1 else ''}, {honorific}:")
+    # Lines are queued back to back; wait once for the last one
+    job = speak(f"You have {len(tasks)} task{'s' if len(tasks) != 1 else ''}, {honorific}:", wait=False)
     
     for idx, task in enumerate(tasks, 1):
         priority_emoji = {"high": "🔴", "medium": "🟡", "low": "🟢"}.get(task.get("priority", "medium"), "⚪")
         deadline_str = f" (due {task.get('deadline')})" if task.get("deadline") else ""
         
         print(f"{idx}. {priority_emoji} {task['description']}{deadline_str}")
-        speak(f"Task {idx}: {task['description']}")
+        job = speak(f"Task {idx}: {task['description']}", wait=False)
     
+    job.wait()
     return tasks
 def get_overdue_tasks():
     """Get tasks that are past their deadline."""
-    tasks = get_tasks()
     today = datetime.datetime.now().date().isoformat()
+    backend = indexed_backend("tasks")
+    if backend is not None:
+        return backend.overdue_tasks(today)
     
+    tasks = get_tasks()
     overdue = [
         t for t in tasks 
         if not t.get("completed") 
@@ -2522,6 +2638,14 @@ def delete_task(task_id_or_description):
         task_id_or_description_lower = task_id_or_description.lower()
         tasks = [t for t in tasks if task_id_or_description_lower not in t.get("description", "").lower()]
     
+    # Still nothing: closest description (reworded or misheard), confirmed first
+    if len(tasks) == original_len:
+        task = confirm_task_match(tasks, task_id_or_description, "delete")
+        if task is False:
+            return False
+        if task is not None:
+            tasks = [t for t in tasks if t is not task]
+    
     if len(tasks) == original_len:
         speak(f"Task not found, {honorific}.")
         return False
@@ -2531,6 +2655,29 @@ def delete_task(task_id_or_description):
     return True
 
 # --- Schedule ---
+def get_schedule_day(date_key, data=None):
+    """Schedule entry for an ISO date; archived days are read back transparently."""
+    if data is None:
+        data = load_data()
+    backend = indexed_backend("schedule", data)
+    if backend is not None:
+        day = backend.schedule_day(date_key)
+        return day if day is not None else SCHEDULE_ARCHIVE.lookup({}, date_key)
+    return SCHEDULE_ARCHIVE.lookup(data.get("schedule", {}), date_key)
+def put_schedule_day(data, date_key, day):
+    """Store a day in the live schedule (an archived day moves back until the next archive run)."""
+    data.setdefault("schedule", {})[date_key] = day
+def archive_old_schedule():
+    """Move past days outside the live window into the monthly schedule archives."""
+    data = load_data()
+    schedule = data.get("schedule")
+    if not schedule:
+        return 0
+    moved = SCHEDULE_ARCHIVE.compact(schedule)
+    if moved:
+        save_data(data)
+        print(f"[Schedule] Archived {moved} past day{'s' if moved != 1 else ''}")
+    return moved
 def get_schedule_date_key(date_offset=0):
     """
     Get date key for schedule (today, yesterday, tomorrow).
@@ -2699,22 +2846,23 @@ def review_today_schedule():
     date_key, day_name = get_schedule_date_key(0)
     
     data = load_data()
-    schedule = data.get("schedule", {})
+    day = get_schedule_day(date_key, data)
     
-    if date_key not in schedule or not schedule[date_key].get("plans"):
+    if not day or not day.get("plans"):
         speak(f"You have no plans scheduled for today, {honorific}.")
         return
     
-    plans = schedule[date_key]["plans"]
+    plans = day["plans"]
     speak(f"Here are your plans for {day_name}, {honorific}:")
     
     for idx, plan in enumerate(plans, 1):
         speak(f"{idx}. {plan}")
     
-    # Mark as reviewed
-    schedule[date_key]["reviewed"] = True
-    data["schedule"] = schedule
-    save_data(data)
+    # Mark as reviewed (only the first time: writing loads the whole schedule)
+    if not day.get("reviewed"):
+        day["reviewed"] = True
+        put_schedule_day(data, date_key, day)
+        save_data(data)
 def review_schedule(date_offset=0):
     """
     Generic review function for any day.
@@ -2724,7 +2872,7 @@ def review_schedule(date_offset=0):
     date_key, day_name = get_schedule_date_key(date_offset)
     
     data = load_data()
-    schedule = data.get("schedule", {})
+    day = get_schedule_day(date_key, data)
     
     if date_offset == -1:
         day_ref = "yesterday"
@@ -2733,20 +2881,21 @@ def review_schedule(date_offset=0):
     else:
         day_ref = "today"
     
-    if date_key not in schedule or not schedule[date_key].get("plans"):
+    if not day or not day.get("plans"):
         speak(f"You have no plans scheduled for {day_ref}, {honorific}.")
         return
     
-    plans = schedule[date_key]["plans"]
+    plans = day["plans"]
     speak(f"Here are your plans for {day_ref} ({day_name}), {honorific}:")
     
     for idx, plan in enumerate(plans, 1):
         speak(f"{idx}. {plan}")
     
-    # Mark as reviewed
-    schedule[date_key]["reviewed"] = True
-    data["schedule"] = schedule
-    save_data(data)
+    # Mark as reviewed (only the first time: writing loads the whole schedule)
+    if not day.get("reviewed"):
+        day["reviewed"] = True
+        put_schedule_day(data, date_key, day)
+        save_data(data)
 def modify_schedule(date_offset=0):
     """
     Modify existing schedule - add, remove, or replace items.
@@ -2754,8 +2903,7 @@ def modify_schedule(date_offset=0):
     honorific = get_honorific()
     date_key, day_name = get_schedule_date_key(date_offset)
     
-    data = load_data()
-    schedule = data.get("schedule", {})
+    day = get_schedule_day(date_key)
     
     if date_offset == 1:
         day_ref = "tomorrow"
@@ -2764,7 +2912,7 @@ def modify_schedule(date_offset=0):
     else:
         day_ref = "today"
     
-    if date_key not in schedule or not schedule[date_key].get("plans"):
+    if not day or not day.get("plans"):
         speak(f"You have no plans for {day_ref} yet, {honorific}. Would you like to create some?")
         response = listen()
         if response and any(word in response.lower() for word in ["yes", "sure", "okay"]):
@@ -2772,7 +2920,7 @@ def modify_schedule(date_offset=0):
         return
     
     # Show current plans
-    plans = schedule[date_key]["plans"]
+    plans = day["plans"]
     speak(f"Current plans for {day_ref}:")
     for idx, plan in enumerate(plans, 1):
         speak(f"{idx}. {plan}")
@@ -2796,9 +2944,7 @@ def modify_schedule(date_offset=0):
         speak("Which item number would you like to remove?")
         num_response = listen()
         
-        # Extract number
-        import re
-        numbers = re.findall(r'\d+', num_response)
+        numbers = normalize(num_response).numbers
         if numbers:
             item_num = int(numbers[0])
             if 1 <= item_num <= len(plans):
@@ -2813,8 +2959,7 @@ def modify_schedule(date_offset=0):
         speak("Which item number would you like to replace?")
         num_response = listen()
         
-        import re
-        numbers = re.findall(r'\d+', num_response)
+        numbers = normalize(num_response).numbers
         if numbers:
             item_num = int(numbers[0])
             if 1 <= item_num <= len(plans):
@@ -2832,9 +2977,11 @@ def modify_schedule(date_offset=0):
         speak(f"I didn't understand that action, {honorific}.")
         return
     
-    # Save changes
-    schedule[date_key]["plans"] = plans
-    data["schedule"] = schedule
+    # Save changes (reloaded: the prompts above can take a while)
+    data = load_data()
+    day = get_schedule_day(date_key, data) or day
+    day["plans"] = plans
+    put_schedule_day(data, date_key, day)
     save_data(data)
     
     speak("Schedule updated successfully.")
@@ -2865,11 +3012,10 @@ def should_ask_schedule_today():
     
     # Check if schedule exists for today
     date_key, _ = get_schedule_date_key(0)
-    data = load_data()
-    schedule = data.get("schedule", {})
+    day = get_schedule_day(date_key)
     
     # If schedule exists and has plans, don't ask
-    if date_key in schedule and schedule[date_key].get("plans"):
+    if day and day.get("plans"):
         return False
     
     return True
@@ -3222,503 +3368,594 @@ file_handler = FileHandler(speak, listen)
 #perf_logger = PerformanceLogger(log_dir="logs")
 #module_bridge = ModuleBridge(speak, perf_logger)
 # --- Model Tasks ----
-def process_command(query, chat_history, ai_model):
-    
-    # Get honorific at the START of function (not from main_loop)
+# --- Command handlers ---
+# One function per intent; COMMAND_ROUTER below maps trigger phrases to them.
+def _cmd_hello(query):
     honorific = get_honorific()
-    user_name = get_user_name()
 
-    # Greet or remind contextually
-    context_summary = summarize_memory_snapshot()
-    if context_summary and random.random() < 0.23:  # 25% chance each run
-        speak(f"May I remind you {honorific} that, {context_summary}.")
-
-    query = query.lower()
-    
-    
-    # --- Greeting detection ---
-    if "hello" in query:
-        honorific = get_honorific()
-        user_name = get_user_name()
-    
-        # Base custom phrase
-        speak(f"Oh hello,{honorific}!")
-    
-        # Add a random follow-up variation for "How's everything?"
-        followups = [
-            "How’s everything going today?",
-            "How are things on your end?",
-            "Everything running smoothly, I hope?",
-            "How have you been keeping lately?",
-            "How’s your day treating you so far?",
-            "Hope you’re doing well, Sir.",
-            "All systems good on your side, I presume?",
-            "Everything holding up well, I trust?",
-        ]
-        speak(random.choice(followups))
-        return chat_history, ai_model
-    if any(greet in query for greet in [
-        "hi", "hey", "good morning", "good afternoon", "good evening",
-        "yo", "greetings", "what's up", "how are you"
-    ]):
-        smart_greet_response(trigger_manual=True)
-        return chat_history, ai_model
-    # Muted Functionality
-    if any(word in query for word in ["mute", "stop talking", "be quiet", "shut up", "silence"]):
-        is_muted = True
-        # Stop pyttsx4 immediately
-        try:
-            engine.stop()
-        except:
-            pass
-        print("[Muted] Speech stopped")
-        # Brief pause, then auto-unmute
-        time.sleep(0.5)
-        is_muted = False
-        speak("Understood, Sir.", allow_interrupt=False)
-        return chat_history, ai_model
-    if any(word in query for word in ["unmute", "speak again", "you can talk", "resume"]):
-        is_muted = False
-        speak("Audio restored, Sir.", allow_interrupt=False)
-        return chat_history, ai_model
-    # -- Main commands ---
-    if "system status" in query or "system monitor" in query or "system health" in query:
-        speak("Got it, gathering system status report, Sir.")
-        system_status()
-    elif "test microphone" in query or "check mic" in query or "voice test" in query:
-        test_microphone()
-        return chat_history, ai_model
-    elif "cheatsheet" in query or "commands list" in query or "list of commands" in query or "commands help" in query:
-        speak("Here is the list of available system commands, Sir:")
-        command_help()
-    elif "check your version" in query or "tell me the version" in query or "check the version" in query:
-        speak("As your wish Sir, checking the version")
-        get_jarvis_version()
-    elif "backup jarvis" in query or "create backup" in query:
-        from jarvis_modules.backup_util import create_jarvis_backup
-        try:
-            speak("As your wish, Sir. I'll make the backup for you")
-            create_jarvis_backup()
-            time.sleep(0.2)
-            speak("Sir, I have sucessfuly backed up your desired files with timestamps for your ease!")
-        except Exception:
-            speak("Apologies, sir. I was unable to backup your desired files for you")
-    elif "initiate terminal operation" in query or "start terminal mode" in query or "launch terminal operator" in query:
-        init_terminal_operator()
-        try:
-            speak("Preparing terminal operations mode, Sir.")
-            if terminal_operator:
-                speak("Terminal operations mode is now active, Sir. You can issue commands.")
-                terminal_operator.interactive_mode()
-            else:
-                speak("Terminal operations are not available, Sir.")
-        except Exception as e:
-            speak(f"An error occurred while starting terminal operations, Sir. Reason: {e}")
-    elif "who are you" in query or "what are you" in query or "introduce yourself" in query:
-        if not ACCESSIBILITY_MODE:
-            play_intro_audio()
-        if ACCESSIBILITY_MODE:
-            speak("Allow me to introduce myself, I am JARVIS. Virtual Assistant, I am here to assist you with a variety of tasks, twentifour hours a day , seven days a week, your wish is my coomand, Sir.")
-    elif "greet someone" in query or "greet other" in query or "introduce to someone" in query:
-        if not ACCESSIBILITY_MODE:
-            greet_other()
-        if ACCESSIBILITY_MODE:
-            speak("I am JARVIS. Its my pleasure to meet you, Sir.")
-    # -- Core Commands --
-    elif "time" in query:
-        speak(f"The current time is {datetime.datetime.now().strftime('%I:%M %p')}, Sir.")
-    elif "date" in query:
-        speak(f"Today is {datetime.datetime.now().strftime('%A, %B %d, %Y')}, Sir.")
-    elif "weather" in query or "temperature" in query:
-        handle_weather_query(query)
-        return ("Weather handled.", chat_history)
-    elif "search wikipedia" in query:
-        match = re.search(r"search wikipedia(?: for)? (.+)", query)
-        topic = match.group(1) if match else query.replace("wikipedia", "").strip()
-        try:
-            speak("Accessing Wikipedia now, Sir...")
-            speak("Here is what Wikipedia has to say, Sir:")
-            speak(wikipedia.summary(topic, sentences=2))
-        except wikipedia.exceptions.PageError:
-            speak(f"Sadly, I could not find any information for '{topic}', Sir.")
-        except Exception as e:
-            speak(f"An error occurred during the Wikipedia search, Sir. Reason: {e}")
-    elif "play on youtube" in query:
-        play_youtube_video(query)
-    elif "play song on spotify"  in query:
-        match = re.search(r"play (?:song|music)?(?: on spotify)?(?: called| named)?\s*(.*)", query)
-        song_name = match.group(1).strip() if match and match.group(1) else None
-        play_spotify_desktop(song_name)
-    elif "open" in query or (query.startswith("open ") and len(query.split()) > 1):
-        open_website(query)
-    elif "google" in query or "search" in query:
-        trigger_phrases = ["google", "search for", "search on google for", "look up"]
-        search_query = query
-        for phrase in trigger_phrases:
-            search_query = search_query.replace(phrase, "", 1).strip()
-        if search_query:
-            speak(f"Searching Google for '{search_query}', Sir.")
-            webbrowser.open(f"https://www.google.com/search?q={search_query}")
+    # Base custom phrase
+    speak(f"Oh hello,{honorific}!")
+
+    # Add a random follow-up variation for "How's everything?"
+    followups = [
+        "How’s everything going today?",
+        "How are things on your end?",
+        "Everything running smoothly, I hope?",
+        "How have you been keeping lately?",
+        "How’s your day treating you so far?",
+        "Hope you’re doing well, Sir.",
+        "All systems good on your side, I presume?",
+        "Everything holding up well, I trust?",
+    ]
+    speak(random.choice(followups))
+def _cmd_greeting(query):
+    smart_greet_response(trigger_manual=True)
+def _cmd_mute(query):
+    global is_muted
+    is_muted = True
+    SPEECH_WORKER.interrupt()
+    # Stop pyttsx4 immediately
+    try:
+        engine.stop()
+    except:
+        pass
+    print("[Muted] Speech stopped")
+    # Brief pause, then auto-unmute
+    time.sleep(0.5)
+    is_muted = False
+    speak("Understood, Sir.", allow_interrupt=False)
+def _cmd_unmute(query):
+    global is_muted
+    is_muted = False
+    speak("Audio restored, Sir.", allow_interrupt=False)
+def _cmd_system_status(query):
+    speak("Got it, gathering system status report, Sir.")
+    system_status()
+def _cmd_test_microphone(query):
+    test_microphone()
+def _cmd_command_help(query):
+    speak("Here is the list of available system commands, Sir:")
+    command_help()
+def _cmd_version(query):
+    speak("As your wish Sir, checking the version")
+    get_jarvis_version()
+def _cmd_backup_jarvis(query):
+    from jarvis_modules.backup_util import create_jarvis_backup
+    try:
+        speak("As your wish, Sir. I'll make the backup for you")
+        create_jarvis_backup()
+        time.sleep(0.2)
+        speak("Sir, I have sucessfuly backed up your desired files with timestamps for your ease!")
+    except Exception:
+        speak("Apologies, sir. I was unable to backup your desired files for you")
+def _cmd_terminal_mode(query):
+    init_terminal_operator()
+    try:
+        speak("Preparing terminal operations mode, Sir.")
+        if terminal_operator:
+            speak("Terminal operations mode is now active, Sir. You can issue commands.")
+            terminal_operator.interactive_mode()
         else:
-            speak("Would you like me to search for something specific on Google, Sir?")
-            consent = listen().lower()
-            if "yes" in consent or "sure" in consent or "ok" in consent:
-                speak("What is your query, Sir?")
-                follow_up_query = listen().lower()
-                if follow_up_query and "none" not in follow_up_query:
-                    speak(f"Searching Google for '{follow_up_query}', Sir.")
-                    webbrowser.open(f"https://www.google.com/search?q={follow_up_query}")
-                else:
-                    speak("I did not catch that, Sir. Returning to standby.")
-            else:
-                speak("Very well, Sir. Standing by.")
-    # "Still working on it {test feature}"
-    elif "test email" in query or "send test email" in query:
-            speak("Sending test email notification.")
-            result = send_email_notification(
-                "Test Email from Jarvis",
-                "This is a test email to verify email notifications are working correctly."
-            )
-            if result.get("status") == "success":
-                speak(f"{honorific}, the test email was sent successfully.")
+            speak("Terminal operations are not available, Sir.")
+    except Exception as e:
+        speak(f"An error occurred while starting terminal operations, Sir. Reason: {e}")
+def _cmd_introduce(query):
+    if not ACCESSIBILITY_MODE:
+        play_intro_audio()
+    if ACCESSIBILITY_MODE:
+        speak("Allow me to introduce myself, I am JARVIS. Virtual Assistant, I am here to assist you with a variety of tasks, twentifour hours a day , seven days a week, your wish is my coomand, Sir.")
+def _cmd_greet_other(query):
+    if not ACCESSIBILITY_MODE:
+        greet_other()
+    if ACCESSIBILITY_MODE:
+        speak("I am JARVIS. Its my pleasure to meet you, Sir.")
+def _cmd_time(query):
+    speak(f"The current time is {datetime.datetime.now().strftime('%I:%M %p')}, Sir.")
+def _cmd_date(query):
+    speak(f"Today is {datetime.datetime.now().strftime('%A, %B %d, %Y')}, Sir.")
+def _cmd_weather(query):
+    handle_weather_query(query)
+def _cmd_wikipedia(query, topic=None):
+    topic = topic or query.replace("wikipedia", "").strip()
+    try:
+        speak("Accessing Wikipedia now, Sir...")
+        speak("Here is what Wikipedia has to say, Sir:")
+        speak(wikipedia.summary(topic, sentences=2))
+    except wikipedia.exceptions.PageError:
+        speak(f"Sadly, I could not find any information for '{topic}', Sir.")
+    except Exception as e:
+        speak(f"An error occurred during the Wikipedia search, Sir. Reason: {e}")
+def _cmd_youtube(query):
+    play_youtube_video(query)
+def _cmd_spotify(query, song_name=None):
+    song_name = song_name.strip() if song_name else None
+    play_spotify_desktop(song_name)
+def _cmd_open_website(query):
+    open_website(query)
+def _cmd_google_search(query):
+    trigger_phrases = ["google", "search for", "search on google for", "look up"]
+    search_query = query
+    for phrase in trigger_phrases:
+        search_query = search_query.replace(phrase, "", 1).strip()
+    if search_query:
+        speak(f"Searching Google for '{search_query}', Sir.")
+        webbrowser.open(f"https://www.google.com/search?q={search_query}")
+    else:
+        speak("Would you like me to search for something specific on Google, Sir?")
+        consent = listen().lower()
+        if "yes" in consent or "sure" in consent or "ok" in consent:
+            speak("What is your query, Sir?")
+            follow_up_query = listen().lower()
+            if follow_up_query and "none" not in follow_up_query:
+                speak(f"Searching Google for '{follow_up_query}', Sir.")
+                webbrowser.open(f"https://www.google.com/search?q={follow_up_query}")
             else:
-                speak(f"Test email failed: {result.get('message')}")
-            return
-    elif "send email" in query or " send mail" in query:
-        match = re.search(r"email  (\w+)", query)
-        recipient_name = match.group(1) if match else None
-        if not recipient_name:
-            speak(f"Who is the intended recipient,{honorific}?")
-            recipient_name = listen()
-        speak(f"Please specify the subject of the email to {recipient_name},{honorific}.")
-        subject = listen()
-        speak(f"Kindly dictate the message,{honorific}.")
-        body = listen()
-        if subject and body:
-            send_email(recipient_name, subject, body)
+                speak("I did not catch that, Sir. Returning to standby.")
         else:
-            speak(f"Incomplete email details detected, {honorific}. Please try again.")
-    elif "compose email" in query or "write an email" in query or "auto mail" in query:
-        MAILER = EmailManager(speak, API_KEYS, config)
-        speak("To whom shall I send it, Sir?")
-        recipient = listen()
-        speak("What is the topic, Sir?")
-        topic = listen()
-        result = MAILER.compose_and_send_email(recipient, topic)
-        speak(result)
-    elif "send message" in query:
-        # Try to match "send whatsapp message to <name>"
-        match = re.search(r"send\s+(?:whatsapp\s+)?message\s+to\s+(.+)", query, re.IGNORECASE)
-        recipient_part = match.group(1).strip() if match else None
-
-        # If user explicitly said recipient name or "contact <id>"
-        if recipient_part:
-            # Handle case: "contact <number>"
-            if recipient_part.lower().startswith("contact"):
-                speak(f"Preparing to identify contact {recipient_part}, {honorific}.")
-                try:
-                    number_map = {
-                        "one": "1", "two": "2", "three": "3", "four": "4",
-                        "five": "5", "six": "6", "seven": "7", "eight": "8", "nine": "9", "zero": "0", "ten":"10","eleven":"11","twelve":"12"
-                    }
-                    for word, num in number_map.items():
-                        recipient_part = recipient_part.replace(word, num)
-
-                    contact_id = int("".join(ch for ch in recipient_part if ch.isdigit()))
-
-                    if 1 <= contact_id <= len(CONTACTS):
-                        contact = CONTACTS[contact_id - 1]
-                        recipient_name = contact["name"]
-                    else:
-                        speak(f"That contact ID doesn't exist, {honorific}.")
-                        return
-                except ValueError:
-                    speak(f"I couldn't identify that contact number, {honorific}.")
-                    return
+            speak("Very well, Sir. Standing by.")
+def _cmd_test_email(query):
+    honorific = get_honorific()
+    speak("Sending test email notification.")
+    result = send_email_notification(
+        "Test Email from Jarvis",
+        "This is a test email to verify email notifications are working correctly."
+    )
+    if result.get("status") == "success":
+        speak(f"{honorific}, the test email was sent successfully.")
+    else:
+        speak(f"Test email failed: {result.get('message')}")
+def _cmd_send_email(query):
+    honorific = get_honorific()
+    match = re.search(r"email  (\w+)", query)
+    recipient_name = match.group(1) if match else None
+    if not recipient_name:
+        speak(f"Who is the intended recipient,{honorific}?")
+        recipient_name = listen()
+    speak(f"Please specify the subject of the email to {recipient_name},{honorific}.")
+    subject = listen()
+    speak(f"Kindly dictate the message,{honorific}.")
+    body = listen()
+    if subject and body:
+        send_email(recipient_name, subject, body)
+    else:
+        speak(f"Incomplete email details detected, {honorific}. Please try again.")
+def _cmd_compose_email(query):
+    MAILER = EmailManager(speak, API_KEYS, config)
+    speak("To whom shall I send it, Sir?")
+    recipient = listen()
+    speak("What is the topic, Sir?")
+    topic = listen()
+    result = MAILER.compose_and_send_email(recipient, topic)
+    speak(result)
+def _cmd_send_message(query, recipient_part=None):
+    global LAST_CONTACT
+    honorific = get_honorific()
+    # Recipient from "send whatsapp message to <name>" (parsed by the router)
+    recipient_part = recipient_part.strip() if recipient_part else None
+
+    # If user explicitly said recipient name or "contact <id>"
+    if recipient_part:
+        # Handle case: "contact <number>"
+        if recipient_part.lower().startswith("contact"):
+            speak(f"Preparing to identify contact {recipient_part}, {honorific}.")
+            # Extracted once with the utterance: digits or spoken words ("contact three")
+            if not query.numbers:
+                speak(f"I couldn't identify that contact number, {honorific}.")
+                return
+            contact_id = int(query.numbers[0])
+
+            if 1 <= contact_id <= len(CONTACTS):
+                contact = CONTACTS[contact_id - 1]
+                recipient_name = contact["name"]
             else:
-                recipient_name = recipient_part
+                speak(f"That contact ID doesn't exist, {honorific}.")
+                return
+        else:
+            recipient_name = recipient_part
 
-            # Ask for the message content
-            speak(f"What message would you like me to deliver to {recipient_name}, {honorific}?")
-            message_text = listen()
+        # Ask for the message content
+        speak(f"What message would you like me to deliver to {recipient_name}, {honorific}?")
+        message_text = listen()
 
-            # Send message
-            if recipient_name and message_text:
-                send_whatsapp_desktop_message(recipient_name, message_text)
-                LAST_CONTACT = recipient_name
-            else:
-                speak(f"Insufficient details for the message, {honorific}. Please try again.")
+        # Send message
+        if recipient_name and message_text:
+            send_whatsapp_desktop_message(recipient_name, message_text)
+            LAST_CONTACT = recipient_name
+        else:
+            speak(f"Insufficient details for the message, {honorific}. Please try again.")
 
-        # If no name or number was given — fall back to interactive mode
+    # If no name or number was given — fall back to interactive mode
+    else:
+        send_whatsapp_message()
+def _cmd_send_another_message(query):
+    honorific = get_honorific()
+    if LAST_CONTACT:
+        speak(f"What would you like to say to {LAST_CONTACT}, {honorific}?")
+        message_text = listen()
+        if message_text:
+            send_whatsapp_desktop_message(LAST_CONTACT, message_text)
         else:
-            send_whatsapp_message()
-    elif "send another message" in query or "send another whatsapp message" in query:
-        if LAST_CONTACT:
-            speak(f"What would you like to say to {LAST_CONTACT}, {honorific}?")
-            message_text = listen()
-            if message_text:
-                send_whatsapp_desktop_message(LAST_CONTACT, message_text)
+            speak(f"No message detected, {honorific}.")
+    else:
+        speak(f"You have not sent any messages recently, {honorific}.")
+        send_whatsapp_message()  # fallback to full contact list
+def _cmd_take_note(query):
+    store_note(query)
+def _cmd_news(query):
+    get_news_headlines(SETTINGS.get("WEATHER_LOCATION"))
+def _cmd_add_habit(query):
+    habit_name = query.replace("add habit", "").strip()
+    speak(add_habit(habit_name))
+def _cmd_remove_habit(query):
+    habit_name = re.sub(r"^(remove|delete) habit", "", query).strip()
+    speak(remove_habit(habit_name))
+def _cmd_reset_habit(query):
+    habit_name = query.replace("reset habit", "").strip()
+    speak(reset_habit(habit_name))
+def _cmd_mark_habit(query):
+    habit_name = re.sub(r"^(mark|done|complete) habit", "", query).strip()
+    speak(mark_habit_done(habit_name))
+def _cmd_list_habits(query):
+    speak(list_habits())
+def _cmd_pending_habits(query):
+    speak(list_pending_today())
+def _cmd_app_command(query):
+    honorific = get_honorific()
+    handled = process_app_command(query, app_manager_instance, speak)
+    if handled:
+        return
+    else :
+        speak(f"Sorry,{honorific}.I faced some issues when trying to open the desired app")
+def _cmd_close_active_window(query):
+    if app_manager_instance:
+        app_manager_instance.close_active_window()
+    else:
+        active_appcloser(speak)
+def _cmd_self_repair(query):
+    honorific = get_honorific()
+    speak(f"As you wish, {honorific}. Initiating the self-repair protocol.")
+    try:
+        from jarvis_modules.self_repair import self_repair
+
+        result = self_repair(
+            reason="User-initiated diagnostic and repair",
+            details="Manual execution via voice command",
+            speak=speak,
+            input_getter=listen
+        )
+        # Handle result
+        if result['user_declined']:
+            speak(f"Repair sequence cancelled as per your instructions, {honorific}.")
+        elif result['success']:
+            if result['backup_created']:
+                speak(f"Self-repair completed successfully with backup safety net in place, {honorific}.")
             else:
-                speak(f"No message detected, {honorific}.")
+                speak(f"Self-repair completed successfully. All systems nominal, {honorific}.")
         else:
-            speak(f"You have not sent any messages recently, {honorific}.")
-            send_whatsapp_message()  # fallback to full contact list
-    elif "take a note" in query or "note down" in query or "store this information" in query:
-        store_note(query)
-    
-    elif "read the news" in query or "tell me the news" in query or "latest news" in query:
-        get_news_headlines(SETTINGS.get("WEATHER_LOCATION"))
-    elif "add habit" in query:
-        habit_name = query.replace("add habit", "").strip()
-        speak(add_habit(habit_name))
-    elif "remove habit" in query or "delete habit" in query:
-        habit_name = re.sub(r"^(remove|delete) habit", "", query).strip()
-        speak(remove_habit(habit_name))
-    elif "reset habit" in query:
-        habit_name = query.replace("reset habit", "").strip()
-        speak(reset_habit(habit_name))
-    elif "mark habit" in query or "done habit" in query or "complete habit" in query:
-        habit_name = re.sub(r"^(mark|done|complete) habit", "", query).strip()
-        speak(mark_habit_done(habit_name))
-    elif "show habits" in query or "list habits" in query:
-        speak(list_habits())
-    elif "pending habits" in query or "habits pending" in query or "habits today" in query:
-        speak(list_pending_today())
-    # APP MANAGEMENT - NEW IMPLEMENTATION
-    elif app_manager_instance and any(word in query for word in 
-        ["launch", "start", "open", "close", "exit", "terminate", "kill", "access", "run"]):
-        handled = process_app_command(query, app_manager_instance, speak)
-        if handled:
-            return chat_history, ai_model
-        else :
-            speak(f"Sorry,{honorific}.I faced some issues when trying to open the desired app")
-    # Close active window specifically
-    elif "close active" in query or "close current" in query:
-        if app_manager_instance:
-            app_manager_instance.close_active_window()
-        else:
-            active_appcloser(speak)
-        return chat_history, ai_model
-    # --- The repair system util commands ---
-    elif "self repair" in query or "initiate repair" in query or "diagnose system" in query:
-        speak(f"As you wish, {honorific}. Initiating the self-repair protocol.")
-        try:
-            from jarvis_modules.self_repair import self_repair
-            
-            result = self_repair(
-                reason="User-initiated diagnostic and repair",
-                details="Manual execution via voice command",
-                speak=speak,
-                input_getter=listen
-            )
-            # Handle result
-            if result['user_declined']:
-                speak(f"Repair sequence cancelled as per your instructions, {honorific}.")
-            elif result['success']:
-                if result['backup_created']:
-                    speak(f"Self-repair completed successfully with backup safety net in place, {honorific}.")
-                else:
-                    speak(f"Self-repair completed successfully. All systems nominal, {honorific}.")
-            else:
-                speak(f"Self-repair encountered issues. Please review the diagnostic report, {honorific}.")
-                if result['backup_created']:
-                    speak(f"A pre-repair backup is available for rollback if needed, {honorific}.")
-                
-        except Exception as e:
-            speak(f"Unable to execute self-repair, {honorific}. Error: {e}")
-            print(f"[Self-Repair Error] {e}")
-    elif "system diagnostics" in query or "check system health" in query or "system status" in query:
-        speak(f"Running system diagnostics, {honorific}...")
-        
-        try:
-            from jarvis_modules.self_repair import diagnose_only
-            
-            report = diagnose_only(speak=speak, input_getter=listen)
-            
-            # Provide detailed summary
-            status = report['overall_status']
-            
-            if status == 'HEALTHY':
-                speak(f"All systems are functioning optimally, {honorific}.")
-                if report['backup_system']['backup_count'] > 0:
-                    speak(f"Backup system operational with {report['backup_system']['backup_count']} backups available.")
-            elif status == 'DEGRADED':
-                speak(f"Minor issues detected. Self-repair recommended, {honorific}.")
-                speak(f"Issues: {len(report['modules']['missing'])} missing modules, {len(report['config']['issues'])} config issues.")
-            else:
-                speak(f"Critical issues detected. Immediate repair required, {honorific}.")
-                if report['files']['missing']:
-                    speak(f"{len(report['files']['missing'])} critical files are missing.")
-                if report['backup_system']['backup_count'] > 0:
-                    speak(f"Backups are available for file restoration.")
-                
-        except Exception as e:
-            speak(f"Diagnostic scan failed, Sir. Error: {e}")
-            print(f"[Diagnostic Error] {e}")
-    elif "create backup" in query or "backup system" in query or "make backup" in query:
-        speak(f"Initiating backup creation, {honorific}.")
-        
-        try:
-            from jarvis_modules.self_repair import create_backup_now
-            
-            success, backup_path = create_backup_now(speak=speak, input_getter=listen)
-            
-            if success:
-                speak(f"Backup created successfully at {backup_path}, {honorific}.")
-            else:
-                speak(f"Backup creation failed, {honorific}. Please check system logs.")
-                
-        except Exception as e:
-            speak(f"Unable to create backup, {honorific}. Error: {e}")
-            print(f"[Backup Error] {e}")
-    elif "restore from backup" in query or "rollback system" in query:
-        speak(f"{honorific}, manual restoration requires specific file selection.")
-        speak(f"Please use the self-repair system for automated restoration.")
-        speak(f"Say 'self repair' to begin the diagnostic and restoration process.")
-    elif "backup status" in query or "check backups" in query:
-        speak(f"Checking backup system status, {honorific}...")
-        
-        try:
-            from jarvis_modules.self_repair import check_backup_availability, get_backup_directory
-            
-            backup_available, backup_count, latest_backup = check_backup_availability(speak)
-            
-            if backup_available and backup_count > 0:
-                speak(f"Backup system operational, Sir.")
-                speak(f"{backup_count} backups are currently available.")
-                if latest_backup:
-                    speak(f"Most recent backup: {latest_backup.strftime('%B %d, %Y at %I:%M %p')}")
-                backup_dir = get_backup_directory()
-                speak(f"Backup location: {backup_dir}")
-            elif backup_available and backup_count == 0:
-                speak(f"Backup system is functional but no backups exist yet, {honorific}.")
-                speak("I recommend creating a backup now for system safety.")
-            else:
-                speak(f"Backup system is not currently available, {honorific}.")
-                speak("Please ensure the backup utility is properly configured.")
-                
-        except Exception as e:
-            speak(f"Unable to check backup status, {honorific}. Error: {e}")
-            print(f"[Backup Status Error] {e}")
-    # --- System Notifications and time based prompts ---
-    elif "disable time prompts" in query or "turn off reminders" in query:
-        toggle_time_prompts(False)
-        speak("Time-based prompts disabled, Sir.")
-        return chat_history, ai_model
-    elif "enable time prompts" in query or "turn on reminders" in query:
-        toggle_time_prompts(True)
-        speak("Time-based prompts enabled, Sir.")
-        return chat_history, ai_model
-    elif "notification cooldown" in query or "set notification interval" in query:
-        speak("Please specify cooldown duration in minutes, Sir.")
-        response = listen()
-        try:
-            minutes = int(''.join(filter(str.isdigit, response)))
-            set_notification_cooldown(minutes)
-            speak(f"Notification check interval set to {minutes} minutes, Sir.")
-        except:
-            speak("Invalid duration, Sir.")
-        return chat_history, ai_model
-    elif "list custom prompts" in query or "show my prompts" in query or "show custom reminders" in query:
-            prompts = list_custom_prompts()
-            if prompts:
-                speak(f"You have {len(prompts)} custom prompts registered, Sir.")
-                for prompt_id, message, enabled in prompts:
-                    status = "enabled" if enabled else "disabled"
-                    speak(f"{prompt_id}: {status}")
-            else:
-                speak("No custom prompts are currently registered, Sir.")
-            return chat_history, ai_model
-    # Schedule commands
-    elif "review today" in query or "today's plans" in query or "what's today" in query:
-        review_schedule(0)
-    elif "review yesterday" in query or "yesterday's plans" in query or "what was yesterday" in query:
-        review_schedule(-1)
-    elif "review tomorrow" in query or "tomorrow's plans" in query or "what's tomorrow" in query:
-        review_schedule(1)
-    elif "schedule for today" in query or "plan for today" in query or "add today's plan" in query:
-        add_schedule_interactive(0)
-    elif "schedule for tomorrow" in query or "plan for tomorrow" in query or "add tomorrow's plan" in query:
-        add_schedule_interactive(1)
-    elif "modify today" in query or "change today's plan" in query or "update today" in query:
-        modify_schedule(0)
-    elif "modify tomorrow" in query or "change tomorrow's plan" in query or "update tomorrow" in query:
-        modify_schedule(1)
-    elif "clear today's schedule" in query or "delete today's plans" in query:
-        date_key, day_name = get_schedule_date_key(0)
-        data = load_data()
-        if "schedule" in data and date_key in data["schedule"]:
-            del data["schedule"][date_key]
-            save_data(data)
-            speak(f"Today's schedule has been cleared, {honorific}.")
+            speak(f"Self-repair encountered issues. Please review the diagnostic report, {honorific}.")
+            if result['backup_created']:
+                speak(f"A pre-repair backup is available for rollback if needed, {honorific}.")
+
+    except Exception as e:
+        speak(f"Unable to execute self-repair, {honorific}. Error: {e}")
+        print(f"[Self-Repair Error] {e}")
+def _cmd_diagnostics(query):
+    honorific = get_honorific()
+    speak(f"Running system diagnostics, {honorific}...")
+
+    try:
+        from jarvis_modules.self_repair import diagnose_only
+
+        report = diagnose_only(speak=speak, input_getter=listen)
+
+        # Provide detailed summary
+        status = report['overall_status']
+
+        if status == 'HEALTHY':
+            speak(f"All systems are functioning optimally, {honorific}.")
+            if report['backup_system']['backup_count'] > 0:
+                speak(f"Backup system operational with {report['backup_system']['backup_count']} backups available.")
+        elif status == 'DEGRADED':
+            speak(f"Minor issues detected. Self-repair recommended, {honorific}.")
+            speak(f"Issues: {len(report['modules']['missing'])} missing modules, {len(report['config']['issues'])} config issues.")
         else:
-            speak(f"There was no schedule to clear,{honorific}.")
-    elif "create schedule" in query or "set schedule now" in query or "add schedule now" in query:
-                force_schedule_prompt()
-                return chat_history, ai_model
-    # --- System Scans ---
-    elif any(word in query for word in ["scan", "check disk", "cleanup", "flush dns"]):
-        if "sfc" in query or "system file" in query:
-                return system_scan("sfc")
-        elif "disk" in query or "check" in query:
-                return system_scan("chkdsk")
-        elif "cleanup" in query:
-                return system_scan("cleanup")
-        elif "flush" in query or "dns" in query:
-                return system_scan("flushdns")
+            speak(f"Critical issues detected. Immediate repair required, {honorific}.")
+            if report['files']['missing']:
+                speak(f"{len(report['files']['missing'])} critical files are missing.")
+            if report['backup_system']['backup_count'] > 0:
+                speak(f"Backups are available for file restoration.")
+
+    except Exception as e:
+        speak(f"Diagnostic scan failed, Sir. Error: {e}")
+        print(f"[Diagnostic Error] {e}")
+def _cmd_create_backup(query):
+    honorific = get_honorific()
+    speak(f"Initiating backup creation, {honorific}.")
+
+    try:
+        from jarvis_modules.self_repair import create_backup_now
+
+        success, backup_path = create_backup_now(speak=speak, input_getter=listen)
+
+        if success:
+            speak(f"Backup created successfully at {backup_path}, {honorific}.")
         else:
-                speak("Specify which system scan you want, Sir.")
-                return
-    # --- Commands For File Handler Modules ----
-    elif "create file" in query:
-        match = re.search(r"create file (.+)", query)
-        if match:
-            file_handler.create_file(match.group(1))
-    elif "read file" in query:
-        match = re.search(r"read file (.+)", query)
-        if match:
-            content = file_handler.read_file(match.group(1))
-            if content:
-                speak(content[:200])  # Read first 200 chars
-    elif "delete file" in query:
-        match = re.search(r"delete file (.+)", query)
-        if match:
-            file_handler.delete_file(match.group(1))
-    elif "search files" in query:
-        match = re.search(r"search files for (.+) in (.+)", query)
-        if match:
-            pattern, directory = match.groups()
-            file_handler.search_files(directory, pattern)
-    elif "organize files" in query or "organize directory" in query:
-        directory = os.path.expanduser("~/Downloads")  # or detect from query
-        file_handler.organize_directory(directory, dry_run=False)
-    elif "file info" in query:
-        match = re.search(r"file info (.+)", query)
-        if match:
-            file_handler.get_file_info(match.group(1))
-    # --- Memory-Aware Conversation Layer ---
-    elif "remind me what we discussed" in query or "last conversation" in query:
-        recall_recent_conversations()
-    elif "what do you remember" in query or "recall my topics" in query:
-        recall_topics()
-    elif "remember this" in query:
-        topic = query.replace("remember this", "").strip()
-        if topic:
-            remember_topic(topic)
+            speak(f"Backup creation failed, {honorific}. Please check system logs.")
+
+    except Exception as e:
+        speak(f"Unable to create backup, {honorific}. Error: {e}")
+        print(f"[Backup Error] {e}")
+def _cmd_restore_backup(query):
+    honorific = get_honorific()
+    speak(f"{honorific}, manual restoration requires specific file selection.")
+    speak(f"Please use the self-repair system for automated restoration.")
+    speak(f"Say 'self repair' to begin the diagnostic and restoration process.")
+def _cmd_backup_status(query):
+    honorific = get_honorific()
+    speak(f"Checking backup system status, {honorific}...")
+
+    try:
+        from jarvis_modules.self_repair import check_backup_availability, get_backup_directory
+
+        backup_available, backup_count, latest_backup = check_backup_availability(speak)
+
+        if backup_available and backup_count > 0:
+            speak(f"Backup system operational, Sir.")
+            speak(f"{backup_count} backups are currently available.")
+            if latest_backup:
+                speak(f"Most recent backup: {latest_backup.strftime('%B %d, %Y at %I:%M %p')}")
+            backup_dir = get_backup_directory()
+            speak(f"Backup location: {backup_dir}")
+        elif backup_available and backup_count == 0:
+            speak(f"Backup system is functional but no backups exist yet, {honorific}.")
+            speak("I recommend creating a backup now for system safety.")
         else:
-           speak("Please tell me what you'd like me to remember, Sir.")
-    elif "focus for today" in query or "set focus" in query:
-        speak("What would you like today's main focus to be, Sir?")
-        focus = listen()
-        if focus:
-            update_memory_context("daily_focus", focus)
-            speak(f"Understood, Sir. I’ll remind you to stay focused on {focus} today.")
-    elif "how am i doing" in query or "summarize my progress" in query:
-        summary = summarize_memory_snapshot()
-        speak(f"Here’s your current overview, Sir: {summary}")
-    elif "what did i say yesterday" in query or "what did we talk about" in query or "recall conversation" in query:
-        recall_recent_conversations(days=1)
+            speak(f"Backup system is not currently available, {honorific}.")
+            speak("Please ensure the backup utility is properly configured.")
+
+    except Exception as e:
+        speak(f"Unable to check backup status, {honorific}. Error: {e}")
+        print(f"[Backup Status Error] {e}")
+def _cmd_disable_prompts(query):
+    toggle_time_prompts(False)
+    speak("Time-based prompts disabled, Sir.")
+def _cmd_enable_prompts(query):
+    toggle_time_prompts(True)
+    speak("Time-based prompts enabled, Sir.")
+def _cmd_notification_cooldown(query):
+    speak("Please specify cooldown duration in minutes, Sir.")
+    response = listen()
+    try:
+        minutes = int(normalize(response).numbers[0])
+        set_notification_cooldown(minutes)
+        speak(f"Notification check interval set to {minutes} minutes, Sir.")
+    except:
+        speak("Invalid duration, Sir.")
+def _cmd_list_custom_prompts(query):
+    prompts = list_custom_prompts()
+    if prompts:
+        speak(f"You have {len(prompts)} custom prompts registered, Sir.")
+        for prompt_id, message, enabled in prompts:
+            status = "enabled" if enabled else "disabled"
+            speak(f"{prompt_id}: {status}")
     else:
+        speak("No custom prompts are currently registered, Sir.")
+def _cmd_review_today(query):
+    review_schedule(0)
+def _cmd_review_yesterday(query):
+    review_schedule(-1)
+def _cmd_review_tomorrow(query):
+    review_schedule(1)
+def _cmd_plan_today(query):
+    add_schedule_interactive(0)
+def _cmd_plan_tomorrow(query):
+    add_schedule_interactive(1)
+def _cmd_modify_today(query):
+    modify_schedule(0)
+def _cmd_modify_tomorrow(query):
+    modify_schedule(1)
+def _cmd_clear_today(query):
+    honorific = get_honorific()
+    date_key, day_name = get_schedule_date_key(0)
+    data = load_data()
+    if get_schedule_day(date_key, data) is not None:
+        if date_key in data.get("schedule", {}):
+            del data["schedule"][date_key]
+            save_data(data)
+        SCHEDULE_ARCHIVE.remove_day(date_key)
+        speak(f"Today's schedule has been cleared, {honorific}.")
+    else:
+        speak(f"There was no schedule to clear,{honorific}.")
+def _cmd_create_schedule(query):
+    force_schedule_prompt()
+def _cmd_system_scan(query):
+    if "sfc" in query or "system file" in query:
+            return system_scan("sfc")
+    elif "disk" in query or "check" in query:
+            return system_scan("chkdsk")
+    elif "cleanup" in query:
+            return system_scan("cleanup")
+    elif "flush" in query or "dns" in query:
+            return system_scan("flushdns")
+    else:
+            speak("Specify which system scan you want, Sir.")
+            return
+def _cmd_create_file(query, filename=None):
+    if filename:
+        file_handler.create_file(filename)
+def _cmd_read_file(query, filename=None):
+    if filename:
+        content = file_handler.read_file(filename)
+        if content:
+            speak(content[:200])  # Read first 200 chars
+def _cmd_delete_file(query, filename=None):
+    if filename:
+        file_handler.delete_file(filename)
+def _cmd_search_files(query, pattern=None, directory=None):
+    if pattern and directory:
+        file_handler.search_files(directory, pattern)
+def _cmd_organize_files(query):
+    directory = os.path.expanduser("~/Downloads")  # or detect from query
+    file_handler.organize_directory(directory, dry_run=False)
+def _cmd_file_info(query, filename=None):
+    if filename:
+        file_handler.get_file_info(filename)
+def _cmd_recall_last_conversation(query):
+    recall_recent_conversations()
+def _cmd_recall_topics(query):
+    recall_topics()
+def _cmd_remember_topic(query):
+    topic = query.replace("remember this", "").strip()
+    if topic:
+        remember_topic(topic)
+    else:
+       speak("Please tell me what you'd like me to remember, Sir.")
+def _cmd_set_focus(query):
+    speak("What would you like today's main focus to be, Sir?")
+    focus = listen()
+    if focus:
+        update_memory_context("daily_focus", focus)
+        speak(f"Understood, Sir. I’ll remind you to stay focused on {focus} today.")
+def _cmd_progress_summary(query):
+    summary = summarize_memory_snapshot()
+    speak(f"Here’s your current overview, Sir: {summary}")
+def _cmd_recall_yesterday(query):
+    recall_recent_conversations(days=1)
+def _wants_website(query):
+    """'open ...' goes to the browser for known sites/URLs, otherwise to the app manager."""
+    if app_manager_instance is None or normalize(query).has_word("website"):
+        return True
+    match = re.search(r'open (.*)', query)
+    target = match.group(1).strip() if match else ""
+    return any(name in target for name in KNOWN_SITES) or bool(is_valid_url(target))
+def _has_app_manager(query):
+    return app_manager_instance is not None
+def _guard_state():
+    """Everything the guards read besides the query (part of the intent cache key)"""
+    return app_manager_instance is not None
+
+# Declarative intent table, compiled into one Aho-Corasick automaton.
+# Phrases match whole words; ties go to priority, then the longest phrase.
+# skip_bookkeeping: returned before the conversation log and personality update, as it always has.
+# `pattern` groups are parsed once per routing decision and passed to the handler.
+COMMAND_ROUTER = IntentRouter([
+    Intent("hello", ["hello"], _cmd_hello, priority=-1, skip_bookkeeping=True),
+    Intent("greeting", ["hi", "hey", "good morning", "good afternoon", "good evening", "yo", "greetings", "what's up", "how are you"], _cmd_greeting, priority=-1, skip_bookkeeping=True),
+    Intent("mute", ["mute", "stop talking", "be quiet", "shut up", "silence"], _cmd_mute, priority=1, skip_bookkeeping=True),
+    Intent("unmute", ["unmute", "speak again", "you can talk", "resume"], _cmd_unmute, priority=1, skip_bookkeeping=True),
+    Intent("system_status", ["system status", "system monitor", "system health"], _cmd_system_status),
+    Intent("test_microphone", ["test microphone", "check mic", "voice test"], _cmd_test_microphone, prompts=True, skip_bookkeeping=True),
+    Intent("command_help", ["cheatsheet", "commands list", "list of commands", "commands help"], _cmd_command_help),
+    Intent("version", ["check your version", "tell me the version", "check the version"], _cmd_version),
+    Intent("backup_jarvis", ["backup jarvis", "create backup"], _cmd_backup_jarvis),
+    Intent("terminal_mode", ["initiate terminal operation", "start terminal mode", "launch terminal operator"], _cmd_terminal_mode, prompts=True),
+    Intent("introduce", ["who are you", "what are you", "introduce yourself"], _cmd_introduce),
+    Intent("greet_other", ["greet someone", "greet other", "introduce to someone"], _cmd_greet_other),
+    Intent("time", ["time"], _cmd_time),
+    Intent("date", ["date"], _cmd_date),
+    Intent("weather", ["weather", "temperature"], _cmd_weather, skip_bookkeeping=True),
+    Intent("wikipedia", ["search wikipedia"], _cmd_wikipedia, pattern=r"search wikipedia(?: for)? (.+)"),
+    Intent("youtube", ["play on youtube"], _cmd_youtube, prompts=True),
+    Intent("spotify", ["play song on spotify"], _cmd_spotify, pattern=r"play (?:song|music)?(?: on spotify)?(?: called| named)?\s*(.*)", prompts=True),
+    Intent("open_website", ["open"], _cmd_open_website, priority=1, guard=_wants_website, prompts=True),
+    Intent("google_search", ["google", "search"], _cmd_google_search, prompts=True),
+    Intent("test_email", ["test email", "send test email"], _cmd_test_email, skip_bookkeeping=True),
+    Intent("send_email", ["send email", "send mail"], _cmd_send_email, prompts=True),
+    Intent("compose_email", ["compose email", "write an email", "auto mail"], _cmd_compose_email, prompts=True),
+    Intent("send_message", ["send message"], _cmd_send_message, pattern=re.compile(r"send\s+(?:whatsapp\s+)?message\s+to\s+(.+)", re.IGNORECASE), prompts=True),
+    Intent("send_another_message", ["send another message", "send another whatsapp message"], _cmd_send_another_message, prompts=True),
+    Intent("take_note", ["take a note", "note down", "store this information"], _cmd_take_note, prompts=True),
+    Intent("news", ["read the news", "tell me the news", "latest news"], _cmd_news),
+    Intent("add_habit", ["add habit"], _cmd_add_habit),
+    Intent("remove_habit", ["remove habit", "delete habit"], _cmd_remove_habit),
+    Intent("reset_habit", ["reset habit"], _cmd_reset_habit),
+    Intent("mark_habit", ["mark habit", "done habit", "complete habit"], _cmd_mark_habit),
+    Intent("list_habits", ["show habits", "list habits"], _cmd_list_habits),
+    Intent("pending_habits", ["pending habits", "habits pending", "habits today"], _cmd_pending_habits),
+    Intent("app_command", ["launch", "start", "open", "close", "exit", "terminate", "kill", "access", "run"], _cmd_app_command, guard=_has_app_manager, prompts=True, skip_bookkeeping=True),
+    Intent("close_active_window", ["close active", "close current"], _cmd_close_active_window, skip_bookkeeping=True),
+    Intent("self_repair", ["self repair", "initiate repair", "diagnose system"], _cmd_self_repair, prompts=True),
+    Intent("diagnostics", ["system diagnostics", "check system health"], _cmd_diagnostics),
+    Intent("create_backup", ["backup system", "make backup"], _cmd_create_backup, prompts=True),
+    Intent("restore_backup", ["restore from backup", "rollback system"], _cmd_restore_backup),
+    Intent("backup_status", ["backup status", "check backups"], _cmd_backup_status),
+    Intent("disable_prompts", ["disable time prompts", "turn off reminders"], _cmd_disable_prompts, skip_bookkeeping=True),
+    Intent("enable_prompts", ["enable time prompts", "turn on reminders"], _cmd_enable_prompts, skip_bookkeeping=True),
+    Intent("notification_cooldown", ["notification cooldown", "set notification interval"], _cmd_notification_cooldown, prompts=True, skip_bookkeeping=True),
+    Intent("list_custom_prompts", ["list custom prompts", "show my prompts", "show custom reminders"], _cmd_list_custom_prompts, skip_bookkeeping=True),
+    Intent("review_today", ["review today", "today's plans", "what's today"], _cmd_review_today),
+    Intent("review_yesterday", ["review yesterday", "yesterday's plans", "what was yesterday"], _cmd_review_yesterday),
+    Intent("review_tomorrow", ["review tomorrow", "tomorrow's plans", "what's tomorrow"], _cmd_review_tomorrow),
+    Intent("plan_today", ["schedule for today", "plan for today", "add today's plan"], _cmd_plan_today, prompts=True),
+    Intent("plan_tomorrow", ["schedule for tomorrow", "plan for tomorrow", "add tomorrow's plan"], _cmd_plan_tomorrow, prompts=True),
+    Intent("modify_today", ["modify today", "change today's plan", "update today"], _cmd_modify_today, prompts=True),
+    Intent("modify_tomorrow", ["modify tomorrow", "change tomorrow's plan", "update tomorrow"], _cmd_modify_tomorrow, prompts=True),
+    Intent("clear_today", ["clear today's schedule", "delete today's plans"], _cmd_clear_today),
+    Intent("create_schedule", ["create schedule", "set schedule now", "add schedule now"], _cmd_create_schedule, prompts=True, skip_bookkeeping=True),
+    Intent("system_scan", ["scan", "check disk", "cleanup", "flush dns"], _cmd_system_scan, skip_bookkeeping=True),
+    Intent("create_file", ["create file"], _cmd_create_file, pattern=r"create file (.+)"),
+    Intent("read_file", ["read file"], _cmd_read_file, pattern=r"read file (.+)"),
+    Intent("delete_file", ["delete file"], _cmd_delete_file, pattern=r"delete file (.+)"),
+    Intent("search_files", ["search files"], _cmd_search_files, pattern=r"search files for (.+) in (.+)"),
+    Intent("organize_files", ["organize files", "organize directory"], _cmd_organize_files),
+    Intent("file_info", ["file info"], _cmd_file_info, pattern=r"file info (.+)"),
+    Intent("recall_last_conversation", ["remind me what we discussed", "last conversation"], _cmd_recall_last_conversation),
+    Intent("recall_topics", ["what do you remember", "recall my topics"], _cmd_recall_topics),
+    Intent("remember_topic", ["remember this"], _cmd_remember_topic),
+    Intent("set_focus", ["focus for today", "set focus"], _cmd_set_focus, prompts=True),
+    Intent("progress_summary", ["how am i doing", "summarize my progress"], _cmd_progress_summary),
+    Intent("recall_yesterday", ["what did i say yesterday", "what did we talk about", "recall conversation"], _cmd_recall_yesterday),
+])
+
+# Near-miss recovery for utterances the router cannot match ("wheather", "spot if i")
+COMMAND_FUZZY = FuzzyIntentIndex(COMMAND_ROUTER)
+
+def _run_blocking_handler(handler, query, intent):
+    """Run a handler on jarvis_main's worker pool the way process_command does:
+    with a fresh config, in one data transaction unless the intent prompts"""
+    CONFIG_SERVICE.reload_if_changed()
+    if intent.prompts:
+        return handler(query)
+    with DATA_UOW.transaction():
+        return handler(query)
+
+# Shared with jarvis_main's async loop; blocking handlers run on its worker pool
+COMMAND_REGISTRY = HandlerRegistry(
+    COMMAND_ROUTER,
+    fuzzy=COMMAND_FUZZY if SETTINGS.get("fuzzy_command_recovery", True) else None,
+    max_workers=SETTINGS.get("handler_workers", 4),
+    wrap=_run_blocking_handler,
+    cache_size=SETTINGS.get("intent_cache_size", 256),
+    guard_state=_guard_state,
+)
+
+def process_command(query, chat_history, ai_model):
+    """Run one command with a fresh config. Handlers that don't prompt commit together
+    with the bookkeeping (one DATA_UOW transaction); prompting handlers and the LLM
+    run outside it and commit their own writes."""
+    CONFIG_SERVICE.reload_if_changed()
+    return _process_command(query, chat_history, ai_model)
+def _process_command(query, chat_history, ai_model):
+    
+    # Get honorific at the START of function (not from main_loop)
+    honorific = get_honorific()
+    user_name = get_user_name()
+
+    # Greet or remind contextually
+    context_summary = summarize_memory_snapshot()
+    if context_summary and random.random() < 0.23:  # 25% chance each run
+        speak(f"May I remind you {honorific} that, {context_summary}.")
+
+    # Normalized once; the router and every handler share this object
+    query = normalize(query)
+    
+    # One scan of the query against every trigger phrase (fuzzy recovery last);
+    # repeated commands come straight from the intent cache with their arguments
+    match, query = COMMAND_REGISTRY.match(query)
+    if match is not None and match.intent.prompts:
+        # Waits on listen() or the LLM: never inside a transaction
+        COMMAND_REGISTRY.call(match, query)
+    elif match is None:
         response = "I am at a loss for words, Sir. Would you care to rephrase?"
         if ai_model == "gpt":
             response, chat_history = chat_with_gpt(query, chat_history)
@@ -3729,16 +3966,22 @@ def process_command(query, chat_history, ai_model):
         elif ai_model == "mistral":
             response, chat_history = chat_with_mistral(query, chat_history)
         speak(response)
-    # Record each conversation (query + generated response)
-    try:
-        if 'response' in locals():
-            store_conversation_entry(query, response)
-    except Exception as e:
-        print(f"[Memory Logging Error] {e}")
-    try:
-        update_personality_context(True)
-    except Exception as e:
-        print(f"[Personality Update Error] {e}")
+    # One commit for the rest of the command; a failing handler rolls it all back
+    with DATA_UOW.transaction():
+        if match is not None and not match.intent.prompts:
+            COMMAND_REGISTRY.call(match, query)
+        if match is not None and match.intent.skip_bookkeeping:
+            return chat_history, ai_model
+        # Record each conversation (query + generated response)
+        try:
+            if 'response' in locals():
+                store_conversation_entry(query, response)
+        except Exception as e:
+            print(f"[Memory Logging Error] {e}")
+        try:
+            update_personality_context(True)
+        except Exception as e:
+            print(f"[Personality Update Error] {e}")
     
     return chat_history, ai_model
 # --- Web Placeholder ----
@@ -3771,6 +4014,7 @@ def main_loop():
 
     # Migration - Run once
     migrate_schedule_flag()
+    archive_old_schedule()
     
     print("Performing context and memory integrity check, Sir.")
     load_memory_context()
@@ -3879,7 +4123,7 @@ def main_loop():
                     speak(f"{honorific},now that I am active, feel free to tell me what can I assist you with?")
         # Main command processing loop
         while True:
-            query = listen()
+            query = normalize(listen())
 
             # CRITICAL FIX: Handle empty responses
             if not query:
@@ -0,0 +1,92 @@
+/*
+ * Jarvis text kernel - CPython extension
+ *
+ * Same preprocessing as acceleration.c, without the ctypes round trip:
+ * the input is read from the str's cached UTF-8 buffer (the str's own data
+ * for ASCII text) and the result is written straight into a new str object.
+ * No intermediate bytes, no malloc/free pairs to get wrong.
+ *
+ * Build (Linux/macOS):  python -m core.build_accel
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include "text_kernel.h"
+
+static PyObject* preprocess_str(PyObject* text) {
+    Py_ssize_t len;
+    const char* data = PyUnicode_AsUTF8AndSize(text, &len);
+    if (!data) return NULL;
+
+    Py_ssize_t out_len = (Py_ssize_t)jk_preprocess_length(data, (size_t)len);
+    if (out_len == len && PyUnicode_CheckExact(text) && PyUnicode_IS_ASCII(text)) {
+        /* Nothing to strip: only lowercase, or share the object if already lower */
+        int lower = 1;
+        for (Py_ssize_t i = 0; i < len; i++) {
+            if (data[i] >= 'A' && data[i] <= 'Z') { lower = 0; break; }
+        }
+        if (lower) {
+            Py_INCREF(text);
+            return text;
+        }
+    }
+
+    PyObject* result = PyUnicode_New(out_len, 127);
+    if (!result) return NULL;
+    jk_preprocess(data, (size_t)len, (char*)PyUnicode_1BYTE_DATA(result));
+    return result;
+}
+
+static PyObject* tk_preprocess(PyObject* self, PyObject* arg) {
+    if (!PyUnicode_Check(arg)) {
+        PyErr_SetString(PyExc_TypeError, "preprocess() expects a str");
+        return NULL;
+    }
+    return preprocess_str(arg);
+}
+
+static PyObject* tk_preprocess_batch(PyObject* self, PyObject* arg) {
+    PyObject* seq = PySequence_Fast(arg, "preprocess_batch() expects a sequence of str");
+    if (!seq) return NULL;
+
+    Py_ssize_t n = PySequence_Fast_GET_SIZE(seq);
+    PyObject** items = PySequence_Fast_ITEMS(seq);
+    PyObject* results = PyList_New(n);
+    if (!results) {
+        Py_DECREF(seq);
+        return NULL;
+    }
+    for (Py_ssize_t i = 0; i < n; i++) {
+        if (!PyUnicode_Check(items[i])) {
+            PyErr_Format(PyExc_TypeError, "item %zd is not a str", i);
+            goto fail;
+        }
+        PyObject* out = preprocess_str(items[i]);
+        if (!out) goto fail;
+        PyList_SET_ITEM(results, i, out);
+    }
+    Py_DECREF(seq);
+    return results;
+
+fail:
+    Py_DECREF(results);
+    Py_DECREF(seq);
+    return NULL;
+}
+
+static PyMethodDef tk_methods[] = {
+    {"preprocess", tk_preprocess, METH_O,
+     "Lowercase and keep only ASCII letters, digits and spaces."},
+    {"preprocess_batch", tk_preprocess_batch, METH_O,
+     "preprocess() over a sequence of str in one call; returns a list."},
+    {NULL, NULL, 0, NULL}
+};
+
+static struct PyModuleDef tk_module = {
+    PyModuleDef_HEAD_INIT, "_textkernel", "Jarvis native text kernel", -1, tk_methods
+};
+
+PyMODINIT_FUNC PyInit__textkernel(void) {
+    return PyModule_Create(&tk_module);
+}
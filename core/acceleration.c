@@ -7,6 +7,9 @@
  * 
  * Compile with MSVC:
  *   cl /LD /O2 acceleration.c
+ *
+ * Compile on Linux (or run: python -m core.build_accel):
+ *   gcc -shared -fPIC -O3 -o acceleration.so acceleration.c
  */
 
 #define _CRT_SECURE_NO_WARNINGS  // Disable MSVC security warnings
@@ -16,6 +19,8 @@
 #include <string.h>
 #include <ctype.h>
 
+#include "text_kernel.h"
+
 // Windows-specific includes
 #ifdef _WIN32
     #include <windows.h>
@@ -56,6 +61,7 @@
 // ============================================
 // String Preprocessing (Case-insensitive)
 // ============================================
+// Caller frees the result with c_free_string
 EXPORT char* c_preprocess_text(const char* input) {
     if (!input) return NULL;
     
@@ -64,16 +70,35 @@ EXPORT char* c_preprocess_text(const char* input) {
     
     if (!result) return NULL;  // Memory allocation failed
     
-    size_t j = 0;
-    for (size_t i = 0; i < len; i++) {
-        if (isalnum((unsigned char)input[i]) || input[i] == ' ') {
-            result[j++] = (char)tolower((unsigned char)input[i]);
-        }
-    }
-    result[j] = '\0';
+    result[jk_preprocess(input, len, result)] = '\0';
     return result;
 }
 
+// Caller-provided buffer: no allocation, no terminator.
+// Returns bytes written, or -1 if out_cap is too small.
+EXPORT long c_preprocess_into(const char* input, size_t len, char* out, size_t out_cap) {
+    if (!input || !out) return -1;
+    if (out_cap < len && jk_preprocess_length(input, len) > out_cap) return -1;
+    return (long)jk_preprocess(input, len, out);
+}
+
+// Batch: results are packed back to back into out, their lengths into
+// out_lengths[0:count]. Returns total bytes written, or -1 if out_cap
+// (the sum of the input lengths is always enough) is too small.
+EXPORT long c_preprocess_batch(const char** inputs, const size_t* lengths, int count,
+                               char* out, size_t out_cap, size_t* out_lengths) {
+    if (!inputs || !lengths || !out || !out_lengths) return -1;
+    
+    size_t total = 0;
+    for (int i = 0; i < count; i++) {
+        size_t need = jk_preprocess_length(inputs[i], lengths[i]);
+        if (total + need > out_cap) return -1;
+        out_lengths[i] = jk_preprocess(inputs[i], lengths[i], out + total);
+        total += out_lengths[i];
+    }
+    return (long)total;
+}
+
 // ============================================
 // Fast Keyword Matching
 // 10-20x faster than Python's 'in' operator
@@ -106,6 +131,66 @@ EXPORT int c_contains_keyword(const char* text, const char* keyword) {
 // Levenshtein Distance (Fuzzy Matching)
 // For handling voice recognition errors
 // ============================================
+
+// Banded (Ukkonen) distance: only cells with |i - j| <= k are computed,
+// in two rows of 2k+1 diagonals. Returns k+1 as soon as the whole row
+// exceeds k, so misses cost O(k) per row instead of a full matrix.
+// Returns -1 if a large band cannot be allocated.
+#define BAND_STACK 64
+
+static int bounded_distance(const char* a, size_t m, const char* b, size_t n, int k) {
+    if (k < 0) return k + 1;                // "over" for any negative budget
+    size_t gap = m > n ? m - n : n - m;
+    if (gap > (size_t)k) return k + 1;
+    
+    int width = 2 * k + 1;
+    int stack_rows[2 * (2 * BAND_STACK + 1)];
+    int* rows = stack_rows;
+    if (k > BAND_STACK) {
+        rows = (int*)malloc(2 * (size_t)width * sizeof(int));
+        if (!rows) return -1;
+    }
+    int* prev = rows;
+    int* cur = rows + width;
+    int over = k + 1;
+    
+    // Row 0: D[0][j] = j, diagonal index d = j - i + k
+    for (int d = 0; d < width; d++) {
+        long j = d - k;
+        prev[d] = (j >= 0 && j <= (long)n) ? (int)j : over;
+    }
+    
+    for (size_t i = 1; i <= m; i++) {
+        int row_min = over;
+        unsigned char ca = jk_lower((unsigned char)a[i - 1]);
+        for (int d = 0; d < width; d++) {
+            long j = (long)i + d - k;
+            int v;
+            if (j < 0 || j > (long)n) {
+                v = over;
+            } else if (j == 0) {
+                v = (int)i;
+            } else {
+                v = prev[d] + (ca != jk_lower((unsigned char)b[j - 1]));
+                if (d + 1 < width && prev[d + 1] + 1 < v) v = prev[d + 1] + 1;
+                if (d > 0 && cur[d - 1] + 1 < v) v = cur[d - 1] + 1;
+            }
+            if (v > over) v = over;
+            cur[d] = v;
+            if (v < row_min) row_min = v;
+        }
+        if (row_min > k) {
+            if (rows != stack_rows) free(rows);
+            return over;
+        }
+        int* tmp = prev; prev = cur; cur = tmp;
+    }
+    
+    int result = prev[(long)n - (long)m + k];
+    if (rows != stack_rows) free(rows);
+    return result > k ? over : result;
+}
+
 EXPORT int c_edit_distance(const char* s1, const char* s2) {
     if (!s1 || !s2) return -1;
     
@@ -119,40 +204,15 @@ EXPORT int c_edit_distance(const char* s1, const char* s2) {
         if (len2 - len1 > 10) return (int)(len2 - len1);
     }
     
-    // Allocate matrix
-    int* matrix = (int*)malloc((len1 + 1) * (len2 + 1) * sizeof(int));
-    if (!matrix) return -1;  // Allocation failed
-    
-    // Initialize first row and column
-    for (size_t i = 0; i <= len1; i++) {
-        matrix[i * (len2 + 1)] = (int)i;
-    }
-    for (size_t j = 0; j <= len2; j++) {
-        matrix[j] = (int)j;
-    }
-    
-    // Fill matrix
-    for (size_t i = 1; i <= len1; i++) {
-        for (size_t j = 1; j <= len2; j++) {
-            int cost = (tolower((unsigned char)s1[i-1]) == 
-                       tolower((unsigned char)s2[j-1])) ? 0 : 1;
-            
-            int del = matrix[(i-1) * (len2 + 1) + j] + 1;
-            int ins = matrix[i * (len2 + 1) + (j-1)] + 1;
-            int sub = matrix[(i-1) * (len2 + 1) + (j-1)] + cost;
-            
-            // Find minimum
-            int min = del;
-            if (ins < min) min = ins;
-            if (sub < min) min = sub;
-            
-            matrix[i * (len2 + 1) + j] = min;
-        }
-    }
-    
-    int result = matrix[len1 * (len2 + 1) + len2];
-    free(matrix);
-    return result;
+    // A band as wide as the longer string is the exact distance
+    int k = (int)(len1 > len2 ? len1 : len2);
+    return bounded_distance(s1, len1, s2, len2, k);
+}
+
+// Distance if it is <= max_distance, otherwise max_distance + 1
+EXPORT int c_edit_distance_bounded(const char* s1, const char* s2, int max_distance) {
+    if (!s1 || !s2) return -1;
+    return bounded_distance(s1, strlen(s1), s2, strlen(s2), max_distance);
 }
 
 // ============================================
@@ -187,22 +247,43 @@ EXPORT int c_contains_any_keyword(const char* text, const char** keywords, int c
     return -1;  // No match
 }
 
-// Find closest match from list
+// Find closest match from list (first option wins ties).
+// The band shrinks to the best distance so far, so later options bail out early.
 EXPORT int c_find_closest_match(const char* text, const char** options, int count, int max_distance) {
     if (!text || !options) return -1;
     
+    size_t len = strlen(text);
     int best_index = -1;
     int best_distance = max_distance + 1;
     
-    for (int i = 0; i < count; i++) {
-        int dist = c_edit_distance(text, options[i]);
+    for (int i = 0; i < count && best_distance > 0; i++) {
+        if (!options[i]) continue;
+        int dist = bounded_distance(text, len, options[i], strlen(options[i]), best_distance - 1);
         if (dist >= 0 && dist < best_distance) {
             best_distance = dist;
             best_index = i;
         }
     }
     
-    return (best_distance <= max_distance) ? best_index : -1;
+    return best_index;
+}
+
+// One against many: distances[i] = distance to options[i], or max_distance + 1
+// when it is further than that. Returns how many options are within range.
+EXPORT int c_edit_distance_many(const char* text, const char** options, int count,
+                                int max_distance, int* distances) {
+    if (!text || !options || !distances) return -1;
+    
+    size_t len = strlen(text);
+    int within = 0;
+    for (int i = 0; i < count; i++) {
+        int dist = options[i]
+            ? bounded_distance(text, len, options[i], strlen(options[i]), max_distance)
+            : max_distance + 1;
+        distances[i] = dist;
+        if (dist >= 0 && dist <= max_distance) within++;
+    }
+    return within;
 }
 
 // ============================================
@@ -0,0 +1,219 @@
+"""
+Audio Output Service
+- One process-wide output, opened once at startup and kept open
+- Plays in-memory audio: mp3/wav bytes, BytesIO, memoryview or raw 16-bit PCM
+- Queued playbacks run back to back in submission order
+- Completion is reported through Playback.done / wait_async(), not polling
+- Backends: miniaudio (streaming, gapless) > pygame mixer > pydub
+- Shared by every TTS path: SpeechEngine, the legacy speech worker, espeak
+"""
+
+import atexit
+import io
+import queue
+import threading
+
+from core.audio_stream import (
+    CHANNELS, MINIAUDIO_AVAILABLE, SAMPLE_RATE,
+    AudioStream, PcmPlayback, Playback, StreamPlayer,
+)
+
+FORMATS = ("mp3", "wav", "pcm")
+
+
+def as_buffer(audio):
+    """bytes-like view of bytes/bytearray/memoryview/BytesIO without copying"""
+    if isinstance(audio, io.BytesIO):
+        return audio.getbuffer()
+    return memoryview(audio)
+
+
+class AudioOutput:
+    """
+    The assistant's speaker.
+
+        output = get_audio_output()
+        playback = output.play(mp3_bytes)                 # queued, returns at once
+        await playback.wait_async()                       # or playback.wait()
+
+        stream = output.open_stream()                     # streaming backends only
+        stream.feed(chunk) ... stream.finish()
+
+    PCM must be signed 16-bit at the output's sample rate and channel count
+    (the miniaudio backend converts other rates and channel counts).
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, channels=CHANNELS, backend=None):
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.requested = backend
+        self.backend = None
+        self._player = None         # miniaudio StreamPlayer
+        self._mixer = None          # pygame.mixer
+        self._jobs = None           # Queue for the pygame/pydub playback thread
+        self._current = None        # (playback, pygame channel) on that thread
+        self._lock = threading.Lock()
+
+    # ---- Lifecycle ----
+    def start(self):
+        """Open the device once; later calls are no-ops"""
+        with self._lock:
+            if self.backend is not None:
+                return self
+            for name in ((self.requested,) if self.requested else ("miniaudio", "pygame", "pydub")):
+                try:
+                    getattr(self, f"_open_{name}")()
+                except Exception as e:
+                    print(f"[Audio] {name} output unavailable: {e}")
+                    continue
+                self.backend = name
+                print(f"[Audio] ✓ Output open ({name}, {self.sample_rate} Hz)")
+                break
+            else:
+                self.backend = "none"
+        return self
+
+    def _open_miniaudio(self):
+        if not MINIAUDIO_AVAILABLE:
+            raise RuntimeError("miniaudio is not installed")
+        self._player = StreamPlayer(self.sample_rate, self.channels).start()
+
+    def _open_pygame(self):
+        import pygame
+        pygame.mixer.init(frequency=self.sample_rate, size=-16, channels=self.channels)
+        self._mixer = pygame.mixer
+        self._start_thread()
+
+    def _open_pydub(self):
+        from pydub.playback import play  # noqa: F401  (checked once, used on the playback thread)
+        self._start_thread()
+
+    def _start_thread(self):
+        self._jobs = queue.Queue()
+        threading.Thread(target=self._run_jobs, name="jarvis-audio", daemon=True).start()
+
+    def close(self):
+        self.stop()
+        if self._player is not None:
+            self._player.close()
+        if self._jobs is not None:
+            self._jobs.put(None)
+
+    @property
+    def streaming(self):
+        """True if audio can start before the whole file has arrived"""
+        return self.start().backend == "miniaudio"
+
+    # ---- Playback ----
+    def open_stream(self, format="mp3", hold=False):
+        """
+        Queued AudioStream to feed() as audio arrives, or None if not streaming.
+        With hold=True it stays silent (holding up the queue) until release().
+        """
+        if not self.streaming:
+            return None
+        return self._player.play(AudioStream(format=format, hold=hold))
+
+    def play(self, audio, format="mp3", sample_rate=None, channels=None):
+        """Queue complete in-memory audio; returns its Playback"""
+        if format not in FORMATS:
+            raise ValueError(f"unsupported audio format: {format}")
+        self.start()
+        buffer = as_buffer(audio)
+        if self.backend == "miniaudio":
+            if format == "pcm":
+                pcm = self._convert_pcm(buffer, sample_rate or self.sample_rate, channels or self.channels)
+                return self._player.play(PcmPlayback(pcm, self.channels))
+            return self._player.play(AudioStream.from_bytes(buffer, format))
+
+        playback = Playback()
+        if self._jobs is None or not len(buffer):
+            playback.cancel()
+            return playback
+        if format == "pcm" and ((sample_rate or self.sample_rate), (channels or self.channels)) != (self.sample_rate, self.channels):
+            raise ValueError("PCM must match the output format without miniaudio")
+        self._jobs.put((playback, bytes(buffer), format))
+        return playback
+
+    def _convert_pcm(self, pcm, sample_rate, channels):
+        if (sample_rate, channels) == (self.sample_rate, self.channels):
+            return pcm
+        import miniaudio
+        converted = miniaudio.convert_frames(
+            miniaudio.SampleFormat.SIGNED16, channels, sample_rate, bytes(pcm),
+            miniaudio.SampleFormat.SIGNED16, self.channels, self.sample_rate,
+        )
+        return memoryview(converted)
+
+    def stop(self):
+        """Cancel what is playing and everything queued"""
+        if self._player is not None:
+            self._player.stop()
+        if self._jobs is not None:
+            while True:
+                try:
+                    job = self._jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is not None:
+                    job[0].cancel()
+            current = self._current
+            if current is not None:
+                current[0].cancel()
+                if current[1] is not None:
+                    current[1].stop()
+
+    # ---- pygame / pydub playback thread ----
+    def _run_jobs(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                return
+            playback, data, format = job
+            if playback.cancelled:
+                continue
+            try:
+                if self._mixer is not None:
+                    self._play_pygame(playback, data, format)
+                else:
+                    self._play_pydub(data, format)
+            except Exception as e:
+                print(f"[Audio] Playback failed: {e}")
+            finally:
+                self._current = None
+                playback.finish_playback()
+
+    def _play_pygame(self, playback, data, format):
+        if format == "pcm":
+            sound = self._mixer.Sound(buffer=data)
+        else:
+            sound = self._mixer.Sound(file=io.BytesIO(data))
+        channel = sound.play()
+        self._current = (playback, channel)
+        # Sleeps for the clip's length; stop() wakes it early through the event
+        playback.done.wait(sound.get_length())
+        if playback.cancelled and channel is not None:
+            channel.stop()
+
+    def _play_pydub(self, data, format):
+        from pydub import AudioSegment
+        from pydub.playback import play
+        if format == "pcm":
+            segment = AudioSegment(data=data, sample_width=2, frame_rate=self.sample_rate, channels=self.channels)
+        else:
+            segment = AudioSegment.from_file(io.BytesIO(data), format=format)
+        play(segment)
+
+
+_output = None
+_output_lock = threading.Lock()
+
+
+def get_audio_output(**options):
+    """The shared AudioOutput, opened on first use"""
+    global _output
+    with _output_lock:
+        if _output is None:
+            _output = AudioOutput(**options).start()
+            atexit.register(_output.close)     # The device thread would hold up exit
+        return _output
@@ -0,0 +1,403 @@
+"""
+Streaming Audio Playback
+- Plays TTS audio while it is still arriving (edge-tts Communicate.stream() chunks)
+- In-memory ring buffer between the network reader and the decoder, no temp files
+- One persistent output device (miniaudio); idle, it plays silence
+- Each utterance is a Playback queued on it: an AudioStream (mp3/wav) or raw PCM
+- Decoding runs on the player's own thread; the device callback only copies
+  decoded PCM and never blocks (an underrun is padded with silence)
+- Completion is signalled (Event + callbacks), never polled
+- Used through the AudioOutput service (core/audio_output.py)
+"""
+
+import array
+import asyncio
+import collections
+import queue
+import threading
+
+try:
+    import miniaudio
+    MINIAUDIO_AVAILABLE = True
+except ImportError:
+    miniaudio = None
+    MINIAUDIO_AVAILABLE = False
+
+SAMPLE_RATE = 24000             # edge-tts default output: 24 kHz mono mp3
+CHANNELS = 1
+RING_CAPACITY = 256 * 1024      # ~40 s of 48 kbit/s mp3
+PCM_SECONDS = 2                 # Decoded audio kept ahead of the device, per stream
+DECODE_FRAMES = 1024
+
+
+class RingBuffer:
+    """
+    Fixed-size byte FIFO shared by one writer and one reader thread.
+
+    write() never blocks (it returns how much fit); read() blocks until
+    the requested bytes are there, the writer closes, or the timeout.
+    """
+
+    def __init__(self, capacity=RING_CAPACITY):
+        self.capacity = capacity
+        self._buf = bytearray(capacity)
+        self._start = 0
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return self._size
+
+    @property
+    def closed(self):
+        return self._closed
+
+    @property
+    def free(self):
+        return self.capacity - self._size
+
+    def write(self, data):
+        """Append as much of data as fits; returns the number of bytes written"""
+        view = memoryview(data)
+        with self._cond:
+            if self._closed:
+                raise ValueError("write to a closed RingBuffer")
+            count = min(len(view), self.capacity - self._size)
+            if count:
+                end = (self._start + self._size) % self.capacity
+                first = min(count, self.capacity - end)
+                self._buf[end:end + first] = view[:first]
+                if count > first:
+                    self._buf[:count - first] = view[first:count]
+                self._size += count
+                self._cond.notify_all()
+            return count
+
+    def read(self, size, timeout=None):
+        """
+        Up to size bytes; fewer only once closed or timed out (b"" = end).
+        timeout=0 never waits: whatever is buffered now.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._size >= size or self._closed, timeout)
+            count = min(size, self._size)
+            first = min(count, self.capacity - self._start)
+            out = bytes(self._buf[self._start:self._start + first])
+            if count > first:
+                out += bytes(self._buf[:count - first])
+            self._start = (self._start + count) % self.capacity
+            self._size -= count
+            self._cond.notify_all()
+            return out
+
+    def wait_for_space(self, timeout=None):
+        with self._cond:
+            return self._cond.wait_for(lambda: self._size < self.capacity or self._closed, timeout)
+
+    def close(self):
+        """No more writes; the reader drains what is left, then sees the end"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class Playback:
+    """
+    Handle for one queued piece of audio.
+
+    `done` is set once it played out or was cancelled; callbacks added
+    with add_done_callback() run on the audio thread at that moment.
+    """
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.cancelled = False
+        self._callbacks = []
+        self._cb_lock = threading.Lock()
+
+    def add_done_callback(self, fn):
+        with self._cb_lock:
+            if not self.done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def finish_playback(self):
+        """Mark as played (called by the output backend)"""
+        with self._cb_lock:
+            if self.done.is_set():
+                return
+            self.done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn(self)
+            except Exception:
+                pass        # e.g. the waiting event loop has already closed
+
+    def cancel(self):
+        self.cancelled = True
+        self.finish_playback()
+
+    def decode(self, player):
+        """Produce PCM ahead of playback (player's decoder thread; may block)"""
+
+    def take(self, size):
+        """Up to size bytes of PCM that are ready now (audio thread; never blocks)"""
+        return b""
+
+    def drained(self):
+        """True once every PCM byte has been taken"""
+        return True
+
+    def wait(self, timeout=None):
+        """Block until done; True if it played out"""
+        self.done.wait(timeout)
+        return self.done.is_set() and not self.cancelled
+
+    async def wait_async(self):
+        """Await completion from an event loop; True if it played out"""
+        if not self.done.is_set():
+            loop = asyncio.get_running_loop()
+            finished = loop.create_future()
+
+            def wake(_):
+                loop.call_soon_threadsafe(lambda: finished.done() or finished.set_result(None))
+
+            self.add_done_callback(wake)
+            await finished
+        return not self.cancelled
+
+
+class PcmPlayback(Playback):
+    """Raw signed 16-bit PCM already in the device's format"""
+
+    def __init__(self, pcm, channels=CHANNELS):
+        super().__init__()
+        self.pcm = memoryview(pcm).cast("B")
+        self.channels = channels
+        self._offset = 0
+
+    def take(self, size):
+        chunk = self.pcm[self._offset:self._offset + size]
+        self._offset += len(chunk)
+        return chunk
+
+    def drained(self):
+        return self._offset >= len(self.pcm)
+
+
+_SourceBase = miniaudio.StreamableSource if MINIAUDIO_AVAILABLE else object
+
+
+class AudioStream(Playback, _SourceBase):
+    """
+    One utterance of encoded audio (mp3 by default) on its way to the player.
+
+    The producer feed()s chunks and finish()es; the player's decoder
+    thread read()s them from the ring buffer and queues PCM for the device.
+    A stalled producer must cancel() the stream: the decoder waits for it.
+    A held stream decodes ahead but stays silent until release().
+    """
+
+    def __init__(self, capacity=RING_CAPACITY, format="mp3", hold=False):
+        Playback.__init__(self)
+        self.buffer = RingBuffer(capacity)
+        self.pcm = None             # Decoded PCM, created by decode()
+        self.format = format
+        self.received = 0           # Encoded bytes fed so far
+        self.held = hold
+
+    @classmethod
+    def from_bytes(cls, audio, format="mp3"):
+        """A finished stream holding a complete encoded file (bytes/memoryview)"""
+        stream = cls(capacity=max(len(audio), 1), format=format)
+        stream.buffer.write(audio)
+        stream.finish()
+        return stream
+
+    def feed(self, data):
+        """Write a whole chunk, blocking while the decoder catches up (dropped once cancelled)"""
+        view = memoryview(data)
+        while view and not self.cancelled:
+            try:
+                written = self.buffer.write(view)
+            except ValueError:
+                return          # Cancelled (buffer closed) mid-write
+            view = view[written:]
+            if view:
+                self.buffer.wait_for_space(0.1)
+        self.received += len(data)
+
+    async def feed_async(self, data):
+        """feed() for the event loop: only leaves the loop when the buffer is full"""
+        if len(data) <= self.buffer.free:
+            self.feed(data)
+        else:
+            await asyncio.to_thread(self.feed, data)
+
+    def finish(self):
+        self.buffer.close()
+
+    def release(self):
+        """Let a held stream play (from any thread)"""
+        self.held = False
+
+    def cancel(self):
+        self.cancelled = True
+        self.buffer.close()
+        if self.pcm is not None:
+            self.pcm.close()
+        self.finish_playback()
+
+    def decode(self, player):
+        """Decode into a PCM ring, blocking on the producer and on free space"""
+        self.pcm = RingBuffer(player.sample_rate * player.channels * 2 * PCM_SECONDS)
+        if self.cancelled:
+            self.pcm.close()
+            return
+        file_format = miniaudio.FileFormat.WAV if self.format == "wav" else miniaudio.FileFormat.MP3
+        try:
+            samples = miniaudio.stream_any(
+                self, file_format,
+                output_format=miniaudio.SampleFormat.SIGNED16,
+                nchannels=player.channels, sample_rate=player.sample_rate,
+                frames_to_read=DECODE_FRAMES,
+            )
+            for chunk in samples:
+                view = memoryview(chunk).cast("B")
+                while view:
+                    view = view[self.pcm.write(view):]
+                    if view:
+                        self.pcm.wait_for_space()
+        except ValueError:
+            pass            # Cancelled (PCM ring closed) mid-write
+        except miniaudio.DecodeError as e:
+            if not self.cancelled:
+                print(f"[Audio] Decode failed: {e}")
+        finally:
+            self.pcm.close()
+
+    def take(self, size):
+        pcm = self.pcm
+        return pcm.read(size, 0) if pcm is not None and not self.held else b""
+
+    def drained(self):
+        pcm = self.pcm
+        return pcm is not None and not self.held and pcm.closed and not len(pcm)
+
+    # miniaudio StreamableSource protocol (called on the decoder thread)
+    def read(self, num_bytes):
+        if self.cancelled:
+            return b""
+        return self.buffer.read(num_bytes)
+
+    def seek(self, offset, origin):
+        return False
+
+
+class StreamPlayer:
+    """
+    Persistent output device for Playbacks.
+
+        player = StreamPlayer().start()
+        stream = player.play(AudioStream())      # queued; starts on its first bytes
+        stream.feed(chunk) ... stream.finish()
+        await stream.wait_async()
+
+    Playbacks play one after another in the order they were queued. The
+    decoder thread works through them in the same order; the device
+    callback only takes PCM that is already decoded.
+    """
+
+    def __init__(self, sample_rate=SAMPLE_RATE, channels=CHANNELS, buffer_msec=120):
+        if not MINIAUDIO_AVAILABLE:
+            raise RuntimeError("miniaudio is not installed")
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.buffer_msec = buffer_msec
+        self._queue = collections.deque()
+        self._decode = queue.Queue()
+        self._current = None            # Playback the device is taking PCM from
+        self._device = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._device is None:
+                threading.Thread(target=self._run_decoder, name="jarvis-decoder", daemon=True).start()
+                device = miniaudio.PlaybackDevice(
+                    output_format=miniaudio.SampleFormat.SIGNED16,
+                    nchannels=self.channels,
+                    sample_rate=self.sample_rate,
+                    buffersize_msec=self.buffer_msec,
+                    app_name="Jarvis",
+                )
+                generator = self._mix()
+                next(generator)
+                device.start(generator)
+                self._device = device
+        return self
+
+    def play(self, playback):
+        """Queue a Playback; returns it"""
+        self.start()
+        self._queue.append(playback)
+        self._decode.put(playback)
+        return playback
+
+    def stop(self):
+        """Cancel what is playing and everything queued behind it"""
+        for stream in list(self._queue):
+            stream.cancel()
+        current = self._current
+        if current is not None:
+            current.cancel()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            device, self._device = self._device, None
+        if device is not None:
+            self._decode.put(None)
+            device.close()
+
+    # ---- Decoder thread ----
+    def _run_decoder(self):
+        while True:
+            playback = self._decode.get()
+            if playback is None:
+                return
+            try:
+                playback.decode(self)
+            except Exception as e:
+                print(f"[Audio] Decoder error: {e}")
+                playback.cancel()
+
+    # ---- Audio thread (must never block) ----
+    def _mix(self):
+        required = yield b""
+        while True:
+            required = yield self._next_samples(required)
+
+    def _next_samples(self, frames):
+        wanted = frames * self.channels * 2
+        out = bytearray()
+        while len(out) < wanted:
+            if self._current is None:
+                if not self._queue:
+                    break
+                self._current = self._queue.popleft()
+            playback = self._current
+            if not playback.cancelled:
+                out += playback.take(wanted - len(out))
+                if len(out) == wanted:
+                    break
+                if not playback.drained():
+                    break       # Underrun: the rest is silence, resume next callback
+            self._current = None
+            playback.finish_playback()
+        if len(out) < wanted:
+            out += bytes(wanted - len(out))
+        return array.array("h", out)
@@ -0,0 +1,55 @@
+"""
+Native Module Builder (Linux / macOS)
+- acceleration.so: ctypes library used by c_accel (same source as the Windows DLL)
+- _textkernel<EXT_SUFFIX>: CPython extension for zero-copy preprocessing
+- Uses the compiler and flags Python itself was built with (sysconfig)
+- Windows keeps using compile_c_module.bat
+
+    python -m core.build_accel
+"""
+
+import os
+import shlex
+import subprocess
+import sys
+import sysconfig
+from pathlib import Path
+
+CORE_DIR = Path(__file__).parent
+
+
+def _compiler():
+    cc = os.environ.get("CC") or sysconfig.get_config_var("CC") or "cc"
+    return shlex.split(cc)
+
+
+def _run(cmd):
+    print("[Build] " + " ".join(cmd))
+    return subprocess.run(cmd, cwd=str(CORE_DIR)).returncode == 0
+
+
+def build_library():
+    """acceleration.c -> acceleration.so (ctypes)"""
+    return _run(_compiler() + ["-shared", "-fPIC", "-O3", "-o", "acceleration.so", "acceleration.c"])
+
+
+def build_extension():
+    """_textkernel.c -> CPython extension module"""
+    suffix = sysconfig.get_config_var("EXT_SUFFIX") or ".so"
+    include = sysconfig.get_paths()["include"]
+    cmd = _compiler() + ["-shared", "-fPIC", "-O3", f"-I{include}",
+                         "-o", f"_textkernel{suffix}", "_textkernel.c"]
+    if sys.platform == "darwin":
+        cmd += ["-undefined", "dynamic_lookup"]
+    return _run(cmd)
+
+
+if __name__ == "__main__":
+    if os.name == "nt":
+        print("[Build] On Windows run compile_c_module.bat instead")
+        sys.exit(1)
+    ok_lib = build_library()
+    ok_ext = build_extension()
+    print(f"[Build] acceleration.so: {'OK' if ok_lib else 'FAILED'} | "
+          f"_textkernel: {'OK' if ok_ext else 'FAILED (ctypes path will be used)'}")
+    sys.exit(0 if ok_lib else 1)
@@ -5,18 +5,34 @@ Provides high-performance text processing functions
 
 import ctypes
 import os
+import re
+import threading
 from pathlib import Path
 
 # Load C library
 _lib = None
 _lib_loaded = False
+_lib_attempted = False
+
+# CPython extension (core/_textkernel.c), preferred for preprocessing
+try:
+    from core import _textkernel
+except ImportError:
+    _textkernel = None
+
+# Per-thread output buffer for c_preprocess_into (grown on demand, never freed by C)
+_buffers = threading.local()
+
+_STRIP_RE = re.compile(rb'[^A-Za-z0-9 ]')
 
 def _load_library():
     """Lazy load C library"""
-    global _lib, _lib_loaded
+    global _lib, _lib_loaded, _lib_attempted
     
-    if _lib_loaded:
+    # Only try once: the hot path calls this for every utterance
+    if _lib_loaded or _lib_attempted:
         return _lib
+    _lib_attempted = True
     
     core_dir = Path(__file__).parent
     lib_name = "acceleration.so" if os.name != "nt" else "acceleration.dll"
@@ -27,7 +43,8 @@ def _load_library():
         
         # Configure function signatures
         _lib.c_preprocess_text.argtypes = [ctypes.c_char_p]
-        _lib.c_preprocess_text.restype = ctypes.c_char_p
+        # Raw pointer: a c_char_p restype copies into bytes and loses the malloc'd address
+        _lib.c_preprocess_text.restype = ctypes.c_void_p
         
         _lib.c_contains_keyword.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
         _lib.c_contains_keyword.restype = ctypes.c_int
@@ -35,12 +52,42 @@ def _load_library():
         _lib.c_edit_distance.argtypes = [ctypes.c_char_p, ctypes.c_char_p]
         _lib.c_edit_distance.restype = ctypes.c_int
         
+        _lib.c_edit_distance_bounded.argtypes = [ctypes.c_char_p, ctypes.c_char_p, ctypes.c_int]
+        _lib.c_edit_distance_bounded.restype = ctypes.c_int
+        
+        _lib.c_edit_distance_many.argtypes = [
+            ctypes.c_char_p, ctypes.POINTER(ctypes.c_char_p), ctypes.c_int, ctypes.c_int,
+            ctypes.POINTER(ctypes.c_int)
+        ]
+        _lib.c_edit_distance_many.restype = ctypes.c_int
+        
         _lib.c_get_timestamp.argtypes = []
         _lib.c_get_timestamp.restype = ctypes.c_long
         
-        _lib.c_free_string.argtypes = [ctypes.c_char_p]
+        _lib.c_free_string.argtypes = [ctypes.c_void_p]
         _lib.c_free_string.restype = None
         
+        _lib.c_preprocess_into.argtypes = [
+            ctypes.c_char_p, ctypes.c_size_t, ctypes.POINTER(ctypes.c_char), ctypes.c_size_t
+        ]
+        _lib.c_preprocess_into.restype = ctypes.c_long
+        
+        _lib.c_preprocess_batch.argtypes = [
+            ctypes.POINTER(ctypes.c_char_p), ctypes.POINTER(ctypes.c_size_t), ctypes.c_int,
+            ctypes.POINTER(ctypes.c_char), ctypes.c_size_t, ctypes.POINTER(ctypes.c_size_t)
+        ]
+        _lib.c_preprocess_batch.restype = ctypes.c_long
+        
+        _lib.c_contains_any_keyword.argtypes = [
+            ctypes.c_char_p, ctypes.POINTER(ctypes.c_char_p), ctypes.c_int
+        ]
+        _lib.c_contains_any_keyword.restype = ctypes.c_int
+        
+        _lib.c_find_closest_match.argtypes = [
+            ctypes.c_char_p, ctypes.POINTER(ctypes.c_char_p), ctypes.c_int, ctypes.c_int
+        ]
+        _lib.c_find_closest_match.restype = ctypes.c_int
+        
         _lib_loaded = True
         print("[C Accel] ✓ Native acceleration loaded")
         
@@ -52,29 +99,80 @@ def _load_library():
     
     return _lib
 
+def _output_buffer(size):
+    buf = getattr(_buffers, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = _buffers.buf = ctypes.create_string_buffer(max(size, 256))
+    return buf
+
+def _py_preprocess(data):
+    """Pure Python twin of the C kernel (bytes in, str out)"""
+    return _STRIP_RE.sub(b'', data).lower().decode('ascii')
+
 def preprocess_text(text):
     """
     Fast text preprocessing (C implementation)
-    - Lowercase conversion
-    - Special character removal
-    - Whitespace normalization
+    - Lowercase conversion (ASCII)
+    - Keeps only letters, digits and spaces
     
-    Falls back to Python if C lib unavailable
+    Uses the _textkernel extension when built, else the ctypes library
+    writing into a reused caller-owned buffer, else pure Python.
+    All three give identical results.
     """
+    if not text:
+        return ""
+    
+    if _textkernel is not None:
+        return _textkernel.preprocess(text)
+    
+    data = text.encode('utf-8')
     lib = _load_library()
     
-    if lib and text:
+    if lib:
         try:
-            result = lib.c_preprocess_text(text.encode('utf-8'))
-            processed = result.decode('utf-8')
-            lib.c_free_string(result)
-            return processed
+            buf = _output_buffer(len(data))
+            n = lib.c_preprocess_into(data, len(data), buf, len(buf))
+            if n >= 0:
+                return buf.raw[:n].decode('ascii')
         except:
             pass
     
     # Fallback: Pure Python
-    import re
-    return re.sub(r'[^a-z0-9\s]', '', text.lower()).strip()
+    return _py_preprocess(data)
+
+def preprocess_batch(texts):
+    """preprocess_text over a list of strings in one native call"""
+    texts = list(texts)
+    if not texts:
+        return []
+    
+    if _textkernel is not None:
+        return _textkernel.preprocess_batch(texts)
+    
+    encoded = [t.encode('utf-8') for t in texts]
+    lib = _load_library()
+    
+    if lib:
+        try:
+            count = len(encoded)
+            inputs = (ctypes.c_char_p * count)(*encoded)
+            lengths = (ctypes.c_size_t * count)(*map(len, encoded))
+            out_lengths = (ctypes.c_size_t * count)()
+            buf = _output_buffer(sum(lengths))
+            total = lib.c_preprocess_batch(inputs, lengths, count, buf, len(buf), out_lengths)
+            if total >= 0:
+                raw = buf.raw[:total]
+                results = []
+                offset = 0
+                for n in out_lengths:
+                    results.append(raw[offset:offset + n].decode('ascii'))
+                    offset += n
+                return results
+        except:
+            pass
+    
+    # Fallback: Pure Python
+    return [_py_preprocess(data) for data in encoded]
 
 def contains_keyword(text, keyword):
     """
@@ -97,34 +195,208 @@ def contains_keyword(text, keyword):
     # Fallback: Pure Python
     return keyword.lower() in text.lower()
 
-def fuzzy_match(text, target, max_distance=2):
+def edit_distance(text, target, max_distance=None):
     """
-    Fuzzy string matching using Levenshtein distance
-    Useful for voice recognition error tolerance
+    Case-insensitive Levenshtein distance (C implementation)
     
-    Returns True if edit distance <= max_distance
+    With max_distance: banded computation that stops as soon as the
+    distance must exceed it; returns max_distance + 1 in that case.
+    Without: like the C kernel, a length gap over 10 is returned as the distance.
     """
     lib = _load_library()
+    a, b = text.encode('utf-8'), target.encode('utf-8')
     
-    if lib and text and target:
+    if lib:
         try:
-            distance = lib.c_edit_distance(
-                text.encode('utf-8'),
-                target.encode('utf-8')
-            )
-            return distance <= max_distance
+            if max_distance is None:
+                distance = lib.c_edit_distance(a, b)
+            else:
+                distance = lib.c_edit_distance_bounded(a, b, max_distance)
+            if distance >= 0:
+                return distance
         except:
             pass
     
-    # Fallback: Pure Python (simplified)
-    if abs(len(text) - len(target)) > max_distance:
-        return False
+    # Fallback: Pure Python
+    if max_distance is None:
+        return _py_edit_distance(a, b)
+    return _py_bounded_distance(a, b, max_distance)
+
+def fuzzy_match(text, target, max_distance=2):
+    """
+    Fuzzy string matching using Levenshtein distance
+    Useful for voice recognition error tolerance
     
-    # Simple character-by-character comparison
-    differences = sum(1 for a, b in zip(text, target) if a != b)
-    differences += abs(len(text) - len(target))
+    Returns True if edit distance <= max_distance
+    """
+    return edit_distance(text, target, max_distance) <= max_distance
+
+def _py_bounded_distance(s1, s2, k):
+    """
+    Pure Python twin of the C banded distance (bytes in, ASCII case-insensitive)
+    Only diagonals |i - j| <= k are kept; gives up once a whole row exceeds k
+    """
+    over = k + 1
+    if k < 0:
+        return over
+    m, n = len(s1), len(s2)
+    if abs(m - n) > k:
+        return over
+    s1, s2 = s1.lower(), s2.lower()
+    
+    width = 2 * k + 1
+    # Row 0: D[0][j] = j at diagonal d = j - i + k
+    prev = [(d - k) if 0 <= d - k <= n else over for d in range(width)]
+    for i in range(1, m + 1):
+        ca = s1[i - 1]
+        cur = [over] * width
+        row_min = over
+        for d in range(width):
+            j = i + d - k
+            if j < 0 or j > n:
+                continue
+            if j == 0:
+                v = i
+            else:
+                v = prev[d] + (ca != s2[j - 1])
+                if d + 1 < width and prev[d + 1] + 1 < v:
+                    v = prev[d + 1] + 1
+                if d > 0 and cur[d - 1] + 1 < v:
+                    v = cur[d - 1] + 1
+            if v > over:
+                v = over
+            cur[d] = v
+            if v < row_min:
+                row_min = v
+        if row_min > k:
+            return over
+        prev = cur
+    
+    result = prev[n - m + k]
+    return over if result > k else result
+
+def _py_edit_distance(s1, s2):
+    """
+    Pure Python twin of c_edit_distance (bytes in, ASCII case-insensitive)
+    Keeps the C shortcut: a length gap over 10 is returned as the distance
+    """
+    gap = abs(len(s1) - len(s2))
+    if gap > 10:
+        return gap
+    return _py_bounded_distance(s1, s2, max(len(s1), len(s2)))
+
+class KeywordTable:
+    """
+    Prepared keyword / option table for batch matching
+    - Keywords are encoded once; the char** array stays alive on the instance
+    - find_any(): first keyword (table order) contained in the text
+    - find_closest(): option with the smallest edit distance to the text
+    - distances() / closest_matches(): one text against every option (banded)
+    - Each lookup is a single native call; identical pure-Python fallback
+    
+        table = KeywordTable(["what time", "weather"])
+        table.find_any("jarvis what's the weather")   # -> 1
+    """
     
-    return differences <= max_distance
+    def __init__(self, keywords):
+        self.keywords = tuple(keywords)
+        self._encoded = [k.encode('utf-8') for k in self.keywords]
+        self._lowered = [k.lower() for k in self._encoded]
+        self._lib = _load_library()
+        self._array = None
+        if self._lib:
+            # ctypes keeps references to the bytes objects, so the pointers stay valid
+            self._array = (ctypes.c_char_p * len(self._encoded))(*self._encoded)
+    
+    def __len__(self):
+        return len(self.keywords)
+    
+    def find_any(self, text):
+        """Index of the first keyword found in text (case-insensitive), or -1"""
+        if not text or not self.keywords:
+            return -1
+        data = text.encode('utf-8')
+        
+        if self._array is not None:
+            try:
+                return self._lib.c_contains_any_keyword(data, self._array, len(self._encoded))
+            except Exception:
+                pass
+        
+        # Fallback: Pure Python
+        data = data.lower()
+        for index, keyword in enumerate(self._lowered):
+            if keyword in data:
+                return index
+        return -1
+    
+    def find_closest(self, text, max_distance=2):
+        """Index of the closest option within max_distance edits, or -1"""
+        if text is None or not self.keywords:
+            return -1
+        data = text.encode('utf-8')
+        
+        if self._array is not None:
+            try:
+                return self._lib.c_find_closest_match(
+                    data, self._array, len(self._encoded), max_distance
+                )
+            except Exception:
+                pass
+        
+        # Fallback: Pure Python (first option wins ties, band shrinks like the C loop)
+        best_index = -1
+        best_distance = max_distance + 1
+        for index, option in enumerate(self._encoded):
+            if best_distance <= 0:
+                break
+            distance = _py_bounded_distance(data, option, best_distance - 1)
+            if distance < best_distance:
+                best_distance = distance
+                best_index = index
+        return best_index
+    
+    def distances(self, text, max_distance=2):
+        """
+        Distance from text to every option in one call;
+        options further than max_distance report max_distance + 1
+        """
+        if text is None or not self.keywords:
+            return []
+        data = text.encode('utf-8')
+        
+        if self._array is not None:
+            try:
+                out = (ctypes.c_int * len(self._encoded))()
+                if self._lib.c_edit_distance_many(
+                    data, self._array, len(self._encoded), max_distance, out
+                ) >= 0:
+                    return list(out)
+            except Exception:
+                pass
+        
+        # Fallback: Pure Python
+        return [_py_bounded_distance(data, option, max_distance) for option in self._encoded]
+    
+    def closest_matches(self, text, max_distance=2, limit=None):
+        """[(keyword, distance)] within max_distance, nearest first (ties keep table order)"""
+        ranked = sorted(
+            (distance, index) for index, distance in enumerate(self.distances(text, max_distance))
+            if 0 <= distance <= max_distance
+        )
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [(self.keywords[index], distance) for distance, index in ranked]
+    
+    def match_any(self, text):
+        """First keyword found in text, or None"""
+        index = self.find_any(text)
+        return self.keywords[index] if index >= 0 else None
+    
+    def closest(self, text, max_distance=2):
+        """Closest option to text, or None"""
+        index = self.find_closest(text, max_distance)
+        return self.keywords[index] if index >= 0 else None
 
 def get_timestamp_ms():
     """
@@ -143,6 +415,13 @@ def get_timestamp_ms():
     import time
     return int(time.time() * 1000)
 
+def closest_matches(text, candidates, max_distance=2, limit=None):
+    """
+    One-off one-against-many lookup: [(candidate, distance)] nearest first.
+    Keep a KeywordTable instead when the candidate list is reused.
+    """
+    return KeywordTable(candidates).closest_matches(text, max_distance, limit)
+
 # Performance benchmarking
 def benchmark_acceleration():
     """Test C acceleration performance vs Python"""
@@ -210,5 +489,9 @@ if __name__ == "__main__":
     fuzzy = fuzzy_match("spotify", "spotfy", max_distance=1)
     print(f"Fuzzy match 'spotify' ~ 'spotfy': {fuzzy}")
     
+    table = KeywordTable(["spotify", "youtube", "music"])
+    print(f"Table match in '{text}': {table.match_any(text)}")
+    print(f"Closest option to 'yutube': {table.closest('yutube')}")
+    
     timestamp = get_timestamp_ms()
     print(f"Timestamp: {timestamp} ms")
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Configuration Service
+- Parses config.json once and serves settings, API keys and contacts from memory
+- Watches the file's mtime/size so external edits are picked up
+- Writes are atomic (temp file + fsync + rename) and never re-read the file
+- Subscribers are notified after every reload or write
+- One shared instance per path (jarvis_main and the legacy core)
+"""
+
+import copy
+import json
+import os
+import threading
+import time
+
+from core.storage import atomic_write
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_config_service(path):
+    """Shared ConfigService for `path`"""
+    path = os.path.abspath(str(path))
+    with _services_lock:
+        if path not in _services:
+            _services[path] = ConfigService(path)
+        return _services[path]
+
+
+def _coerce(value, default):
+    """Convert `value` to the type of `default` (settings edited by hand are often strings)"""
+    if default is None or value is None or isinstance(value, type(default)):
+        return value
+    try:
+        if isinstance(default, bool):
+            if isinstance(value, str):
+                return value.strip().lower() in ("1", "true", "yes", "on")
+            return bool(value)
+        if isinstance(default, (int, float)):
+            return type(default)(value)
+    except (TypeError, ValueError):
+        return default
+    return value
+
+
+class ConfigService:
+    """In-memory view of config.json with change detection"""
+
+    def __init__(self, path, check_interval=1.0):
+        self.path = str(path)
+        self.check_interval = check_interval
+        self._lock = threading.RLock()
+        self._data = None
+        self._signature = None
+        self._last_check = 0.0
+        self._subscribers = []
+
+    # ---- Loading ----
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            return None
+
+    def load(self):
+        """
+        Parse the file (first call) and return the config dict.
+        Raises FileNotFoundError / json.JSONDecodeError like json.load would.
+        """
+        with self._lock:
+            if self._data is None:
+                self._read()
+            return self._data
+
+    def _read(self):
+        signature = self._stat()
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        for section, empty in (("settings", {}), ("api_keys", {}), ("contacts", [])):
+            data.setdefault(section, empty)
+        self._data = data
+        self._signature = signature
+        self._last_check = time.monotonic()
+
+    def reload_if_changed(self, force=False):
+        """Re-parse if the file changed on disk; returns True when it did"""
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_check < self.check_interval:
+                return False
+            self._last_check = now
+            if self._data is None:
+                self._read()
+                return False
+            if self._stat() == self._signature:
+                return False
+            try:
+                self._read()
+            except (OSError, json.JSONDecodeError) as e:
+                # Keep serving the last good config while the file is mid-edit
+                print(f"[Config] ⚠ Failed to reload {self.path}: {e}")
+                return False
+        print("[Config] Reloaded config.json")
+        self._notify()
+        return True
+
+    # ---- Subscribers ----
+    def subscribe(self, callback):
+        """callback(service) runs after every reload or write"""
+        self._subscribers.append(callback)
+        return callback
+
+    def _notify(self):
+        for callback in list(self._subscribers):
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"[Config] Subscriber {getattr(callback, '__name__', callback)} failed: {e}")
+
+    # ---- Accessors ----
+    @property
+    def data(self):
+        self.reload_if_changed()
+        return self.load()
+
+    @property
+    def settings(self):
+        return self.data["settings"]
+
+    @property
+    def api_keys(self):
+        return self.data["api_keys"]
+
+    @property
+    def contacts(self):
+        return self.data["contacts"]
+
+    def get(self, key, default=None):
+        """Setting `key`, converted to the type of `default`"""
+        return _coerce(self.settings.get(key, default), default)
+
+    def snapshot(self):
+        """Deep copy, safe to hand to code that may mutate it"""
+        with self._lock:
+            return copy.deepcopy(self.load())
+
+    # ---- Writing ----
+    def save(self):
+        """Atomically write the in-memory config (after in-place edits)"""
+        with self._lock:
+            payload = json.dumps(self.load(), indent=2).encode("utf-8")
+            atomic_write(self.path, payload)
+            self._signature = self._stat()
+            self._last_check = time.monotonic()
+        self._notify()
+
+    def update(self, section="settings", **values):
+        """Set keys in one section and save"""
+        with self._lock:
+            self.load().setdefault(section, {}).update(values)
+            self.save()
+
+    def set_setting(self, key, value):
+        self.update("settings", **{key: value})
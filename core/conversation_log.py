@@ -0,0 +1,197 @@
+"""
+Conversation Log
+- Append-only JSONL segments, rotated by size
+- Rotated segments optionally gzip-compressed
+- Sparse timestamp index per segment (every Nth entry -> byte offset)
+- "Since <time>" queries bisect segments and index, then read forward
+- Retention by age and/or total bytes instead of a fixed entry count
+"""
+
+import bisect
+import datetime
+import gzip
+import json
+import os
+import shutil
+import threading
+
+
+class _Segment:
+    __slots__ = ("base", "path", "index", "size")
+
+    def __init__(self, base, path, index, size):
+        self.base = base            # Path without extension
+        self.path = path            # .jsonl or .jsonl.gz
+        self.index = index          # [(timestamp, offset)], first entry always present
+        self.size = size            # Bytes on disk
+
+    @property
+    def start(self):
+        return self.index[0][0] if self.index else ""
+
+
+class ConversationLog:
+    """
+    Rotating conversation log under `directory`.
+
+    Segment files are named <seq>.jsonl (or .jsonl.gz once rotated and
+    compressed) with a <seq>.idx sidecar of [timestamp, offset] lines.
+    Offsets always refer to the uncompressed stream.
+    """
+
+    def __init__(self, directory, segment_bytes=256 * 1024, compress=True,
+                 max_age_days=None, max_bytes=None, index_every=32):
+        self.directory = str(directory)
+        self.segment_bytes = segment_bytes
+        self.compress = compress
+        self.max_age_days = max_age_days
+        self.max_bytes = max_bytes
+        self.index_every = index_every
+
+        self._lock = threading.RLock()
+        self._segments = None
+        self._active_count = 0      # Entries written to the active segment
+
+    # ---- Segment bookkeeping ----
+    def _load_segments(self):
+        if self._segments is not None:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        segments = []
+        for name in sorted(os.listdir(self.directory)):
+            if not name.endswith(".idx"):
+                continue
+            base = os.path.join(self.directory, name[:-4])
+            path = base + ".jsonl.gz" if os.path.exists(base + ".jsonl.gz") else base + ".jsonl"
+            if not os.path.exists(path):
+                os.remove(base + ".idx")
+                continue
+            index = []
+            with open(base + ".idx", "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        timestamp, offset = json.loads(line)
+                    except ValueError:
+                        break
+                    index.append((timestamp, offset))
+            segments.append(_Segment(base, path, index, os.path.getsize(path)))
+        self._segments = segments
+
+        active = self._active()
+        if active is not None:
+            # Entries since the last index line are unknown; a full count is cheap once
+            with open(active.path, "rb") as f:
+                self._active_count = sum(1 for _ in f)
+
+    def _active(self):
+        """Last segment, unless it has already been compressed"""
+        if self._segments and self._segments[-1].path.endswith(".jsonl"):
+            return self._segments[-1]
+        return None
+
+    def _new_segment(self):
+        seq = int(os.path.basename(self._segments[-1].base)) + 1 if self._segments else 1
+        base = os.path.join(self.directory, f"{seq:08d}")
+        segment = _Segment(base, base + ".jsonl", [], 0)
+        self._segments.append(segment)
+        self._active_count = 0
+        return segment
+
+    def _rotate(self):
+        segment = self._active()
+        if segment is None:
+            return
+        if self.compress:
+            gz_path = segment.base + ".jsonl.gz"
+            with open(segment.path, "rb") as src, gzip.open(gz_path, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segment.path)
+            segment.path = gz_path
+            segment.size = os.path.getsize(gz_path)
+
+    def _open(self, segment):
+        if segment.path.endswith(".gz"):
+            return gzip.open(segment.path, "rb")
+        return open(segment.path, "rb")
+
+    def _remove_segment(self, segment):
+        for path in (segment.path, segment.base + ".idx"):
+            if os.path.exists(path):
+                os.remove(path)
+        self._segments.remove(segment)
+
+    def _enforce_retention(self):
+        """Drop whole segments, oldest first; the newest segment is always kept"""
+        if self.max_age_days is not None:
+            cutoff = (datetime.datetime.now() - datetime.timedelta(days=self.max_age_days)).isoformat()
+            # A segment has expired once its successor started before the cutoff
+            while len(self._segments) > 1 and self._segments[1].start and self._segments[1].start < cutoff:
+                self._remove_segment(self._segments[0])
+        if self.max_bytes is not None:
+            total = sum(s.size for s in self._segments)
+            while len(self._segments) > 1 and total > self.max_bytes:
+                total -= self._segments[0].size
+                self._remove_segment(self._segments[0])
+
+    # ---- Public API ----
+    def append(self, entry):
+        """Append one entry (must carry an ISO "timestamp")"""
+        self.extend([entry])
+
+    def extend(self, entries):
+        with self._lock:
+            self._load_segments()
+            for entry in entries:
+                segment = self._active()
+                if segment is None or segment.size >= self.segment_bytes:
+                    self._rotate()
+                    segment = self._new_segment()
+                    self._enforce_retention()
+                line = (json.dumps(entry, ensure_ascii=False) + "\n").encode("utf-8")
+                if self._active_count % self.index_every == 0:
+                    segment.index.append((entry["timestamp"], segment.size))
+                    with open(segment.base + ".idx", "a", encoding="utf-8") as f:
+                        f.write(json.dumps([entry["timestamp"], segment.size]) + "\n")
+                with open(segment.path, "ab") as f:
+                    f.write(line)
+                segment.size += len(line)
+                self._active_count += 1
+
+    def since(self, cutoff):
+        """Entries with timestamp >= cutoff (datetime or ISO string), oldest first"""
+        if isinstance(cutoff, datetime.datetime):
+            cutoff = cutoff.isoformat()
+        with self._lock:
+            self._load_segments()
+            starts = [s.start for s in self._segments]
+            first = max(bisect.bisect_right(starts, cutoff) - 1, 0)
+
+            results = []
+            for segment in self._segments[first:]:
+                keys = [timestamp for timestamp, _ in segment.index]
+                pos = bisect.bisect_left(keys, cutoff) - 1
+                offset = segment.index[pos][1] if pos >= 0 else 0
+                with self._open(segment) as f:
+                    f.seek(offset)
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue
+                        if entry.get("timestamp", "") >= cutoff:
+                            results.append(entry)
+            return results
+
+    def recent(self, days=1):
+        return self.since(datetime.datetime.now() - datetime.timedelta(days=days))
+
+    def enforce_retention(self):
+        with self._lock:
+            self._load_segments()
+            self._enforce_retention()
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            self._load_segments()
+            return sum(s.size for s in self._segments)
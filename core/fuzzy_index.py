@@ -0,0 +1,175 @@
+"""
+Fuzzy Command Recovery
+- Last chance for misrecognized commands before the AI fallback
+- SymSpell-style delete dictionary over every intent phrase of an IntentRouter
+- Candidates verified with c_edit_distance (pure Python when not compiled)
+- Spaces and punctuation ignored ("spot if i" ~ "spotify", "checkmic" ~ "check mic")
+- Distance budget grows with phrase length; short phrases must match exactly
+- Rebuilt automatically when the router's intent table changes
+"""
+
+import re
+import threading
+
+from core.c_accel import edit_distance
+from core.utterance import Utterance
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def squash(text):
+    """Phrase key: lowercase letters and digits only"""
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def default_budget(key):
+    """Edits allowed for a phrase key of this length"""
+    if len(key) < 5:
+        return 0
+    if len(key) < 9:
+        return 1
+    return 2
+
+
+def deletes(word, distance):
+    """`word` plus every string reachable by deleting up to `distance` characters"""
+    found = {word}
+    frontier = [word]
+    for _ in range(distance):
+        next_frontier = []
+        for item in frontier:
+            for i in range(len(item)):
+                variant = item[:i] + item[i + 1:]
+                if variant not in found:
+                    found.add(variant)
+                    next_frontier.append(variant)
+        frontier = next_frontier
+    return found
+
+
+class FuzzyMatch:
+    """A recovered command"""
+
+    __slots__ = ("intent", "phrase", "distance", "query", "args")
+
+    def __init__(self, intent, phrase, distance, query, args=()):
+        self.intent = intent
+        self.phrase = phrase
+        self.distance = distance
+        self.query = query          # Utterance with the mangled words replaced by the phrase
+        self.args = args            # Handler arguments parsed from the corrected query
+
+    @property
+    def name(self):
+        return self.intent.name
+
+    def __repr__(self):
+        return f"FuzzyMatch({self.intent.name!r}, {self.phrase!r}, distance={self.distance})"
+
+
+class FuzzyIntentIndex:
+    """
+    Nearest intent phrase for an utterance the router could not match.
+
+        index = FuzzyIntentIndex(COMMAND_ROUTER)
+        found = index.recover("jarvis what's the wheather")
+        # found.query == "jarvis what's the weather"
+
+    Only the first `prefix_length` characters of a key are expanded into
+    deletes (as in SymSpell), which bounds the work per window; every
+    candidate is then checked against the full edit distance.
+    """
+
+    def __init__(self, router, budget=default_budget, prefix_length=7):
+        self.router = router
+        self.budget = budget
+        self.prefix_length = prefix_length
+        self._lock = threading.Lock()
+        self._version = None
+        self._deletes = None        # delete variant of a key prefix -> {key}
+        self._entries = {}          # key -> [(intent, phrase, budget)]
+        self._max_words = 1
+        self._max_budget = 0
+        self._min_len = 0
+        self._max_len = 0
+
+    def _build(self):
+        entries = {}
+        max_words = 1
+        for intent in self.router.intents:
+            for phrase in intent.phrases:
+                key = squash(phrase)
+                if key:
+                    entries.setdefault(key, []).append((intent, phrase, self.budget(key)))
+                    max_words = max(max_words, len(phrase.split()))
+
+        index = {}
+        for key, key_entries in entries.items():
+            allowed = max(entry[2] for entry in key_entries)
+            for variant in deletes(key[:self.prefix_length], allowed):
+                index.setdefault(variant, set()).add(key)
+
+        self._deletes = index
+        self._entries = entries
+        # One extra word so a phrase split by the recognizer still fits a window
+        self._max_words = max_words + 1
+        self._max_budget = max((e[2] for es in entries.values() for e in es), default=0)
+        self._min_len = min(map(len, entries), default=0)
+        self._max_len = max(map(len, entries), default=0)
+        self._version = self.router.version
+
+    def _ensure_built(self):
+        with self._lock:
+            if self._deletes is None or self._version != self.router.version:
+                self._build()
+
+    def _lookup(self, key, seen):
+        """[(distance, entry)] for phrase keys within their budget of `key`"""
+        prefix = key[:self.prefix_length]
+        keys = seen.get(prefix)
+        if keys is None:
+            # Windows from the same start word usually share a prefix
+            keys = seen[prefix] = set()
+            for variant in deletes(prefix, self._max_budget):
+                keys.update(self._deletes.get(variant, ()))
+        hits = []
+        for candidate in keys:
+            if abs(len(candidate) - len(key)) > self._max_budget:
+                continue
+            distance = 0 if candidate == key else edit_distance(key, candidate, self._max_budget)
+            for entry in self._entries[candidate]:
+                if distance <= entry[2]:
+                    hits.append((distance, entry))
+        return hits
+
+    def candidates(self, query):
+        """All fuzzy matches, best first (fewest edits, then widest window, then longest phrase)"""
+        self._ensure_built()
+        if isinstance(query, Utterance):
+            words = list(query.tokens)
+        else:
+            words = _WORD_RE.findall(query.lower())
+        found = []
+        seen = {}
+        for start in range(len(words)):
+            for end in range(start + 1, min(start + self._max_words, len(words)) + 1):
+                key = "".join(words[start:end])
+                if len(key) > self._max_len + self._max_budget:
+                    break
+                if len(key) < self._min_len - self._max_budget:
+                    continue
+                for distance, (intent, phrase, _) in self._lookup(key, seen):
+                    corrected = " ".join(words[:start] + [phrase] + words[end:])
+                    found.append((distance, start - end, -len(phrase), -intent.priority, start,
+                                  FuzzyMatch(intent, phrase, distance, corrected)))
+        found.sort(key=lambda item: item[:5])
+        return [item[-1] for item in found]
+
+    def recover(self, query):
+        """Best fuzzy match whose corrected utterance the intent accepts, or None"""
+        for candidate in self.candidates(query):
+            guard = candidate.intent.guard
+            if guard is None or guard(candidate.query):
+                candidate.args = candidate.intent.parse(candidate.query)
+                return candidate
+        return None
@@ -0,0 +1,188 @@
+"""
+Command Handler Registry
+- One table of command handlers shared by the legacy core and jarvis_main
+- Intents (trigger phrases) come from an IntentRouter; handlers keyed by intent name
+- Each handler is marked blocking or async (detected from the function)
+- Async dispatch awaits async handlers and runs blocking ones on a bounded executor
+- Optional fuzzy recovery before giving up on an utterance
+- Routing decisions memoized in an LRU IntentCache; arguments parsed per call
+"""
+
+import asyncio
+import inspect
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from core.intent_cache import IntentCache
+from core.intent_router import IntentMatch
+from core.utterance import normalize
+
+
+class Handler:
+    """A callable registered for one intent"""
+
+    __slots__ = ("name", "func", "blocking")
+
+    def __init__(self, name, func, blocking=None):
+        self.name = name
+        self.func = func
+        if blocking is None:
+            blocking = not inspect.iscoroutinefunction(func)
+        self.blocking = blocking
+
+    def __repr__(self):
+        kind = "blocking" if self.blocking else "async"
+        return f"Handler({self.name!r}, {kind})"
+
+
+class HandlerRegistry:
+    """
+    Dispatches utterances to intent handlers from sync or async code.
+
+        registry = HandlerRegistry(COMMAND_ROUTER, fuzzy=COMMAND_FUZZY)
+        registry.register("time", tell_time_async)      # async override
+        match, result = await registry.dispatch(query)
+
+    An intent's own `handler` is used unless one was registered for its
+    name; registered handlers let the async core replace a blocking legacy
+    handler without touching the intent table. `wrap(func, query, intent)`
+    runs around every blocking call on the worker thread (the legacy core
+    reloads its config there and opens a data transaction unless
+    `intent.prompts`).
+
+    Handlers are called as handler(query, *match.args), the groups of the
+    intent's argument pattern. Routing decisions are cached per utterance
+    text and `guard_state()`, a snapshot of whatever the guards read besides
+    the query (cache_size=0 disables the cache); a cache hit is rebuilt
+    around the caller's own utterance, arguments included.
+    """
+
+    def __init__(self, router, fuzzy=None, max_workers=4, wrap=None, cache_size=256, guard_state=None):
+        self.router = router
+        self.fuzzy = fuzzy
+        self.max_workers = max_workers
+        self.wrap = wrap
+        self.cache = IntentCache(router, cache_size, guard_state) if cache_size else None
+        self._handlers = {}
+        self._executor = None
+        self._lock = threading.Lock()
+
+    # ---- Registration ----
+    def register(self, name, func, blocking=None):
+        """Handle intent `name` with `func` (overrides the intent's own handler)"""
+        handler = Handler(name, func, blocking)
+        self._handlers[name] = handler
+        return handler
+
+    def handler(self, name, blocking=None):
+        """Decorator form of register()"""
+        def decorator(func):
+            self.register(name, func, blocking)
+            return func
+        return decorator
+
+    def resolve(self, intent):
+        """Handler for an intent, or None"""
+        handler = self._handlers.get(intent.name)
+        if handler is not None:
+            return handler
+        if intent.handler is None:
+            return None
+        return Handler(intent.name, intent.handler)
+
+    def handlers(self):
+        """{intent name: Handler} for every routable intent"""
+        table = {}
+        for intent in self.router.intents:
+            handler = self.resolve(intent)
+            if handler is not None:
+                table[intent.name] = handler
+        return table
+
+    # ---- Matching ----
+    def match(self, query):
+        """(match, utterance) for the best intent, trying fuzzy recovery last"""
+        utterance = normalize(query)
+        if self.cache is None:
+            return self._match(utterance)
+        key = str(utterance)
+        decision = self.cache.get(key)
+        if decision is not None:
+            return self._replay(decision, utterance)
+        version = self.cache.version()
+        found, routed = self._match(utterance)
+        # Only the decision is kept: (match, corrected text or None)
+        self.cache.put(key, (found, None if routed is utterance else str(routed)), version)
+        return found, routed
+
+    @staticmethod
+    def _replay(decision, utterance):
+        found, corrected = decision
+        if found is None:
+            return None, utterance
+        if corrected is not None:
+            # Fuzzy recovery: the corrected text depends on the cache key alone
+            return found, normalize(corrected)
+        args = found.intent.parse(utterance)
+        return IntentMatch(found.intent, found.phrase, found.start, found.end, args), utterance
+
+    def _match(self, utterance):
+        found = self.router.match(utterance)
+        if found is None and self.fuzzy is not None:
+            recovered = self.fuzzy.recover(utterance)
+            if recovered is not None:
+                print(f"[Router] Recovered '{utterance}' -> '{recovered.query}' ({recovered.name})")
+                return recovered, normalize(recovered.query)
+        return found, utterance
+
+    def cache_stats(self):
+        """Intent cache counters, or None when caching is off"""
+        return self.cache.stats() if self.cache is not None else None
+
+    # ---- Dispatch ----
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="jarvis-handler"
+                )
+            return self._executor
+
+    def call(self, found, utterance, *args, **kwargs):
+        """Run the intent's own handler synchronously (the legacy command loop)"""
+        handler = found.intent.handler
+        if handler is None:
+            return None
+        return handler(utterance, *found.args, *args, **kwargs)
+
+    def _call_blocking(self, func, query, intent, args, kwargs):
+        if self.wrap is not None:
+            return self.wrap(lambda q: func(q, *args, **kwargs), query, intent)
+        return func(query, *args, **kwargs)
+
+    async def run(self, found, utterance, *args, **kwargs):
+        """Run the handler for an earlier match() result"""
+        handler = self.resolve(found.intent)
+        if handler is None:
+            return None
+        args = found.args + args
+        if not handler.blocking:
+            return await handler.func(utterance, *args, **kwargs)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._get_executor(), self._call_blocking, handler.func, utterance,
+            found.intent, args, kwargs
+        )
+
+    async def dispatch(self, query, *args, **kwargs):
+        """Route and run; returns (match, result) or (None, None) when nothing matches"""
+        found, utterance = self.match(query)
+        if found is None:
+            return None, None
+        return found, await self.run(found, utterance, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
@@ -0,0 +1,101 @@
+"""
+Intent Cache
+- Bounded LRU from utterance text to its routing decision
+- Repeated commands ("what time is it", "list habits") skip routing entirely
+- Negative results are kept too, so the AI fallback skips fuzzy recovery
+- Cleared whenever the intent table changes (IntentRouter.version) or the
+  state the guards read does (state(), e.g. whether an app manager is loaded)
+- Hit/miss/eviction counters for the status report and the routing benchmark
+"""
+
+import threading
+from collections import OrderedDict
+
+
+class IntentCache:
+    """
+    LRU memo of HandlerRegistry.match() results.
+
+        cache = IntentCache(router, maxsize=256, state=lambda: APP_MANAGER is not None)
+        entry = cache.get("what time is it")     # None on a miss
+        cache.put("what time is it", (match, None))
+
+    Keys are the lowercased utterance text, the same string the router
+    scans, so two utterances share an entry only if they route alike.
+    Guards must depend on the query and on what `state()` returns (a
+    hashable snapshot of every global they read) for cached decisions to hold.
+    Values hold no Utterance: anything case-sensitive (the original text,
+    arguments) is taken from the current call on every hit.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, router, maxsize=256, state=None):
+        self.router = router
+        self.maxsize = maxsize
+        self.state = state
+        self._entries = OrderedDict()
+        self._version = self.version()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def version(self):
+        """Token for the table and guard state decisions are computed against"""
+        return (self.router.version, self.state() if self.state is not None else None)
+
+    def _check_version(self):
+        # Caller holds the lock
+        version = self.version()
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key, default=None):
+        """Cached value for key (marked most recently used), or default"""
+        with self._lock:
+            self._check_version()
+            value = self._entries.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value, version=None):
+        """Store value; skipped if it was computed against an older table or state (version())"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._check_version()
+            if version is not None and version != self._version:
+                return
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,214 @@
+"""
+Intent Router
+- Declarative intent table: name, trigger phrases, handler, priority
+- All trigger phrases compiled into one Aho-Corasick automaton
+- One left-to-right scan per utterance, O(len(query) + matches)
+- Whole-word matching ("time" does not fire inside "sometimes")
+- Conflicts resolved by priority, then phrase length, then position
+- Optional guards for phrases shared by several intents ("open")
+- Optional argument pattern per intent; its groups travel with the match
+"""
+
+import re
+import threading
+from collections import deque
+
+from core.utterance import Utterance
+
+
+class Intent:
+    """One routable command"""
+
+    __slots__ = ("name", "phrases", "handler", "priority", "guard", "pattern", "prompts",
+                 "skip_bookkeeping")
+
+    def __init__(self, name, phrases, handler=None, priority=0, guard=None, pattern=None,
+                 prompts=False, skip_bookkeeping=False):
+        self.name = name
+        self.phrases = tuple(p.lower() for p in phrases)
+        self.handler = handler
+        self.priority = priority
+        self.guard = guard          # guard(query) -> bool, checked before accepting a match
+        # Argument regex: its groups are passed to the handler after the query
+        self.pattern = re.compile(pattern, re.IGNORECASE) if isinstance(pattern, str) else pattern
+        # Handler waits on listen() or the LLM: kept out of the command's data
+        # transaction, it commits its own writes
+        self.prompts = prompts
+        # Not logged as a conversation and not counted as an interaction
+        self.skip_bookkeeping = skip_bookkeeping
+
+    def parse(self, query):
+        """
+        Handler arguments for query: the pattern's groups, () without a match.
+        Parsed from an Utterance's original text, so arguments keep their case.
+        """
+        if self.pattern is None:
+            return ()
+        found = self.pattern.search(query.original if isinstance(query, Utterance) else query)
+        return found.groups() if found else ()
+
+    def __repr__(self):
+        return f"Intent({self.name!r}, priority={self.priority})"
+
+
+class IntentMatch:
+    """Result of routing an utterance"""
+
+    __slots__ = ("intent", "phrase", "start", "end", "args")
+
+    def __init__(self, intent, phrase, start, end, args=()):
+        self.intent = intent
+        self.phrase = phrase
+        self.start = start
+        self.end = end
+        self.args = args            # Parsed handler arguments (Intent.parse)
+
+    @property
+    def name(self):
+        return self.intent.name
+
+    def __repr__(self):
+        return f"IntentMatch({self.intent.name!r}, {self.phrase!r}, {self.start})"
+
+
+class AhoCorasick:
+    """Multi-pattern substring automaton (dict-of-dicts goto function)"""
+
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for ch in pattern:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = nxt
+            self._out[state].append(index)
+
+        # Breadth-first failure links; outputs inherit from their fail state
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def iter_matches(self, text):
+        """Yield (pattern_index, end_offset) for every occurrence"""
+        goto, fail, out = self._goto, self._fail, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for index in out[state]:
+                yield index, i + 1
+
+
+def _is_word_char(ch):
+    return ch.isalnum() or ch == "_"
+
+
+class IntentRouter:
+    """
+    Routes an utterance to the best matching intent.
+
+        router = IntentRouter()
+        router.add("time", ["what time", "time"], tell_time)
+        match = router.match("what time is it")
+    """
+
+    def __init__(self, intents=()):
+        self._intents = []
+        self._automaton = None
+        self._lock = threading.Lock()
+        self.version = 0            # Bumped whenever the table changes
+        for intent in intents:
+            self.register(intent)
+
+    def register(self, intent):
+        with self._lock:
+            self._intents.append(intent)
+            self._automaton = None
+            self.version += 1
+        return intent
+
+    def add(self, name, phrases, handler=None, priority=0, guard=None, pattern=None, prompts=False,
+            skip_bookkeeping=False):
+        return self.register(Intent(name, phrases, handler, priority, guard, pattern, prompts, skip_bookkeeping))
+
+    def intent(self, name, phrases, priority=0, guard=None, pattern=None, prompts=False,
+               skip_bookkeeping=False):
+        """Decorator form of add()"""
+        def decorator(handler):
+            self.add(name, phrases, handler, priority, guard, pattern, prompts, skip_bookkeeping)
+            return handler
+        return decorator
+
+    @property
+    def intents(self):
+        return list(self._intents)
+
+    def get(self, name):
+        for intent in self._intents:
+            if intent.name == name:
+                return intent
+        return None
+
+    def _compile(self):
+        with self._lock:
+            if self._automaton is None:
+                phrases = []
+                owners = []
+                for intent in self._intents:
+                    for phrase in intent.phrases:
+                        phrases.append(phrase)
+                        owners.append(intent)
+                self._owners = owners
+                self._automaton = AhoCorasick(phrases)
+            return self._automaton, self._owners
+
+    def candidates(self, query):
+        """All whole-word matches, best first"""
+        # An Utterance is already lowercased; don't copy it again
+        text = query if isinstance(query, Utterance) else query.lower()
+        automaton, owners = self._compile()
+        found = []
+        for index, end in automaton.iter_matches(text):
+            phrase = automaton.patterns[index]
+            start = end - len(phrase)
+            if _is_word_char(phrase[0]) and start > 0 and _is_word_char(text[start - 1]):
+                continue
+            if _is_word_char(phrase[-1]) and end < len(text) and _is_word_char(text[end]):
+                continue
+            found.append(IntentMatch(owners[index], phrase, start, end))
+        found.sort(key=lambda m: (-m.intent.priority, -(m.end - m.start), m.start))
+        return found
+
+    def match(self, query):
+        """Best match whose guard accepts the query (arguments parsed), or None"""
+        for candidate in self.candidates(query):
+            guard = candidate.intent.guard
+            if guard is None or guard(query):
+                candidate.args = candidate.intent.parse(query)
+                return candidate
+        return None
+
+    def route(self, query, *args, **kwargs):
+        """Call the matched intent's handler; returns (match, result) or (None, None)"""
+        found = self.match(query)
+        if found is None or found.intent.handler is None:
+            return found, None
+        return found, found.intent.handler(query, *found.args, *args, **kwargs)
@@ -0,0 +1,235 @@
+"""
+Batch Name Matcher
+- Character n-gram vectors for a candidate set (contacts, habits, sites, tasks)
+- NumPy: one matrix-vector product scores the query against every candidate
+- Top-k re-ranked with exact (banded) edit distance from c_accel
+- Edit budgets for spoken names: strict (contacts, habits) and lenient (sites)
+- Incremental: sync() only re-vectorizes candidates that were added or changed
+- Pure-Python sparse fallback when NumPy is not installed (same scores)
+"""
+
+import threading
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from core.c_accel import KeywordTable
+
+DIMENSIONS = 512        # Hashed n-gram space: 2 KB per candidate, re-ranking absorbs collisions
+
+
+def ngram_counts(text, n=3, dimensions=DIMENSIONS):
+    """{bucket: count} of the padded character n-grams of text"""
+    padded = f" {text.lower().strip()} "
+    counts = {}
+    if len(padded) < n:
+        grams = [padded]
+    else:
+        grams = [padded[i:i + n] for i in range(len(padded) - n + 1)]
+    for gram in grams:
+        bucket = hash(gram) % dimensions
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def name_budget(name):
+    """Edits tolerated when matching a spoken name (short names must be near-exact)"""
+    length = len((name or "").strip())
+    if length <= 2:
+        return 0
+    return 1 if length <= 5 else 2
+
+
+def lenient_budget(name):
+    """Edits tolerated where a difflib cutoff of 0.6 used to apply: about 40% of the name"""
+    return max(name_budget(name), len((name or "").strip()) * 2 // 5)
+
+
+def _unit(counts):
+    norm = sum(c * c for c in counts.values()) ** 0.5
+    return {bucket: c / norm for bucket, c in counts.items()} if norm else {}
+
+
+class NameMatcher:
+    """
+    Fuzzy lookup over a changing set of named items.
+
+        matcher = NameMatcher()
+        matcher.sync({"c1": "John Smith", "c2": "Jane Doe"})
+        matcher.search("jon smith", limit=1)        # -> [("c1", 0.7..., 1)]
+
+    Results are (key, score, distance): cosine similarity of n-gram
+    vectors, and the edit distance when re-ranking was requested
+    (None otherwise).
+    """
+
+    def __init__(self, n=3, dimensions=DIMENSIONS, use_numpy=None):
+        self.n = n
+        self.dimensions = dimensions
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else (use_numpy and NUMPY_AVAILABLE)
+        self._lock = threading.RLock()
+        self._texts = {}            # key -> text
+        self._rows = {}             # key -> row index (NumPy) or unit sparse vector
+        self._row_keys = []         # row index -> key (None for a free row)
+        self._free = []
+        self._matrix = None
+        self.vectorized = 0         # Candidates (re)vectorized since creation
+
+    def __len__(self):
+        return len(self._texts)
+
+    def __contains__(self, key):
+        return key in self._texts
+
+    # ---- Maintenance ----
+    def add(self, key, text):
+        """Insert or update one candidate"""
+        with self._lock:
+            if self._texts.get(key) == text:
+                return
+            self._texts[key] = text
+            self.vectorized += 1
+            counts = ngram_counts(text, self.n, self.dimensions)
+            if not self.use_numpy:
+                self._rows[key] = _unit(counts)
+                return
+            row = self._rows.get(key)
+            if row is None:
+                row = self._allocate_row()
+                self._rows[key] = row
+                self._row_keys[row] = key
+            vector = self._matrix[row]
+            vector[:] = 0.0
+            for bucket, count in counts.items():
+                vector[bucket] = count
+            norm = np.linalg.norm(vector)
+            if norm:
+                vector /= norm
+
+    def remove(self, key):
+        with self._lock:
+            if self._texts.pop(key, None) is None:
+                return
+            row = self._rows.pop(key)
+            if self.use_numpy:
+                self._matrix[row] = 0.0
+                self._row_keys[row] = None
+                self._free.append(row)
+
+    def sync(self, items):
+        """
+        Make the candidate set equal to `items` ({key: text} or (key, text) pairs).
+        Unchanged candidates are left alone; returns the number of changes.
+        """
+        items = dict(items.items() if hasattr(items, "items") else items)
+        with self._lock:
+            changes = 0
+            for key in [k for k in self._texts if k not in items]:
+                self.remove(key)
+                changes += 1
+            for key, text in items.items():
+                if self._texts.get(key) != text:
+                    self.add(key, text)
+                    changes += 1
+            return changes
+
+    def _allocate_row(self):
+        if self._free:
+            return self._free.pop()
+        if self._matrix is None:
+            self._matrix = np.zeros((16, self.dimensions), dtype=np.float32)
+        used = len(self._row_keys)
+        if used == self._matrix.shape[0]:
+            grown = np.zeros((used * 2, self.dimensions), dtype=np.float32)
+            grown[:used] = self._matrix
+            self._matrix = grown
+        self._row_keys.append(None)
+        return used
+
+    # ---- Lookup ----
+    def _query_vector(self, query):
+        counts = ngram_counts(query, self.n, self.dimensions)
+        if not self.use_numpy:
+            return _unit(counts)
+        q = np.zeros(self.dimensions, dtype=np.float32)
+        for bucket, count in counts.items():
+            q[bucket] = count
+        norm = np.linalg.norm(q)
+        if norm:
+            q /= norm
+        return q
+
+    def scores(self, query):
+        """{key: cosine similarity} for every candidate"""
+        with self._lock:
+            if not self._texts:
+                return {}
+            q = self._query_vector(query)
+            if not self.use_numpy:
+                return {key: sum(w * q.get(b, 0.0) for b, w in vector.items())
+                        for key, vector in self._rows.items()}
+            sims = self._matrix[:len(self._row_keys)] @ q
+            return {key: float(sims[row]) for row, key in enumerate(self._row_keys) if key is not None}
+
+    def _shortlist(self, query, size, min_score):
+        """[(key, score)] of the `size` best candidates, best first"""
+        if not self.use_numpy:
+            scored = [(score, key) for key, score in self.scores(query).items() if score >= min_score]
+            scored.sort(key=lambda item: -item[0])
+            return [(key, score) for score, key in scored[:size]]
+
+        q = self._query_vector(query)
+        rows = len(self._row_keys)
+        sims = self._matrix[:rows] @ q
+        if self._free:
+            sims[self._free] = -1.0
+        if rows > size:
+            top = np.argpartition(-sims, size - 1)[:size]
+        else:
+            top = np.arange(rows)
+        top = top[np.argsort(-sims[top], kind="stable")]
+        return [(self._row_keys[row], float(sims[row])) for row in top
+                if sims[row] >= min_score and self._row_keys[row] is not None]
+
+    def search(self, query, limit=5, min_score=0.0, max_distance=None, rerank=None):
+        """
+        Best candidates for query as [(key, score, distance)].
+
+        The n-gram score shortlists `rerank` candidates (default 4 x limit);
+        with max_distance they are re-ranked by exact edit distance and
+        anything further away is dropped.
+        """
+        with self._lock:
+            if not self._texts:
+                return []
+            if max_distance is None:
+                return [(key, score, None) for key, score in self._shortlist(query, limit, min_score)]
+            shortlist = self._shortlist(query, rerank or max(limit * 4, 8), min_score)
+            texts = [self._texts[key] for key, _ in shortlist]
+
+        distances = KeywordTable(texts).distances(query, max_distance)
+        ranked = [
+            (distance, -score, index)
+            for index, ((key, score), distance) in enumerate(zip(shortlist, distances))
+            if 0 <= distance <= max_distance
+        ]
+        ranked.sort()
+        return [(shortlist[index][0], -neg_score, distance)
+                for distance, neg_score, index in ranked[:limit]]
+
+    def best(self, query, min_score=0.0, max_distance=None):
+        """Key of the best candidate, or None"""
+        found = self.search(query, limit=1, min_score=min_score, max_distance=max_distance)
+        return found[0][0] if found else None
+
+    def closest(self, query, min_score=0.5):
+        """
+        Lenient best(): within lenient_budget(query) edits, else the best
+        candidate scoring at least min_score ("utube", "wiki" for short names)
+        """
+        found = self.best(query, max_distance=lenient_budget(query))
+        return found if found is not None else self.best(query, min_score=min_score)
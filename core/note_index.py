@@ -0,0 +1,287 @@
+"""
+Notes Full-Text Index
+- Incremental inverted index over note title, content and category
+- Token, prefix (word*) and "quoted phrase" queries, category filter
+- BM25 ranking
+- Persisted as an append-only log next to the data file
+"""
+
+import bisect
+import json
+import math
+import re
+import threading
+
+from core.storage import atomic_write
+
+_TOKEN_RE = re.compile(r"\w+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+# Gap inserted between fields so phrases never match across title/content
+_FIELD_GAP = 1000
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(text.lower())
+
+
+def note_key(note):
+    """Stable identity of a note (older notes only have a timestamp)"""
+    return str(note.get("id") or note.get("timestamp"))
+
+
+def parse_query(query, category=None, prefix_last=True):
+    """
+    (clauses, category) for a search query: ("phrase", tokens) and
+    ("term", token, prefix) clauses, category:<name> taken out as the filter.
+    Shared with the SQLite backend so both search the same way.
+    """
+    clauses = []
+    words = _QUERY_RE.findall(query)
+    for i, (phrase, word) in enumerate(words):
+        if phrase:
+            tokens = tokenize(phrase)
+            if tokens:
+                clauses.append(("phrase", tokens))
+        elif word.lower().startswith("category:"):
+            category = word.split(":", 1)[1]
+        else:
+            prefix = word.endswith("*") or (prefix_last and i == len(words) - 1)
+            tokens = tokenize(word)
+            for j, token in enumerate(tokens):
+                clauses.append(("term", token, prefix and j == len(tokens) - 1))
+    return clauses, category
+
+
+def _note_terms(note):
+    """Positions of every token across the note's searchable fields"""
+    positions = {}
+    offset = 0
+    for text in (note.get("title", ""), note.get("content") or note.get("note", ""),
+                 note.get("category", "")):
+        tokens = tokenize(text or "")
+        for i, token in enumerate(tokens):
+            positions.setdefault(token, []).append(offset + i)
+        offset += len(tokens) + _FIELD_GAP
+    length = sum(len(p) for p in positions.values())
+    return positions, length
+
+
+class NoteIndex:
+    """
+    Inverted index for notes.
+
+    Each log line is {"add": note} or {"del": key}; postings and the
+    sorted vocabulary are rebuilt in memory when the log is first read.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._log_records = 0
+        self._reset()
+
+    def _reset(self):
+        self.notes = {}             # key -> note
+        self._doc_len = {}          # key -> token count
+        self._postings = {}         # term -> {key: [positions]}
+        self._vocabulary = []       # sorted terms, for prefix lookups
+        self._total_len = 0
+
+    # ---- Persistence ----
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        self._loaded = True
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn final record from an interrupted write
+                break
+            if "add" in record:
+                self._add(record["add"])
+            elif "del" in record:
+                self._remove(record["del"])
+            self._log_records += 1
+
+    def _append_log(self, records):
+        with open(self.path, "a", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self._log_records += len(records)
+        if self._log_records > 2 * max(len(self.notes), 50):
+            self.compact()
+
+    def compact(self):
+        """Rewrite the log with one record per live note"""
+        with self._lock:
+            self._ensure_loaded()
+            payload = "".join(
+                json.dumps({"add": note}, separators=(",", ":")) + "\n"
+                for note in self.notes.values()
+            )
+            atomic_write(self.path, payload.encode("utf-8"))
+            self._log_records = len(self.notes)
+
+    # ---- In-memory index ----
+    def _add(self, note):
+        key = note_key(note)
+        if key in self.notes:
+            self._remove(key)
+        positions, length = _note_terms(note)
+        self.notes[key] = note
+        self._doc_len[key] = length
+        self._total_len += length
+        for term, term_positions in positions.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._vocabulary, term)
+            postings[key] = term_positions
+
+    def _remove(self, key):
+        note = self.notes.pop(key, None)
+        if note is None:
+            return
+        self._total_len -= self._doc_len.pop(key)
+        for term in _note_terms(note)[0]:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(key, None)
+            if not postings:
+                del self._postings[term]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, term)]
+
+    # ---- Public API ----
+    def __len__(self):
+        with self._lock:
+            self._ensure_loaded()
+            return len(self.notes)
+
+    def add(self, note):
+        """Index a new (or updated) note"""
+        with self._lock:
+            self._ensure_loaded()
+            self._add(note)
+            self._append_log([{"add": note}])
+
+    def remove(self, note_or_key):
+        with self._lock:
+            self._ensure_loaded()
+            key = note_or_key if isinstance(note_or_key, str) else note_key(note_or_key)
+            if key in self.notes:
+                self._remove(key)
+                self._append_log([{"del": key}])
+
+    def rebuild(self, notes):
+        """Re-index from scratch (used when the index is missing or out of sync)"""
+        with self._lock:
+            self._reset()
+            self._loaded = True
+            for note in notes:
+                self._add(note)
+            self.compact()
+
+    def _expand(self, term, prefix):
+        if not prefix:
+            return [term] if term in self._postings else []
+        start = bisect.bisect_left(self._vocabulary, term)
+        end = bisect.bisect_left(self._vocabulary, term + "\uffff")
+        return self._vocabulary[start:end]
+
+    def _phrase_matches(self, tokens):
+        """Keys of notes containing the tokens consecutively"""
+        postings = [self._postings.get(token) for token in tokens]
+        if not all(postings):
+            return {}
+        keys = set(postings[0])
+        for p in postings[1:]:
+            keys &= p.keys()
+        matches = {}
+        for key in keys:
+            starts = set(postings[0][key])
+            for offset, p in enumerate(postings[1:], 1):
+                starts &= {pos - offset for pos in p[key]}
+                if not starts:
+                    break
+            if starts:
+                matches[key] = len(starts)
+        return matches
+
+    def search(self, query, category=None, limit=None, prefix_last=True):
+        """
+        Return notes matching every query term, best BM25 score first.
+
+        Query syntax: plain words, word* for prefixes, "quoted phrases" and
+        category:<name>. The last plain word also matches as a prefix when
+        prefix_last is set, so partial spoken words still find notes.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            clauses, category = parse_query(query, category, prefix_last)
+            if not clauses and category is None:
+                return []
+
+            n_docs = len(self.notes)
+            avg_len = (self._total_len / n_docs) if n_docs else 0.0
+            # Most selective clauses first, so later ones only visit candidates
+            expanded = []
+            for clause in clauses:
+                if clause[0] == "phrase":
+                    expanded.append((clause, None, 0))
+                else:
+                    terms = self._expand(clause[1], clause[2])
+                    expanded.append((clause, terms, sum(len(self._postings[t]) for t in terms)))
+            expanded.sort(key=lambda item: item[2])
+
+            scores = None
+            for clause, terms, _ in expanded:
+                if terms is None:
+                    tf = self._phrase_matches(clause[1])
+                elif scores is None:
+                    tf = {}
+                    for term in terms:
+                        for key, positions in self._postings[term].items():
+                            tf[key] = tf.get(key, 0) + len(positions)
+                else:
+                    tf = {}
+                    postings = [self._postings[term] for term in terms]
+                    for key in scores:
+                        freq = sum(len(p[key]) for p in postings if key in p)
+                        if freq:
+                            tf[key] = freq
+                if not tf:
+                    return []
+                idf = math.log(1 + (n_docs - len(tf) + 0.5) / (len(tf) + 0.5))
+                clause_scores = {}
+                for key, freq in tf.items():
+                    if scores is not None and key not in scores:
+                        continue
+                    norm = self.K1 * (1 - self.B + self.B * self._doc_len[key] / (avg_len or 1))
+                    clause_scores[key] = (scores or {}).get(key, 0.0) + idf * freq * (self.K1 + 1) / (freq + norm)
+                scores = clause_scores
+                if not scores:
+                    return []
+
+            if scores is None:
+                scores = dict.fromkeys(self.notes, 0.0)
+            if category is not None:
+                category = category.lower()
+                scores = {key: score for key, score in scores.items()
+                          if self.notes[key].get("category", "general").lower() == category}
+
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            if limit is not None:
+                ranked = ranked[:limit]
+            return [self.notes[key] for key in ranked]
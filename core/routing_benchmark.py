@@ -0,0 +1,331 @@
+"""
+Routing Latency Benchmark
+- Replays an utterance corpus (JSONL: {"utterance", "intent"}) through both entry points
+- Records may carry "known_mismatch": "<reason>" for accepted misroutes; they are
+  reported apart from new mismatches, and accuracy is also given without them
+- Times normalization, routing (router + fuzzy recovery) and handler selection
+- Nothing is executed: speak/listen are stubbed and handlers are only resolved
+- Reports p50/p95/p99 per intent plus routing accuracy as a diffable JSON report
+- "ai" is the expected intent for utterances that should reach the AI fallback
+- Headline timings are cold (intent cache off); the cached run is reported separately
+- The bundled corpus is a small hand-labelled seed; export a real one from conversation logs
+
+    python -m core.routing_benchmark [corpus.jsonl] [--out report.json] [--repeat 20] [--limit N] [--no-cached]
+    python -m core.routing_benchmark export <conversation_dir> corpus.jsonl
+"""
+
+import contextlib
+import importlib.util
+import io
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+AI_FALLBACK = "ai"
+DEFAULT_CORPUS = Path(__file__).parent / "routing_corpus.jsonl"
+ROOT = Path(__file__).parent.parent
+
+
+def load_corpus(path, limit=None):
+    """
+    [(utterance, expected intent, known mismatch reason or None)] from a
+    JSONL corpus, at most `limit` entries
+    """
+    corpus = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            corpus.append((
+                record["utterance"],
+                record.get("intent") or AI_FALLBACK,
+                record.get("known_mismatch"),
+            ))
+            if limit and len(corpus) >= limit:
+                break
+    return corpus
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    rank = max(int(round(pct / 100.0 * len(samples) + 0.5)) - 1, 0)
+    return samples[min(rank, len(samples) - 1)]
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return {
+        "p50_us": round(percentile(samples, 50), 2),
+        "p95_us": round(percentile(samples, 95), 2),
+        "p99_us": round(percentile(samples, 99), 2),
+    }
+
+
+# ---- Entry points ----
+def _load_legacy():
+    """Import the legacy core with speak/listen stubbed out"""
+    module = sys.modules.get("legacy_core")
+    if module is None:
+        spec = importlib.util.spec_from_file_location("legacy_core", str(ROOT / "Jarvis_v1.7r_core.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["legacy_core"] = module
+        try:
+            spec.loader.exec_module(module)
+        except BaseException:
+            del sys.modules["legacy_core"]
+            raise
+    module.speak = lambda *args, **kwargs: None
+    module.listen = lambda *args, **kwargs: ""
+    return module
+
+
+def legacy_target():
+    """Stages of process_command: normalize, COMMAND_REGISTRY.match, resolve"""
+    legacy = _load_legacy()
+    from core.utterance import normalize
+    registry = legacy.COMMAND_REGISTRY
+
+    def route(utterance):
+        found, utterance = registry.match(utterance)
+        return found
+
+    def select(found):
+        if found is None:
+            return AI_FALLBACK
+        registry.resolve(found.intent)
+        return found.name
+
+    return (normalize, route, select), registry
+
+
+def async_target():
+    """Stages of process_command_async: normalize, fast path + registry.match, resolve"""
+    if str(ROOT) not in sys.path:
+        sys.path.insert(0, str(ROOT))
+    import jarvis_main
+    from core.utterance import normalize
+    jarvis_main.speak = _async_noop
+    if jarvis_main.LEGACY_AVAILABLE:
+        jarvis_main.legacy.speak = lambda *args, **kwargs: None
+        jarvis_main.legacy.listen = lambda *args, **kwargs: ""
+    registry = jarvis_main.get_command_registry()
+
+    def route(utterance):
+        _, intent, found = jarvis_main.select_command(utterance)
+        return intent or found
+
+    def select(found):
+        if found is None:
+            return AI_FALLBACK
+        if isinstance(found, str):
+            return found if found in jarvis_main.FAST_HANDLERS else AI_FALLBACK
+        registry.resolve(found.intent)
+        return found.name
+
+    return (normalize, route, select), registry
+
+
+async def _async_noop(*args, **kwargs):
+    return None
+
+
+TARGETS = {
+    "process_command": legacy_target,
+    "process_command_async": async_target,
+}
+
+
+# ---- Runner ----
+def run_target(stages, corpus, repeat=10):
+    normalize, route, select = stages
+    clock = time.perf_counter_ns
+    per_intent = {}
+    stage_samples = {"normalize": [], "route": [], "select": []}
+    correct = 0
+    mismatches = []
+    known_mismatches = []
+    resolved = []
+
+    # Warm-up builds lazy tables (automaton, fuzzy index, prepared keywords)
+    for utterance, _, _ in corpus[:5]:
+        select(route(normalize(utterance)))
+
+    for utterance, expected, known in corpus:
+        stats = per_intent.setdefault(expected, {"count": 0, "correct": 0, "samples": []})
+        got = None
+        for _ in range(repeat):
+            t0 = clock()
+            normalized = normalize(utterance)
+            t1 = clock()
+            found = route(normalized)
+            t2 = clock()
+            got = select(found)
+            t3 = clock()
+            stage_samples["normalize"].append((t1 - t0) / 1000.0)
+            stage_samples["route"].append((t2 - t1) / 1000.0)
+            stage_samples["select"].append((t3 - t2) / 1000.0)
+            stats["samples"].append((t3 - t0) / 1000.0)
+        stats["count"] += 1
+        if got == expected:
+            stats["correct"] += 1
+            correct += 1
+            if known:
+                # Routes correctly now: the label can go
+                resolved.append({"utterance": utterance, "expected": expected})
+        elif known:
+            known_mismatches.append({"utterance": utterance, "expected": expected, "got": got, "reason": known})
+        else:
+            mismatches.append({"utterance": utterance, "expected": expected, "got": got})
+
+    intents = {}
+    for name, stats in sorted(per_intent.items()):
+        intents[name] = dict(
+            count=stats["count"],
+            accuracy=round(stats["correct"] / stats["count"], 4),
+            **_summary(stats["samples"]),
+        )
+    every = [s for stats in per_intent.values() for s in stats["samples"]]
+    unknown = len(corpus) - len(known_mismatches)
+    return {
+        "accuracy": round(correct / len(corpus), 4) if corpus else 0.0,
+        "accuracy_excluding_known": round(correct / unknown, 4) if unknown else 0.0,
+        "overall": _summary(every),
+        "stages": {name: _summary(samples) for name, samples in stage_samples.items()},
+        "intents": intents,
+        "mismatches": mismatches,
+        "known_mismatches": known_mismatches,
+        "resolved_known_mismatches": resolved,
+    }
+
+
+def _cached_run(stages, corpus, repeat, registry, cache):
+    """
+    Same corpus with the intent cache on. Every repeat after an utterance's
+    first one is a cache hit, so these numbers are kept out of the headline.
+    """
+    cache.clear()
+    before = cache.stats()
+    registry.cache = cache
+    result = run_target(stages, corpus, repeat)
+    after = cache.stats()
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    return {
+        "overall": result["overall"],
+        "stages": result["stages"],
+        "hits": hits,
+        "misses": lookups - hits,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+
+
+def run_benchmark(corpus_path=DEFAULT_CORPUS, repeat=10, targets=None, cached=True, limit=None):
+    corpus = load_corpus(corpus_path, limit)
+    report = {
+        "corpus": os.path.basename(str(corpus_path)),
+        "utterances": len(corpus),
+        "repeat": repeat,
+        "targets": {},
+    }
+    for name in targets or TARGETS:
+        try:
+            # Router recovery notes and module banners would skew the timings
+            with contextlib.redirect_stdout(io.StringIO()):
+                stages, registry = TARGETS[name]()
+                cache = registry.cache
+                try:
+                    # Headline numbers: cold routing on every repeat
+                    registry.cache = None
+                    result = run_target(stages, corpus, repeat)
+                    if cached and cache is not None:
+                        result["cached"] = _cached_run(stages, corpus, repeat, registry, cache)
+                finally:
+                    registry.cache = cache
+        except Exception as e:
+            result = {"error": f"{type(e).__name__}: {e}"}
+        report["targets"][name] = result
+    return report
+
+
+def export_corpus(conversation_dir, out_path):
+    """
+    Seed a corpus from recorded conversations, labelled with today's routing.
+    Review the labels by hand; later runs then measure drift against them.
+    """
+    from core.conversation_log import ConversationLog
+    stages, _ = legacy_target()
+    normalize, route, select = stages
+    seen = set()
+    count = 0
+    with open(out_path, "w", encoding="utf-8") as f:
+        for entry in ConversationLog(conversation_dir).since(""):
+            utterance = (entry.get("user") or "").strip()
+            if not utterance or utterance in seen:
+                continue
+            seen.add(utterance)
+            intent = select(route(normalize(utterance)))
+            f.write(json.dumps({"utterance": utterance, "intent": intent}) + "\n")
+            count += 1
+    return count
+
+
+def _print_summary(report):
+    print(f"\n=== Routing Benchmark ({report['corpus']}: {report['utterances']} utterances x {report['repeat']}) ===")
+    for name, result in report["targets"].items():
+        if "error" in result:
+            print(f"{name}: unavailable ({result['error']})")
+            continue
+        overall = result["overall"]
+        print(f"{name}: accuracy {result['accuracy']:.1%} "
+              f"({result['accuracy_excluding_known']:.1%} without {len(result['known_mismatches'])} known) | cold "
+              f"p50 {overall['p50_us']}us  p95 {overall['p95_us']}us  p99 {overall['p99_us']}us")
+        cached = result.get("cached")
+        if cached:
+            overall = cached["overall"]
+            print(f"  cached: p50 {overall['p50_us']}us  p95 {overall['p95_us']}us  p99 {overall['p99_us']}us "
+                  f"({cached['hits']} hits / {cached['misses']} misses, {cached['hit_rate']:.1%})")
+        for mismatch in result["mismatches"][:10]:
+            print(f"  ✗ {mismatch['utterance']!r}: expected {mismatch['expected']}, got {mismatch['got']}")
+        for mismatch in result["resolved_known_mismatches"]:
+            print(f"  ✓ {mismatch['utterance']!r}: known mismatch now routes to {mismatch['expected']}")
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if args and args[0] == "export":
+        n = export_corpus(args[1], args[2])
+        print(f"[Benchmark] Exported {n} utterances to {args[2]}")
+        sys.exit(0)
+
+    out_path = None
+    repeat = 10
+    corpus_path = DEFAULT_CORPUS
+    cached = True
+    limit = None
+    while args:
+        arg = args.pop(0)
+        if arg == "--out":
+            out_path = args.pop(0)
+        elif arg == "--repeat":
+            repeat = int(args.pop(0))
+        elif arg == "--limit":
+            limit = int(args.pop(0))
+        elif arg == "--no-cached":
+            cached = False
+        else:
+            corpus_path = arg
+
+    report = run_benchmark(corpus_path, repeat, cached=cached, limit=limit)
+    if corpus_path == DEFAULT_CORPUS:
+        print("[Benchmark] Using the bundled seed corpus; export a full one from conversation logs")
+    _print_summary(report)
+    if out_path:
+        with open(out_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, sort_keys=True, ensure_ascii=False)
+        print(f"[Benchmark] Report written to {out_path}")
@@ -0,0 +1,111 @@
+"""
+Schedule Archive
+- Moves past schedule days out of the live document
+- One gzip-compressed JSON file per month (YYYY-MM.json.gz)
+- Live document keeps only a sliding window around today
+- Archived days are faulted back in on lookup (small month cache)
+"""
+
+import copy
+import datetime
+import gzip
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from core.storage import atomic_write
+
+
+class ScheduleArchive:
+    """Monthly compressed archive of schedule days"""
+
+    def __init__(self, directory, keep_days=7, cached_months=6):
+        self.directory = str(directory)
+        self.keep_days = keep_days
+        self.cached_months = cached_months
+        self._lock = threading.RLock()
+        self._months = OrderedDict()    # "YYYY-MM" -> {date: day}
+
+    def _path(self, month):
+        return os.path.join(self.directory, f"{month}.json.gz")
+
+    def _read_month(self, month):
+        with self._lock:
+            if month in self._months:
+                self._months.move_to_end(month)
+                return self._months[month]
+            try:
+                with gzip.open(self._path(month), "rt", encoding="utf-8") as f:
+                    days = json.load(f)
+            except FileNotFoundError:
+                days = {}
+            self._months[month] = days
+            while len(self._months) > self.cached_months:
+                self._months.popitem(last=False)
+            return days
+
+    def _write_month(self, month, days):
+        os.makedirs(self.directory, exist_ok=True)
+        payload = json.dumps(days, sort_keys=True).encode("utf-8")
+        atomic_write(self._path(month), gzip.compress(payload))
+
+    def cutoff(self, today=None):
+        """Oldest date (ISO) that stays in the live document"""
+        today = today or datetime.date.today()
+        return (today - datetime.timedelta(days=self.keep_days)).isoformat()
+
+    def compact(self, schedule, today=None):
+        """
+        Move days older than the window from `schedule` (in place) into the
+        monthly archives. Returns the number of days moved.
+        """
+        cutoff = self.cutoff(today)
+        expired = sorted(key for key in schedule if key < cutoff)
+        if not expired:
+            return 0
+
+        by_month = {}
+        for key in expired:
+            by_month.setdefault(key[:7], {})[key] = schedule[key]
+        with self._lock:
+            for month, days in by_month.items():
+                merged = dict(self._read_month(month))
+                merged.update(days)
+                self._write_month(month, merged)
+                self._months[month] = merged
+        # Only drop from the live document once the archive write succeeded
+        for key in expired:
+            del schedule[key]
+        return len(expired)
+
+    def get_day(self, date_key):
+        """Archived schedule for `date_key` (ISO date) or None; a private copy"""
+        return copy.deepcopy(self._read_month(date_key[:7]).get(date_key))
+
+    def remove_day(self, date_key):
+        """Delete an archived day; True if it was there"""
+        month = date_key[:7]
+        with self._lock:
+            days = self._read_month(month)
+            if date_key not in days:
+                return False
+            remaining = {key: day for key, day in days.items() if key != date_key}
+            self._write_month(month, remaining)
+            self._months[month] = remaining
+            return True
+
+    def lookup(self, schedule, date_key):
+        """Day from the live document, falling back to the archive"""
+        day = schedule.get(date_key)
+        if day is None and date_key < self.cutoff():
+            day = self.get_day(date_key)
+        return day
+
+    def months(self):
+        """Archived months, oldest first"""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(name[:-len(".json.gz")] for name in names if name.endswith(".json.gz"))
@@ -0,0 +1,209 @@
+"""
+Sharded Data Store
+- One JournalStore per large collection under a data directory
+- Remaining small keys (reminders, flags, ...) share a core document
+- Collections are parsed only when a caller first touches them
+- Saves only write the shards whose collections were touched
+- Transparent one-time split of a legacy assistant_data.json
+- Shards of collections a backend took over (e.g. SQLite) are imported into it once
+"""
+
+import os
+
+from core.storage import _UNLOADED, CowDocument, JournalStore, _writing, install_exit_handlers
+
+SHARDED_COLLECTIONS = (
+    "notes",
+    "conversations",
+    "schedule",
+    "tasks",
+    "habits",
+    "memory_context",
+    "personality_profile",
+)
+
+
+class ShardedDocument(CowDocument):
+    """
+    Document whose values are fetched from their shard on first access.
+    Behaves like CowDocument: every key read or replaced is marked touched
+    and written back by ShardedStore.save().
+    """
+
+    __slots__ = ("_store", "_core")
+
+    def __init__(self, store, core_doc, shard_keys):
+        placeholders = dict.fromkeys(dict.keys(core_doc), _UNLOADED)
+        placeholders.update(dict.fromkeys(shard_keys, _UNLOADED))
+        CowDocument.__init__(self, placeholders, store._lock)
+        self._store = store
+        self._core = core_doc
+
+    def _own(self, key):
+        if key in self._touched:
+            return
+        self._touched.add(key)
+        if dict.__contains__(self, key) and dict.__getitem__(self, key) is _UNLOADED:
+            value = self._store._load_value(key, self._core)
+            self._keep_base(key, value)
+            dict.__setitem__(self, key, value)
+
+
+class ShardedStore:
+    """
+    Same load()/save() contract as JournalStore, spread over several files:
+
+        <data_dir>/core.json          small keys (+ collection_backend)
+        <data_dir>/<collection>.json  one shard per collection, with journal
+
+    Collections owned by a collection_backend stay with the core store;
+    a shard file left over for one of them is imported into the backend on
+    first load and renamed to <collection>.json.migrated.
+    """
+
+    def __init__(self, data_dir, legacy_path=None, compact_every=500, flush_delay=0.0,
+                 collection_backend=None, shards=SHARDED_COLLECTIONS):
+        self.data_dir = str(data_dir)
+        self.legacy_path = str(legacy_path) if legacy_path else None
+        os.makedirs(self.data_dir, exist_ok=True)
+
+        owned = collection_backend.collections if collection_backend is not None else ()
+        self.shard_names = tuple(name for name in shards if name not in owned)
+        self.backend_names = tuple(name for name in shards if name in owned)
+        self.core = JournalStore(
+            os.path.join(self.data_dir, "core.json"),
+            compact_every=compact_every,
+            collection_backend=collection_backend,
+            flush_delay=flush_delay,
+        )
+        self.shards = {
+            name: JournalStore(
+                os.path.join(self.data_dir, f"{name}.json"),
+                compact_every=compact_every,
+                flush_delay=flush_delay,
+            )
+            for name in self.shard_names
+        }
+        self._lock = self.core._lock
+        self._migration_checked = False
+
+    @property
+    def parse_count(self):
+        """Full file parses across the core document and all shards"""
+        return self.core.parse_count + sum(s.parse_count for s in self.shards.values())
+
+    # ---- Migration ----
+    def _migrate_legacy(self):
+        """Split a single-file assistant_data.json into shards (runs once)"""
+        self._migration_checked = True
+        if (not self.legacy_path or not os.path.exists(self.legacy_path)
+                or os.path.exists(self.core.snapshot_path)):
+            return
+
+        legacy = JournalStore(self.legacy_path)
+        doc = legacy.load()
+        if doc is None:
+            return
+        doc = doc.copy()
+
+        for name, store in self.shards.items():
+            if name in doc:
+                store.save({name: doc.pop(name)})
+                store.flush()
+        self.core.save(doc, keys=list(doc))
+        self.core.flush()
+
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+        if os.path.exists(legacy.journal_path):
+            os.remove(legacy.journal_path)
+        print(f"[Storage] Split {os.path.basename(self.legacy_path)} into {self.data_dir}")
+
+    def _import_backend_shards(self):
+        """
+        Shard files of collections the backend owns (sharded install switched
+        to SQLite later): import each one once, with the legacy merge rule
+        (the database wins if both hold data; the JSON copy is kept aside).
+        """
+        for name in self.backend_names:
+            path = os.path.join(self.data_dir, f"{name}.json")
+            if not os.path.exists(path):
+                continue
+            shard = JournalStore(path)
+            doc = shard.load()
+            if doc is not None and name in doc:
+                self.core._merge_legacy({name: doc[name]})
+            # Fold the journal in, so the renamed file holds the full collection
+            shard.compact()
+            os.replace(path, path + ".migrated")
+            if os.path.exists(shard.journal_path):
+                os.remove(shard.journal_path)
+            print(f"[Storage] Moved {name}.json into {self.core.backend.db_path}")
+
+    # ---- Shard access ----
+    def _shard_exists(self, name):
+        store = self.shards[name]
+        if store._state is not None:
+            return name in store._state
+        return os.path.exists(store.snapshot_path)
+
+    def _load_value(self, key, core_doc):
+        if key in self.shards:
+            doc = self.shards[key].load()
+            return doc.get(key) if doc is not None else None
+        return core_doc[key]
+
+    # ---- Public API ----
+    def load(self):
+        """
+        Return a ShardedDocument (or None when nothing is stored yet).
+        Only the small core document is read here; shards load on access.
+        """
+        with self._lock, _writing():
+            if not self._migration_checked:
+                self._migrate_legacy()
+                self._import_backend_shards()
+            core_doc = self.core.load()
+            present = [name for name in self.shard_names if self._shard_exists(name)]
+            if core_doc is None and not present:
+                return None
+            return ShardedDocument(self, core_doc if core_doc is not None else {}, present)
+
+    def save(self, data):
+        """Write back touched collections only (all of them for a plain dict)"""
+        with self._lock, _writing():
+            if isinstance(data, ShardedDocument):
+                keys = data.touched_keys()
+                core_keys = [key for key in keys if key not in self.shards]
+            else:
+                keys = list(self.shard_names)
+                core_keys = None
+
+            for name in keys:
+                if name not in self.shards:
+                    continue
+                if dict.__contains__(data, name):
+                    self.shards[name].save({name: dict.__getitem__(data, name)}, keys=[name])
+                elif self._shard_exists(name):
+                    self.shards[name].drop()
+
+            if core_keys is None:
+                self.core.save({key: value for key, value in data.items() if key not in self.shards})
+            elif core_keys:
+                subset = {key: dict.__getitem__(data, key) for key in core_keys
+                          if dict.__contains__(data, key)}
+                self.core.save(subset, keys=core_keys)
+
+    def flush(self):
+        """Write pending operations of every store"""
+        self.core.flush()
+        for store in self.shards.values():
+            store.flush()
+
+    def install_exit_handlers(self):
+        """Flush all stores on interpreter exit and on SIGINT/SIGTERM"""
+        install_exit_handlers(self.flush)
+
+    def compact(self):
+        self.core.compact()
+        for store in self.shards.values():
+            store.compact()
@@ -2,15 +2,21 @@
 Optimized Speech Engine
 - Async TTS for non-blocking speech
 - Sentence-level interruption support
-- Memory-efficient audio streaming
+- Streaming edge-tts playback from memory (core/audio_stream.py), no temp files
+- Every backend except pyttsx4 plays through the shared AudioOutput (core/audio_output.py)
+- Repeated phrases replayed from the shared TTS audio cache (core/tts_cache.py)
+- Pipelined: the next sentences synthesize while the current one plays
 - Fallback engine support
 """
 
 import asyncio
 import os
-import tempfile
+from collections import deque
 from pathlib import Path
 
+from core.audio_output import get_audio_output
+from core.tts_cache import get_tts_cache, synthesize_edge, DEFAULT_DIR
+
 class SpeechEngine:
     """Optimized TTS engine with multiple backends"""
     
@@ -22,9 +28,21 @@ class SpeechEngine:
         self.engine = None
         self._is_speaking = False
         self._interrupt_flag = False
+        self.lookahead = max(1, self.config.get('tts_lookahead', 2))   # Sentences synthesized ahead
+        self._pipelines = []            # Per utterance: deque of (stream or None, synthesis task)
+        self._playbacks = set()         # Whole-clip playbacks (non-streaming output, espeak)
+        self._loop = None
+        self.tts_cache = None
+        if self.config.get('tts_cache', True):
+            self.tts_cache = get_tts_cache(
+                self.config.get('tts_cache_dir', DEFAULT_DIR),
+                max_bytes=self.config.get('tts_cache_mb', 64) * 1024 * 1024,
+            )
         
         # Try to initialize best available engine
         self._initialize_engine()
+        if self.engine_type in ("edge", "espeak"):
+            get_audio_output()          # Open the output once, up front
     
     def _initialize_engine(self):
         """Initialize TTS engine (lazy)"""
@@ -75,48 +93,86 @@ class SpeechEngine:
         
         print(f"Jarvis: {text}")
         
-        if self.engine_type == "edge":
-            await self._speak_edge(text, allow_interrupt)
-        elif self.engine_type == "pyttsx4":
-            await self._speak_pyttsx4(text, allow_interrupt)
-        elif self.engine_type == "espeak":
-            await self._speak_espeak(text)
-        
-        self._is_speaking = False
+        try:
+            if self.engine_type == "edge":
+                await self._speak_edge(text, allow_interrupt)
+            elif self.engine_type == "pyttsx4":
+                await self._speak_pyttsx4(text, allow_interrupt)
+            elif self.engine_type == "espeak":
+                await self._speak_espeak(text)
+        finally:
+            self._is_speaking = False
     
     async def _speak_edge(self, text, allow_interrupt):
-        """Edge-TTS implementation (streaming)"""
-        import edge_tts
-        
+        """
+        Edge-TTS implementation (streaming, cached per sentence)
+        Up to `lookahead` sentences synthesize while the current one plays;
+        their streams are queued on the player back to back, so there is
+        no gap between sentences.
+        """
         # Split into sentences for interruption points
         sentences = self._split_sentences(text) if allow_interrupt else [text]
+        output = get_audio_output()
+        rate = f"+{int((self.rate - 170) / 2)}%"
+        pipeline = deque()
+        self._pipelines.append(pipeline)
+        self._loop = asyncio.get_running_loop()
         
-        for sentence in sentences:
-            if self._interrupt_flag:
-                break
-            
-            # Create temp file for audio
-            with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as tmp:
-                tmp_path = tmp.name
-            
-            try:
-                # Generate speech
-                communicate = edge_tts.Communicate(
-                    sentence,
-                    voice=self.voice_id,
-                    rate=f"+{int((self.rate - 170) / 2)}%"
-                )
-                await communicate.save(tmp_path)
-                
-                # Play audio (async)
-                await self._play_audio_async(tmp_path)
+        try:
+            for sentence in sentences:
+                if self._interrupt_flag:
+                    break
+                while len(pipeline) > self.lookahead and not self._interrupt_flag:
+                    await self._finish_sentence(pipeline[0], output)
+                    if pipeline:        # interrupt() may have emptied it meanwhile
+                        pipeline.popleft()
                 
-            finally:
-                # Cleanup
-                try:
-                    os.remove(tmp_path)
-                except:
-                    pass
+                # Cache hit plays at once; a miss starts on its first audio chunk
+                stream = output.open_stream()
+                task = asyncio.ensure_future(
+                    synthesize_edge(sentence, self.voice_id, rate, cache=self.tts_cache, stream=stream)
+                )
+                pipeline.append((stream, task))
+            
+            while pipeline and not self._interrupt_flag:
+                await self._finish_sentence(pipeline[0], output)
+                if pipeline:
+                    pipeline.popleft()
+        finally:
+            self._pipelines.remove(pipeline)
+            self._cancel_pipeline(pipeline)
+    
+    async def _finish_sentence(self, entry, output):
+        """Wait until a pipelined sentence has played (or was interrupted)"""
+        stream, task = entry
+        if stream is not None:
+            await stream.wait_async()
+        # Without a streaming output, audio plays once fully synthesized
+        await asyncio.wait({task})
+        if task.cancelled():
+            return
+        if task.exception() is not None:
+            raise task.exception()
+        if stream is None and task.result() and not self._interrupt_flag:
+            await self._play(output, task.result())
+    
+    async def _play(self, output, audio, format="mp3"):
+        """Play a whole clip on the shared output; interrupt() cancels it"""
+        playback = output.play(audio, format=format)
+        self._playbacks.add(playback)
+        try:
+            return await playback.wait_async()
+        finally:
+            self._playbacks.discard(playback)
+    
+    @staticmethod
+    def _cancel_pipeline(pipeline):
+        """Cancel in-flight synthesis and drop queued audio (event loop thread)"""
+        while pipeline:
+            stream, task = pipeline.popleft()
+            task.cancel()
+            if stream is not None:
+                stream.cancel()
     
     async def _speak_pyttsx4(self, text, allow_interrupt):
         """pyttsx4 implementation (blocking, run in executor)"""
@@ -144,48 +200,20 @@ class SpeechEngine:
             pass
     
     async def _speak_espeak(self, text):
-        """espeak implementation (subprocess)"""
+        """espeak implementation (WAV from stdout, played on the shared output)"""
+        output = get_audio_output()
+        to_output = output.backend != "none"
         process = await asyncio.create_subprocess_exec(
             "espeak",
+            *(("--stdout",) if to_output else ()),
             text,
             "-s", str(self.rate),
-            stdout=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE if to_output else asyncio.subprocess.DEVNULL,
             stderr=asyncio.subprocess.DEVNULL
         )
-        await process.wait()
-    
-    async def _play_audio_async(self, audio_path):
-        """Play audio file asynchronously"""
-        try:
-            # Try pygame first (non-blocking)
-            import pygame
-            pygame.mixer.init()
-            pygame.mixer.music.load(audio_path)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to finish (with interrupt check)
-            while pygame.mixer.music.get_busy():
-                if self._interrupt_flag:
-                    pygame.mixer.music.stop()
-                    break
-                await asyncio.sleep(0.1)
-            
-        except ImportError:
-            # Fallback to playsound (blocking)
-            loop = asyncio.get_event_loop()
-            await loop.run_in_executor(
-                None,
-                self._playsound_blocking,
-                audio_path
-            )
-    
-    def _playsound_blocking(self, audio_path):
-        """Blocking playsound fallback"""
-        try:
-            import playsound
-            playsound.playsound(audio_path)
-        except:
-            pass
+        wav, _ = await process.communicate()
+        if to_output and wav and not self._interrupt_flag:
+            await self._play(output, wav, format="wav")
     
     def _split_sentences(self, text):
         """Split text into sentences for interruption"""
@@ -197,12 +225,29 @@ class SpeechEngine:
         """Stop current speech"""
         self._interrupt_flag = True
         
+        # Streams stop at once; synthesis tasks are cancelled on their own loop
+        for pipeline in list(self._pipelines):
+            for stream, _ in list(pipeline):
+                if stream is not None:
+                    stream.cancel()
+            if self._loop is not None:
+                try:
+                    self._loop.call_soon_threadsafe(self._cancel_pipeline, pipeline)
+                except RuntimeError:
+                    pass    # Loop already closed
+        for playback in list(self._playbacks):
+            playback.cancel()
+        
         if self.engine_type == "pyttsx4" and self.engine:
             try:
                 self.engine.stop()
             except:
                 pass
     
+    def cache_stats(self):
+        """TTS cache hit/miss counters, or None when the cache is off"""
+        return self.tts_cache.stats() if self.tts_cache is not None else None
+    
     @property
     def is_speaking(self):
         """Check if currently speaking"""
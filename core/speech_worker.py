@@ -0,0 +1,180 @@
+"""
+Speech Worker
+- One long-lived thread owning the TTS event loop; audio goes to the shared AudioOutput
+- speak() becomes an enqueue from any thread, even from inside a running loop
+- Each utterance returns a SpeechJob wait handle (wait=True blocks until spoken)
+- Utterances play in submission order; the next ones synthesize while one plays
+- A per-utterance fallback (local voice) runs in order when edge-tts fails;
+  later streams are held silent until it has finished
+- interrupt() stops the current utterance and drops the queued ones
+"""
+
+import asyncio
+import concurrent.futures
+import threading
+
+from core.audio_output import get_audio_output
+from core.tts_cache import synthesize_edge
+
+
+class SpeechJob:
+    """Wait handle for one queued utterance"""
+
+    __slots__ = ("text", "future")
+
+    def __init__(self, text, future=None):
+        self.text = text
+        if future is None:
+            future = concurrent.futures.Future()
+            future.set_result(False)
+        self.future = future
+
+    @classmethod
+    def completed(cls, text=""):
+        """Handle for speech that was not queued (muted, text-only, spoken inline)"""
+        return cls(text)
+
+    def done(self):
+        return self.future.done()
+
+    def wait(self, timeout=None):
+        """Block until spoken; True if the audio played out"""
+        try:
+            return bool(self.future.result(timeout))
+        except (concurrent.futures.TimeoutError, concurrent.futures.CancelledError):
+            return False
+        except Exception as e:
+            print(f"[Speech] Failed: {e}")
+            return False
+
+
+class SpeechWorker:
+    """
+    Speaks queued text through edge-tts on a dedicated thread.
+
+        worker = SpeechWorker("en-US-EricNeural", rate="+10%", cache=TTS_CACHE)
+        worker.say("Task 1: buy milk", wait=False)
+        worker.say("Task 2: call mom").wait()
+
+    At most lookahead + 1 utterances are in flight (synthesizing or
+    playing); further submissions queue in order. interrupt() (e.g. on
+    mute) cancels whatever is playing or queued.
+    """
+
+    def __init__(self, voice, rate="+0%", pitch="+0Hz", cache=None, lookahead=2):
+        self.voice = voice
+        self.rate = rate
+        self.pitch = pitch
+        self.cache = cache
+        self.lookahead = lookahead
+        self._loop = None
+        self._thread = None
+        self._slots = None
+        self._tail = None           # Finishes when the last submitted utterance has been spoken
+        self._settled = None        # Finishes once the last one streamed fine or its fallback ran
+        self._pending = set()       # Futures of utterances not yet spoken
+        self._lock = threading.Lock()
+
+    # ---- Thread ----
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                ready = threading.Event()
+                self._thread = threading.Thread(
+                    target=self._run, args=(ready,), name="jarvis-speech", daemon=True
+                )
+                self._thread.start()
+                ready.wait()
+        return self
+
+    def _run(self, ready):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._slots = asyncio.Semaphore(self.lookahead + 1)
+        get_audio_output()          # Open the audio device once, up front
+        ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    def stop(self):
+        """Stop the worker thread (queued speech is dropped)"""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            thread.join(timeout=2)
+
+    @property
+    def on_worker_thread(self):
+        return threading.current_thread() is self._thread
+
+    # ---- Submission ----
+    def say(self, text, wait=True, fallback=None):
+        """
+        Queue text; returns its SpeechJob. With wait=True, blocks until it
+        has been spoken (never from the worker thread itself).
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._say(text, fallback), self._loop)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        job = SpeechJob(text, future)
+        if wait and not self.on_worker_thread:
+            job.wait()
+        return job
+
+    def interrupt(self):
+        """Stop the current utterance and drop everything queued behind it"""
+        for future in list(self._pending):
+            future.cancel()         # Cancels the task on the worker loop
+        get_audio_output().stop()
+
+    async def _say(self, text, fallback):
+        # Chained before the first await, so the order is the submission order
+        previous, earlier = self._tail, self._settled
+        self._tail = finished = self._loop.create_future()
+        self._settled = settled = self._loop.create_future()
+        try:
+            async with self._slots:
+                return await self._speak(text, fallback, previous, earlier, settled)
+        finally:
+            finished.set_result(None)
+            if not settled.done():
+                settled.set_result(None)
+
+    async def _speak(self, text, fallback, previous, earlier, settled):
+        output = get_audio_output()
+        # Held until the utterance before has settled: should it fall back to
+        # the local voice, this stream must not play over it
+        stream = output.open_stream(hold=True)
+        if stream is not None:
+            if earlier is None:
+                stream.release()
+            else:
+                earlier.add_done_callback(lambda _: stream.release())
+        try:
+            audio = await synthesize_edge(text, self.voice, self.rate, self.pitch, self.cache, stream)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[Edge-TTS Error] {e}")
+            if fallback is None:
+                raise
+            await self._after(previous)
+            await asyncio.to_thread(fallback)
+            return False
+        await self._after(earlier)
+        settled.set_result(None)
+        if stream is not None:
+            return await stream.wait_async()
+        # No streaming output: queue in order once the previous utterance is done
+        await self._after(previous)
+        return await output.play(audio).wait_async() if audio else False
+
+    @staticmethod
+    async def _after(previous):
+        if previous is not None:
+            await asyncio.shield(previous)
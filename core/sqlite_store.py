@@ -0,0 +1,537 @@
+"""
+SQLite Collection Backend
+- Keeps tasks, notes, habits and schedule in SQLite (WAL mode)
+- Indexed lookups for overdue tasks, task lists, note search and schedule days
+- Note search through an FTS5 table kept in step by triggers (same query syntax as NoteIndex)
+- Plugs into JournalStore as its collection backend (same load/save contract)
+- One-shot migrator (sharded data directory or assistant_data.json) and a JSON vs SQLite benchmark
+"""
+
+import json
+import os
+import sqlite3
+import threading
+
+from core.note_index import parse_query
+from core.storage import apply_operation
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    doc TEXT NOT NULL,
+    completed INTEGER NOT NULL DEFAULT 0,
+    deadline TEXT,
+    priority TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_open_deadline ON tasks(completed, deadline);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority, completed);
+
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY,
+    doc TEXT NOT NULL,
+    category TEXT,
+    timestamp TEXT,
+    search TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_notes_category ON notes(category, timestamp);
+CREATE INDEX IF NOT EXISTS idx_notes_timestamp ON notes(timestamp);
+
+CREATE TABLE IF NOT EXISTS habits (
+    id INTEGER PRIMARY KEY,
+    doc TEXT NOT NULL,
+    name TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_habits_name ON habits(name);
+
+CREATE TABLE IF NOT EXISTS schedule (
+    date TEXT PRIMARY KEY,
+    doc TEXT NOT NULL
+);
+"""
+
+# Full-text index over the same fields NoteIndex tokenizes (\w+ words, case-folded)
+NOTE_FIELDS_SQL = """
+    COALESCE(json_extract({row}.doc, '$.title'), ''),
+    COALESCE(NULLIF(json_extract({row}.doc, '$.content'), ''), json_extract({row}.doc, '$.note'), ''),
+    COALESCE(json_extract({row}.doc, '$.category'), '')
+"""
+NOTES_FTS_SCHEMA = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, content, category, tokenize="unicode61 remove_diacritics 0 tokenchars '_'"
+);
+CREATE TRIGGER IF NOT EXISTS notes_fts_insert AFTER INSERT ON notes BEGIN
+    INSERT INTO notes_fts (rowid, title, content, category) VALUES (new.id, {NOTE_FIELDS_SQL.format(row="new")});
+END;
+CREATE TRIGGER IF NOT EXISTS notes_fts_delete AFTER DELETE ON notes BEGIN
+    DELETE FROM notes_fts WHERE rowid = old.id;
+END;
+CREATE TRIGGER IF NOT EXISTS notes_fts_update AFTER UPDATE ON notes BEGIN
+    DELETE FROM notes_fts WHERE rowid = old.id;
+    INSERT INTO notes_fts (rowid, title, content, category) VALUES (new.id, {NOTE_FIELDS_SQL.format(row="new")});
+END;
+"""
+
+PRIORITY_ORDER_SQL = "CASE priority WHEN 'high' THEN 0 WHEN 'low' THEN 2 ELSE 1 END"
+
+
+def _task_columns(task):
+    return {
+        "completed": 1 if task.get("completed") else 0,
+        "deadline": task.get("deadline"),
+        "priority": task.get("priority"),
+    }
+
+
+def _note_columns(note):
+    return {
+        "category": note.get("category"),
+        "timestamp": note.get("timestamp"),
+        # Same fields search_notes() has always matched on
+        "search": "\n".join([
+            note.get("title", "").lower(),
+            note.get("content", "").lower(),
+            note.get("category", "").lower(),
+        ]),
+    }
+
+
+def _habit_columns(habit):
+    return {"name": habit.get("name", "").lower()}
+
+
+LIST_TABLES = {
+    "tasks": _task_columns,
+    "notes": _note_columns,
+    "habits": _habit_columns,
+}
+
+
+class SQLiteStore:
+    """SQLite storage for the large assistant collections"""
+
+    collections = ("tasks", "notes", "habits", "schedule")
+
+    def __init__(self, db_path):
+        self.db_path = str(db_path)
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self.full_text = self._create_full_text()
+        self._ids = {}              # table -> row ids in list order, during one apply()
+
+    def _create_full_text(self):
+        """Set up notes_fts (False when this SQLite build lacks FTS5: LIKE search instead)"""
+        try:
+            with self._conn:
+                self._conn.executescript(NOTES_FTS_SCHEMA)
+                (indexed,) = self._conn.execute("SELECT COUNT(*) FROM notes_fts").fetchone()
+                (stored,) = self._conn.execute("SELECT COUNT(*) FROM notes").fetchone()
+                if indexed != stored:
+                    # Database written before the full-text table existed
+                    self._conn.execute("DELETE FROM notes_fts")
+                    self._conn.execute(
+                        "INSERT INTO notes_fts (rowid, title, content, category) "
+                        f"SELECT notes.id, {NOTE_FIELDS_SQL.format(row='notes')} FROM notes"
+                    )
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"[SQLite] Full-text search unavailable ({e}), using LIKE for notes")
+            return False
+
+    # ---- Backend contract used by JournalStore ----
+    def signature(self):
+        """Changes whenever another connection commits to the database"""
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def is_empty(self):
+        return not self.stored_collections()
+
+    def stored_collections(self):
+        """Names of the collections that have at least one row"""
+        with self._lock:
+            return [table for table in self.collections
+                    if self._conn.execute(f"SELECT 1 FROM {table} LIMIT 1").fetchone()]
+
+    def load_collection(self, name):
+        """One managed collection as plain Python objects (JournalStore loads them on first use)"""
+        with self._lock:
+            if name == "schedule":
+                rows = self._conn.execute("SELECT date, doc FROM schedule ORDER BY date")
+                return {date: json.loads(doc) for date, doc in rows}
+            rows = self._conn.execute(f"SELECT doc FROM {name} ORDER BY id")
+            return [json.loads(doc) for (doc,) in rows]
+
+    def load_collections(self):
+        """Return all managed collections as plain Python objects"""
+        return {name: self.load_collection(name) for name in self.collections}
+
+    def import_collections(self, doc):
+        """Replace the stored collections with the ones present in `doc`"""
+        with self._lock, self._conn:
+            for name in self.collections:
+                if name in doc:
+                    self._replace(name, doc[name])
+
+    def apply(self, ops):
+        """Apply JournalStore operations (paths rooted at a collection) atomically"""
+        with self._lock, self._conn:
+            # Row ids are read once per table and kept in step with each operation
+            self._ids = {}
+            try:
+                for op in ops:
+                    name, rest = op["path"][0], op["path"][1:]
+                    if name == "schedule":
+                        self._apply_schedule(op, rest)
+                    else:
+                        self._apply_list(name, op, rest)
+            finally:
+                self._ids = {}
+
+    # ---- Write helpers ----
+    def _insert(self, table, item):
+        columns = LIST_TABLES[table](item)
+        names = ", ".join(["doc"] + list(columns))
+        marks = ", ".join("?" * (len(columns) + 1))
+        cursor = self._conn.execute(
+            f"INSERT INTO {table} ({names}) VALUES ({marks})",
+            [json.dumps(item)] + list(columns.values()),
+        )
+        ids = self._ids.get(table)
+        if ids is not None:
+            ids.append(cursor.lastrowid)
+
+    def _update(self, table, row_id, item):
+        columns = LIST_TABLES[table](item)
+        assignments = ", ".join(f"{name} = ?" for name in ["doc"] + list(columns))
+        self._conn.execute(
+            f"UPDATE {table} SET {assignments} WHERE id = ?",
+            [json.dumps(item)] + list(columns.values()) + [row_id],
+        )
+
+    def _row_ids(self, table):
+        """Row ids in list order (read once per apply(), then kept up to date)"""
+        ids = self._ids.get(table)
+        if ids is None:
+            ids = self._ids[table] = [
+                row_id for (row_id,) in self._conn.execute(f"SELECT id FROM {table} ORDER BY id")
+            ]
+        return ids
+
+    def _replace(self, name, value):
+        self._ids.pop(name, None)
+        self._conn.execute(f"DELETE FROM {name}")
+        if name == "schedule":
+            self._conn.executemany(
+                "INSERT INTO schedule (date, doc) VALUES (?, ?)",
+                [(date, json.dumps(day)) for date, day in (value or {}).items()],
+            )
+        elif value:
+            column_fn = LIST_TABLES[name]
+            columns = list(column_fn(value[0]))
+            names = ", ".join(["doc"] + columns)
+            marks = ", ".join("?" * (len(columns) + 1))
+            self._conn.executemany(
+                f"INSERT INTO {name} ({names}) VALUES ({marks})",
+                ([json.dumps(item)] + list(column_fn(item).values()) for item in value),
+            )
+
+    def _apply_list(self, table, op, rest):
+        kind = op["op"]
+        if not rest:
+            if kind == "set":
+                self._replace(table, op["value"])
+            elif kind == "del":
+                self._ids.pop(table, None)
+                self._conn.execute(f"DELETE FROM {table}")
+            elif kind == "extend":
+                for item in op["values"]:
+                    self._insert(table, item)
+            elif kind == "trim":
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE id IN "
+                    f"(SELECT id FROM {table} ORDER BY id LIMIT ?)",
+                    (op["count"],),
+                )
+                if table in self._ids:
+                    del self._ids[table][:op["count"]]
+            elif kind == "remove":
+                ids = self._row_ids(table)
+                self._conn.executemany(
+                    f"DELETE FROM {table} WHERE id = ?",
+                    [(ids[i],) for i in op["indices"]],
+                )
+                for i in reversed(op["indices"]):
+                    del ids[i]
+            return
+
+        ids = self._row_ids(table)
+        index = rest[0]
+        if kind == "set" and len(rest) == 1:
+            if index == len(ids):
+                self._insert(table, op["value"])
+            else:
+                self._update(table, ids[index], op["value"])
+            return
+        # Deeper edit: patch the stored item
+        (doc,) = self._conn.execute(f"SELECT doc FROM {table} WHERE id = ?", (ids[index],)).fetchone()
+        item = json.loads(doc)
+        apply_operation(item, dict(op, path=rest[1:]))
+        self._update(table, ids[index], item)
+
+    def _apply_schedule(self, op, rest):
+        kind = op["op"]
+        if not rest:
+            if kind == "set":
+                self._replace("schedule", op["value"])
+            elif kind == "del":
+                self._conn.execute("DELETE FROM schedule")
+            return
+
+        date = rest[0]
+        if len(rest) == 1:
+            if kind == "set":
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO schedule (date, doc) VALUES (?, ?)",
+                    (date, json.dumps(op["value"])),
+                )
+            elif kind == "del":
+                self._conn.execute("DELETE FROM schedule WHERE date = ?", (date,))
+            return
+
+        day = self.schedule_day(date) or {}
+        apply_operation(day, dict(op, path=rest[1:]))
+        self._conn.execute(
+            "INSERT OR REPLACE INTO schedule (date, doc) VALUES (?, ?)",
+            (date, json.dumps(day)),
+        )
+
+    # ---- Indexed queries ----
+    def _docs(self, sql, params=()):
+        with self._lock:
+            return [json.loads(doc) for (doc,) in self._conn.execute(sql, params)]
+
+    def overdue_tasks(self, today):
+        """Open tasks whose deadline is before `today` (ISO date)"""
+        return self._docs(
+            "SELECT doc FROM tasks WHERE completed = 0 AND deadline IS NOT NULL AND deadline != '' "
+            "AND deadline < ? ORDER BY id",
+            (today,),
+        )
+
+    def query_tasks(self, filter_type="active", priority=None):
+        """Tasks filtered like list_tasks(), sorted by priority then deadline"""
+        clauses, params = [], []
+        if filter_type == "active":
+            clauses.append("completed = 0")
+        elif filter_type == "completed":
+            clauses.append("completed = 1")
+        if priority:
+            clauses.append("priority = ?")
+            params.append(priority.lower())
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._docs(
+            f"SELECT doc FROM tasks {where} "
+            f"ORDER BY {PRIORITY_ORDER_SQL}, COALESCE(deadline, '9999-12-31'), id",
+            params,
+        )
+
+    def search_notes(self, query, category=None):
+        """
+        Notes matching every query term, best BM25 score first. Same query
+        syntax and matches as NoteIndex.search(): words, word* prefixes,
+        "quoted phrases" and category:<name>.
+        """
+        clauses, category = parse_query(query, category)
+        if not clauses and category is None:
+            return []
+        where, params = [], []
+        if category is not None:
+            where.append("LOWER(COALESCE(notes.category, 'general')) = ?")
+            params.append(category.lower())
+        if not clauses:
+            return self._docs(f"SELECT doc FROM notes WHERE {where[0]} ORDER BY id", params)
+
+        if not self.full_text:
+            for clause in clauses:
+                words = " ".join(clause[1]) if clause[0] == "phrase" else clause[1]
+                where.append("notes.search LIKE ? ESCAPE '\\'")
+                params.append("%" + words.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+            return self._docs(f"SELECT doc FROM notes WHERE {' AND '.join(where)} ORDER BY id", params)
+
+        # Tokens are \w+ words, so quoting them is all the escaping FTS5 needs
+        match = " ".join(
+            '"' + " ".join(clause[1]) + '"' if clause[0] == "phrase"
+            else '"' + clause[1] + '"' + ("*" if clause[2] else "")
+            for clause in clauses
+        )
+        where.insert(0, "notes_fts MATCH ?")
+        params.insert(0, match)
+        return self._docs(
+            "SELECT notes.doc FROM notes_fts JOIN notes ON notes.id = notes_fts.rowid "
+            f"WHERE {' AND '.join(where)} ORDER BY bm25(notes_fts), notes.id",
+            params,
+        )
+
+    def find_habit(self, habit_name):
+        docs = self._docs("SELECT doc FROM habits WHERE name = ? LIMIT 1", (habit_name.lower(),))
+        return docs[0] if docs else None
+
+    def habit_position(self, habit_name):
+        """Index of the habit named habit_name (any case) in the habits list, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM habits WHERE name = ? ORDER BY id LIMIT 1", (habit_name.lower(),)
+            ).fetchone()
+            if row is None:
+                return None
+            return self._conn.execute("SELECT COUNT(*) FROM habits WHERE id < ?", row).fetchone()[0]
+
+    def schedule_day(self, date_key):
+        docs = self._docs("SELECT doc FROM schedule WHERE date = ?", (date_key,))
+        return docs[0] if docs else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def migrate_json_to_sqlite(json_path, db_path, data_dir=None):
+    """
+    One-shot migration of the collections into SQLite, from the first source found:
+    - the sharded data directory (data_dir, default assistant_data/ next to json_path)
+    - assistant_data.json (rewritten without the collections)
+    - assistant_data.json.migrated, the copy left behind by the shard split
+    Collections the database already holds are kept (JournalStore._merge_legacy).
+    """
+    from core.sharded_store import ShardedStore
+    from core.storage import JournalStore
+
+    json_path = str(json_path)
+    if data_dir is None:
+        data_dir = os.path.join(os.path.dirname(json_path), "assistant_data")
+    backend = SQLiteStore(db_path)
+    if os.path.isdir(data_dir):
+        source = str(data_dir)
+        ShardedStore(data_dir, legacy_path=json_path, collection_backend=backend).load()
+    elif os.path.exists(json_path):
+        source = json_path
+        JournalStore(json_path, collection_backend=backend).load()
+    else:
+        source = json_path + ".migrated"
+        doc = JournalStore(source).load() if os.path.exists(source) else None
+        stored = backend.stored_collections()
+        backend.import_collections({
+            name: doc[name] for name in backend.collections
+            if doc is not None and name in doc and name not in stored
+        })
+    counts = {name: len(backend.load_collection(name)) for name in backend.collections}
+    backend.close()
+    print(f"[SQLite] Migrated {counts} from {source} into {db_path}")
+    return counts
+
+
+# Performance benchmarking
+def benchmark_backends(sizes=(10_000, 100_000)):
+    """Compare JSON list scans against indexed SQLite queries"""
+    import datetime
+    import random
+    import shutil
+    import tempfile
+    import time
+
+    def timed(fn, repeat=20):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat * 1000
+
+    print("\n=== Storage Backend Benchmark ===")
+    today = datetime.date.today()
+    for n in sizes:
+        rng = random.Random(n)
+        doc = {
+            "tasks": [{
+                "id": str(i),
+                "description": f"task {i}",
+                "priority": rng.choice(["high", "medium", "low"]),
+                "deadline": (today + datetime.timedelta(days=rng.randint(-60, 60))).isoformat(),
+                "completed": rng.random() < 0.7,
+            } for i in range(n)],
+            "notes": [{
+                "id": str(i),
+                "title": f"note {i}",
+                "content": f"content {rng.randint(0, n)} lorem ipsum",
+                "category": rng.choice(["ideas", "meeting", "personal", "general"]),
+                "timestamp": f"2025-01-01T00:00:{i % 60:02d}",
+            } for i in range(n)],
+            "habits": [{"name": f"habit {i}", "streak": 0, "last_done": None} for i in range(n)],
+            "schedule": {
+                (today - datetime.timedelta(days=i)).isoformat(): {"plans": [f"plan {i}"]}
+                for i in range(n)
+            },
+        }
+        tmp_dir = tempfile.mkdtemp(prefix="jarvis_bench_")
+        try:
+            json_path = os.path.join(tmp_dir, "assistant_data.json")
+            with open(json_path, "w") as f:
+                json.dump(doc, f)
+
+            start = time.perf_counter()
+            with open(json_path) as f:
+                data = json.load(f)
+            json_load = (time.perf_counter() - start) * 1000
+
+            start = time.perf_counter()
+            migrate_json_to_sqlite(json_path, os.path.join(tmp_dir, "assistant_data.db"))
+            migrate_ms = (time.perf_counter() - start) * 1000
+            backend = SQLiteStore(os.path.join(tmp_dir, "assistant_data.db"))
+
+            today_key = today.isoformat()
+            probe = f"habit {n - 1}"
+            json_times = {
+                "overdue tasks": timed(lambda: [
+                    t for t in data["tasks"]
+                    if not t.get("completed") and t.get("deadline") and t.get("deadline") < today_key]),
+                "high priority active": timed(lambda: sorted(
+                    [t for t in data["tasks"] if not t.get("completed") and t.get("priority") == "high"],
+                    key=lambda t: t.get("deadline") or "9999-12-31")),
+                "search notes": timed(lambda: [
+                    nt for nt in data["notes"]
+                    if "ideas" in nt.get("title", "").lower()
+                    or "ideas" in nt.get("content", "").lower()
+                    or "ideas" in nt.get("category", "").lower()]),
+                "find habit": timed(lambda: next(
+                    (h for h in data["habits"] if h.get("name", "").lower() == probe), None)),
+                "schedule day": timed(lambda: data["schedule"].get(today_key)),
+            }
+            sqlite_times = {
+                "overdue tasks": timed(lambda: backend.overdue_tasks(today_key)),
+                "high priority active": timed(lambda: backend.query_tasks("active", "high")),
+                "search notes": timed(lambda: backend.search_notes("ideas")),
+                "find habit": timed(lambda: backend.find_habit(probe)),
+                "schedule day": timed(lambda: backend.schedule_day(today_key)),
+            }
+            backend.close()
+
+            print(f"\n{n:,} records per collection:")
+            print(f"  JSON parse: {json_load:.1f}ms | SQLite migration: {migrate_ms:.1f}ms")
+            for name in json_times:
+                print(f"  {name:<22} JSON {json_times[name]:9.3f}ms   SQLite {sqlite_times[name]:9.3f}ms")
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    print("\n=================================\n")
+
+
+if __name__ == "__main__":
+    import sys
+    from pathlib import Path
+
+    root = Path(__file__).parent.parent
+    if len(sys.argv) > 1 and sys.argv[1] == "migrate":
+        migrate_json_to_sqlite(root / "assistant_data.json", root / "assistant_data.db", root / "assistant_data")
+    else:
+        benchmark_backends()
@@ -0,0 +1,818 @@
+"""
+Journaled Data Store
+- Snapshot file plus an append-only mutation journal
+- save() appends only what changed since the previous save
+- Periodic compaction folds the journal back into the snapshot
+- Parsed document cached in-process, re-read only on mtime/size change
+- Copy-on-write documents handed to callers
+- Optional collection backend (e.g. SQLite) for the large collections
+- Optional write-behind: saves coalesced and flushed by a background timer
+- Per-thread unit of work: grouped saves rebased onto the current document at commit
+- Same load/save contract as the plain assistant_data.json file
+"""
+
+import atexit
+import contextlib
+import copy
+import json
+import os
+import signal
+import threading
+import time
+import zlib
+
+_MISSING = object()
+_UNLOADED = object()            # Placeholder for a collection not read from its backend yet
+
+
+def diff_documents(old, new, keys=None):
+    """
+    Compute journal operations that turn `old` into `new`.
+    Top-level collections are diffed item by item, so appending a note or
+    ticking a habit produces one small record instead of the whole file.
+    `keys` restricts the diff to the top-level keys the caller touched.
+    """
+    ops = []
+    if keys is None:
+        removed = [key for key in old if not dict.__contains__(new, key)]
+        # Untouched collections of a CowDocument are still the committed ones
+        # (for a ShardedDocument, possibly not even loaded): nothing to diff
+        keys = new.touched_keys() if isinstance(new, CowDocument) else list(dict.keys(new))
+    else:
+        removed = [key for key in keys if key in old and not dict.__contains__(new, key)]
+    for key in removed:
+        ops.append({"op": "del", "path": [key]})
+    for key in keys:
+        if not dict.__contains__(new, key):
+            continue
+        value = dict.__getitem__(new, key)
+        before = old.get(key, _MISSING)
+        if before is _MISSING:
+            ops.append({"op": "set", "path": [key], "value": value})
+        elif before is not value:
+            _diff_collection(before, value, [key], ops)
+    return ops
+
+
+def _diff_collection(old, new, path, ops):
+    """Diff one collection (list or dict) one level deep"""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key in old:
+            if key not in new:
+                ops.append({"op": "del", "path": path + [key]})
+        for key, value in new.items():
+            before = old.get(key, _MISSING)
+            if before is _MISSING or (before is not value and before != value):
+                ops.append({"op": "set", "path": path + [key], "value": value})
+        return
+
+    if isinstance(old, list) and isinstance(new, list):
+        n_old, n_new = len(old), len(new)
+
+        # Pure append (notes, tasks, conversations)
+        if n_new >= n_old and new[:n_old] == old:
+            if n_new > n_old:
+                ops.append({"op": "extend", "path": path, "values": new[n_old:]})
+            return
+
+        # Head trimmed, then appended (capped histories)
+        if old and new:
+            try:
+                shift = old.index(new[0])
+            except ValueError:
+                shift = 0
+            kept = n_old - shift
+            if shift and kept <= n_new and new[:kept] == old[shift:]:
+                ops.append({"op": "trim", "path": path, "count": shift})
+                if n_new > kept:
+                    ops.append({"op": "extend", "path": path, "values": new[kept:]})
+                return
+
+        # Items removed (delete task, remove habit)
+        if n_new < n_old:
+            removed = []
+            j = 0
+            for i, item in enumerate(old):
+                if j < n_new and (new[j] is item or new[j] == item):
+                    j += 1
+                else:
+                    removed.append(i)
+            if j == n_new:
+                ops.append({"op": "remove", "path": path, "indices": removed})
+                return
+
+        # Items edited in place (habit streaks, task completion)
+        if n_new == n_old:
+            changed = [i for i in range(n_new) if old[i] is not new[i] and old[i] != new[i]]
+            if len(changed) * 2 <= n_new:
+                for i in changed:
+                    ops.append({"op": "set", "path": path + [i], "value": new[i]})
+                return
+
+    if old != new:
+        ops.append({"op": "set", "path": path, "value": new})
+
+
+def apply_operation(doc, op):
+    """Apply a single journal operation to a document in place"""
+    path = op["path"]
+    target = doc
+    for key in path[:-1]:
+        target = target[key]
+    last = path[-1]
+    kind = op["op"]
+
+    if kind == "set":
+        if isinstance(target, list) and last == len(target):
+            target.append(op["value"])
+        else:
+            target[last] = op["value"]
+    elif kind == "del":
+        del target[last]
+    elif kind == "extend":
+        target[last].extend(op["values"])
+    elif kind == "trim":
+        del target[last][:op["count"]]
+    elif kind == "remove":
+        items = target[last]
+        for index in reversed(op["indices"]):
+            del items[index]
+    else:
+        raise ValueError(f"Unknown journal operation: {kind}")
+
+
+def _index_of(items, item):
+    for i, candidate in enumerate(items):
+        if candidate is item or candidate == item:
+            return i
+    return -1
+
+
+def _merge_collection(before, ours, current):
+    """Three-way merge of a replaced collection: our changes on top of theirs"""
+    if isinstance(before, dict) and isinstance(ours, dict) and isinstance(current, dict):
+        merged = dict(current)
+        for key in before:
+            if key not in ours:
+                merged.pop(key, None)
+        for key, value in ours.items():
+            if before.get(key, _MISSING) != value:
+                merged[key] = value
+        return merged
+    if isinstance(before, list) and isinstance(ours, list) and isinstance(current, list):
+        gone = [item for item in before if _index_of(ours, item) < 0]
+        fresh = [item for item in ours if _index_of(before, item) < 0]
+        merged = list(current)
+        if len(gone) == len(fresh):
+            # Same count: records edited in place, keep their positions
+            for old, new in zip(gone, fresh):
+                i = _index_of(merged, old)
+                if i >= 0:
+                    merged[i] = new
+                else:
+                    merged.append(new)
+            return merged
+        for item in gone:
+            i = _index_of(merged, item)
+            if i >= 0:
+                del merged[i]
+        return merged + fresh
+    return ours
+
+
+def rebase_operations(doc, ops, base):
+    """
+    Apply operations computed against `base` to `doc`, a newer document that
+    other writers may have changed since. List items are located by value, so
+    a concurrent append or removal does not shift these edits onto the wrong
+    record. An edit whose record is gone or changed meanwhile is dropped.
+    Returns the number of operations dropped.
+    """
+    dropped = 0
+    for op in ops:
+        path, kind = op["path"], op["op"]
+        key = path[0]
+        if len(path) == 1:
+            before = base.get(key, _MISSING)
+            if kind == "del":
+                if key in doc:
+                    del doc[key]
+            elif kind == "set":
+                current = doc.get(key, _MISSING)
+                value = op["value"]
+                if current is not _MISSING and before is not _MISSING and current != before:
+                    value = _merge_collection(before, value, current)
+                doc[key] = value
+            elif kind == "extend":
+                doc.setdefault(key, []).extend(op["values"])
+            else:
+                # trim/remove: drop the same records, wherever they are now
+                current = doc.get(key, [])
+                gone = before[:op["count"]] if kind == "trim" else [before[i] for i in op["indices"]]
+                for item in gone:
+                    i = _index_of(current, item)
+                    if i >= 0:
+                        del current[i]
+            continue
+
+        collection = doc.get(key, _MISSING)
+        sub = path[1]
+        if isinstance(collection, dict):
+            if kind == "del":
+                collection.pop(sub, None)
+            else:
+                collection[sub] = op["value"]
+        elif isinstance(collection, list) and kind == "set":
+            old_items = base.get(key, [])
+            i = _index_of(collection, old_items[sub]) if sub < len(old_items) else -1
+            if i >= 0:
+                collection[i] = op["value"]
+            elif sub >= len(old_items):
+                collection.append(op["value"])
+            else:
+                dropped += 1
+        else:
+            dropped += 1
+    if dropped:
+        print(f"[Storage] ⚠ {dropped} change(s) dropped: their records changed concurrently")
+    return dropped
+
+
+class CowDocument(dict):
+    """
+    Copy-on-write view of the cached document.
+    Top-level collections stay shared with the cache until the caller first
+    reads or replaces them; only then is that one collection deep-copied.
+    Collections still _UNLOADED are fetched through `loader` at that point.
+    dict(doc), {**doc} and comparisons go through the same path, so they
+    never see the placeholder.
+    With track_base(), each collection is also kept as committed when first
+    touched, so the changes can later be diffed and rebased (UnitOfWork).
+    """
+
+    __slots__ = ("_lock", "_touched", "_base", "_loader")
+
+    def __init__(self, base, lock, loader=None):
+        dict.__init__(self, base)
+        self._lock = lock
+        self._touched = set()
+        self._base = None
+        self._loader = loader
+
+    def _own(self, key):
+        if key not in self._touched:
+            self._touched.add(key)
+            if dict.__contains__(self, key):
+                with self._lock:
+                    value = dict.__getitem__(self, key)
+                    if value is _UNLOADED:
+                        value = self._loader(key)
+                    self._keep_base(key, value)
+                    dict.__setitem__(self, key, copy.deepcopy(value))
+
+    def _keep_base(self, key, value):
+        if self._base is not None:
+            self._base[key] = copy.deepcopy(value)
+
+    def track_base(self):
+        """Remember committed values from now on (call before touching anything)"""
+        self._base = {}
+        return self
+
+    def base_values(self):
+        """Committed values of the touched collections (track_base() documents)"""
+        return dict(self._base or {})
+
+    def __getitem__(self, key):
+        self._own(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        if not dict.__contains__(self, key):
+            return default
+        self._own(key)
+        return dict.__getitem__(self, key)
+
+    def setdefault(self, key, default=None):
+        self._own(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        self._own(key)
+        return dict.pop(self, key, *default)
+
+    def __setitem__(self, key, value):
+        if self._base is not None:
+            self._own(key)          # Keep the committed value before replacing it
+        self._touched.add(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        if self._base is not None:
+            self._own(key)
+        self._touched.add(key)
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def values(self):
+        for key in list(dict.keys(self)):
+            self._own(key)
+        return dict.values(self)
+
+    def items(self):
+        for key in list(dict.keys(self)):
+            self._own(key)
+        return dict.items(self)
+
+    def copy(self):
+        return {key: self[key] for key in list(dict.keys(self))}
+
+    # Overriding __iter__ stops dict(doc) / {**doc} copying the raw slots
+    def __iter__(self):
+        return iter(list(dict.keys(self)))
+
+    def __eq__(self, other):
+        return self.copy() == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        loaded = {key: value for key, value in dict.items(self) if value is not _UNLOADED}
+        return f"{type(self).__name__}({loaded!r}, unloaded={self.unloaded_keys()!r})"
+
+    def popitem(self):
+        key = next(reversed(list(dict.keys(self))))
+        return key, self.pop(key)
+
+    def unloaded_keys(self):
+        return [key for key, value in dict.items(self) if value is _UNLOADED]
+
+    def touched_keys(self):
+        """Top-level keys read, replaced or deleted through this document"""
+        return list(self._touched)
+
+
+def atomic_write(path, payload):
+    """Write bytes to path via temp file + fsync + rename"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+_main_writes = 0                # Store writes in progress on the main thread
+_deferred_signals = []          # (handler, signum) that arrived during one
+
+
+@contextlib.contextmanager
+def _writing():
+    """
+    Mark a store write. Signal handlers run on the main thread, in the middle
+    of whatever it was doing; one arriving while the main thread is inside a
+    write would flush (the store lock is reentrant) a half-updated document.
+    Such signals are handled once the outermost write has finished.
+    """
+    global _main_writes
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+    _main_writes += 1
+    try:
+        yield
+    finally:
+        _main_writes -= 1
+        if not _main_writes and _deferred_signals:
+            pending = list(_deferred_signals)
+            _deferred_signals.clear()
+            for handler, signum in pending:
+                handler(signum, None)
+
+
+def install_exit_handlers(flush):
+    """Run `flush` at interpreter exit and before SIGINT/SIGTERM are handled"""
+    atexit.register(flush)
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    for sig in (signal.SIGINT, getattr(signal, "SIGTERM", None)):
+        if sig is None:
+            continue
+        previous = signal.getsignal(sig)
+
+        def handler(signum, frame, previous=previous):
+            if _main_writes:
+                _deferred_signals.append((handler, signum))
+                return
+            flush()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous == signal.SIG_DFL:
+                signal.signal(signum, signal.SIG_DFL)
+                signal.raise_signal(signum)
+
+        signal.signal(sig, handler)
+
+
+def _stat_signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        return None
+
+
+class JournalStore:
+    """
+    JSON document stored as snapshot + journal.
+
+    The journal's first line records the CRC of the snapshot it applies to,
+    so a crash between writing a new snapshot and resetting the journal
+    never replays operations twice.
+
+    A collection_backend (see core.sqlite_store.SQLiteStore) takes ownership
+    of the top-level keys listed in its `collections`; operations on those
+    keys go to the backend instead of the journal.
+
+    With flush_delay > 0, save() only updates the in-memory document; the
+    operations collected within that window are written by a background
+    timer as one journal record and one backend transaction. Call flush()
+    (or install_exit_handlers()) so nothing is lost on shutdown.
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, compact_every=500,
+                 compact_min_bytes=64 * 1024, collection_backend=None, flush_delay=0.0):
+        self.snapshot_path = str(snapshot_path)
+        if journal_path is None:
+            journal_path = os.path.splitext(self.snapshot_path)[0] + ".journal"
+        self.journal_path = str(journal_path)
+        self.compact_every = compact_every
+        self.compact_min_bytes = compact_min_bytes
+        self.backend = collection_backend
+        self.flush_delay = flush_delay
+
+        self._lock = threading.RLock()
+        self._state = None          # Last committed document (private copy)
+        self._signature = None      # On-disk signature matching _state
+        self._snapshot_crc = None
+        self._snapshot_bytes = 0
+        self._journal_ops = 0
+        self._journal_bytes = 0
+        self.parse_count = 0        # Full snapshot parses (cache misses)
+        self._needs_compact = False
+        self._pending = []          # Operations saved but not yet written
+        self._flush_timer = None
+        self.flush_count = 0
+
+    # ---- Disk access ----
+    def _disk_signature(self):
+        signature = (_stat_signature(self.snapshot_path), _stat_signature(self.journal_path))
+        if self.backend is not None:
+            signature += (self.backend.signature(),)
+        return signature
+
+    def _read_disk(self):
+        """
+        Full document: snapshot + journal. The backend's collections are
+        placeholders, read one at a time when first used (_resolve).
+        """
+        doc = self._read_files()
+        if self.backend is None:
+            return doc
+
+        legacy = {}
+        if doc is not None:
+            for name in self.backend.collections:
+                if name in doc:
+                    legacy[name] = doc.pop(name)
+        if legacy:
+            self._merge_legacy(legacy)
+            self._needs_compact = True
+        elif doc is None and self.backend.is_empty():
+            return None
+
+        doc = doc if doc is not None else {}
+        doc.update(dict.fromkeys(self.backend.collections, _UNLOADED))
+        return doc
+
+    def _merge_legacy(self, legacy):
+        """Collections still inside the JSON snapshot: import what the backend lacks"""
+        stored = self.backend.stored_collections()
+        missing = {name: value for name, value in legacy.items() if name not in stored}
+        if missing:
+            self.backend.import_collections(missing)
+            print(f"[Storage] Migrated {', '.join(missing)} into {self.backend.db_path}")
+        for name in legacy:
+            if name in missing or legacy[name] == self.backend.load_collection(name):
+                continue
+            # Both hold different data: keep the JSON copy next to the snapshot, never drop it
+            aside = f"{self.snapshot_path}.{name}-{time.strftime('%Y%m%d-%H%M%S')}.json"
+            atomic_write(aside, json.dumps({name: legacy[name]}, indent=4).encode("utf-8"))
+            print(f"[Storage] ⚠ '{name}' differs between {self.snapshot_path} and "
+                  f"{self.backend.db_path}; kept the database copy, JSON copy saved to {aside}")
+
+    def _resolve(self, key):
+        """Committed value of a top-level key, reading a backend collection on first use"""
+        value = self._state.get(key, _MISSING)
+        if value is _UNLOADED:
+            value = self._state[key] = self.backend.load_collection(key)
+        return value
+
+    def _read_files(self):
+        """Parse snapshot and replay the journal. Returns the document or None."""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                raw = f.read()
+        except FileNotFoundError:
+            self._snapshot_crc = None
+            self._snapshot_bytes = 0
+            self._journal_ops = self._journal_bytes = 0
+            return None
+
+        self._snapshot_crc = zlib.crc32(raw)
+        self._snapshot_bytes = len(raw)
+        self._journal_ops = self._journal_bytes = 0
+        try:
+            doc = json.loads(raw)
+        except json.JSONDecodeError as e:
+            # Keep the damaged file instead of letting the next save overwrite it
+            quarantine = f"{self.snapshot_path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+            os.replace(self.snapshot_path, quarantine)
+            print(f"[Storage] ⚠ Could not decode {self.snapshot_path}: {e}")
+            print(f"[Storage] ⚠ Damaged file moved to {quarantine}, starting fresh")
+            self._snapshot_crc = None
+            self._snapshot_bytes = 0
+            return None
+        self.parse_count += 1
+
+        try:
+            with open(self.journal_path, "rb") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return doc
+
+        if not lines:
+            return doc
+        try:
+            header = json.loads(lines[0])
+        except json.JSONDecodeError:
+            header = {}
+        if header.get("base") != self._snapshot_crc:
+            # Journal predates the current snapshot (already compacted) - ignore
+            return doc
+
+        self._journal_bytes = sum(len(line) + 1 for line in lines)
+        for line in lines[1:]:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # Torn final record from an interrupted write
+                break
+            for op in record.get("ops", []):
+                apply_operation(doc, op)
+                self._journal_ops += 1
+        return doc
+
+    def _refresh_base(self):
+        """Re-read committed state only if the files changed behind our back"""
+        if self._pending:
+            # Unflushed saves make the in-memory document the newest state
+            return
+        signature = self._disk_signature()
+        if self._state is None or signature != self._signature:
+            self._state = self._read_disk()
+            self._signature = signature
+            if self._needs_compact:
+                self._needs_compact = False
+                self.compact()
+
+    # ---- Public API ----
+    def load(self):
+        """
+        Return the cached document as a CowDocument (or None).
+        Disk is only re-read when the snapshot or journal changed on disk.
+        """
+        with self._lock, _writing():
+            self._refresh_base()
+            if self._state is None:
+                return None
+            return CowDocument(self._state, self._lock, loader=self._resolve)
+
+    def save(self, data, keys=None):
+        """
+        Persist `data`, appending only the changes to the journal.
+        `keys` limits the save to those top-level keys (defaults to the keys
+        touched through a CowDocument, or every key for a plain dict).
+        """
+        with self._lock, _writing():
+            self._refresh_base()
+            if self._state is None:
+                self._state = copy.deepcopy(dict(data))
+                if self.backend is not None:
+                    self.backend.import_collections(self._state)
+                self.compact()
+                return
+
+            if keys is None and isinstance(data, CowDocument):
+                keys = data.touched_keys()
+            for key in (keys if keys is not None else list(self._state)):
+                self._resolve(key)
+            ops = diff_documents(self._state, data, keys)
+            if not ops:
+                return
+
+            for op in ops:
+                apply_operation(self._state, copy.deepcopy(op))
+            self._pending.extend(ops)
+
+            if self.flush_delay <= 0:
+                self.flush()
+            elif self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+
+    def flush(self):
+        """Write all pending operations now (no-op when nothing is pending)"""
+        with self._lock, _writing():
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            journal_ops = self._write_backend_ops()
+            if not journal_ops:
+                return
+            self._append_journal(journal_ops)
+            self.flush_count += 1
+
+            if (self._journal_ops >= self.compact_every or
+                    self._journal_bytes > max(self._snapshot_bytes, self.compact_min_bytes)):
+                self.compact()
+
+    def _write_backend_ops(self):
+        """Hand pending backend operations over; return the journal ones"""
+        ops, self._pending = self._pending, []
+        if self.backend is None:
+            return ops
+        owned = self.backend.collections
+        backend_ops = [op for op in ops if op["path"][0] in owned]
+        if backend_ops:
+            self.backend.apply(backend_ops)
+        return [op for op in ops if op["path"][0] not in owned]
+
+    def install_exit_handlers(self):
+        """Flush on interpreter exit and on SIGINT/SIGTERM (main thread only)"""
+        install_exit_handlers(self.flush)
+
+    def _append_journal(self, ops):
+        line = (json.dumps({"ops": ops}, separators=(",", ":")) + "\n").encode("utf-8")
+        if _stat_signature(self.journal_path) is None or self._journal_bytes == 0:
+            header = (json.dumps({"base": self._snapshot_crc}) + "\n").encode("utf-8")
+            atomic_write(self.journal_path, header)
+            self._journal_bytes = len(header)
+        with open(self.journal_path, "ab") as f:
+            f.write(line)
+        self._journal_ops += len(ops)
+        self._journal_bytes += len(line)
+        self._signature = self._disk_signature()
+
+    def drop(self):
+        """Delete the snapshot and journal and forget the cached document"""
+        with self._lock, _writing():
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._pending = []
+            for path in (self.snapshot_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._state = None
+            self._signature = None
+
+    def compact(self):
+        """Fold the journal into a new snapshot and start an empty journal"""
+        with self._lock, _writing():
+            if self._state is None:
+                return
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            # Pending journal operations are already part of _state
+            self._write_backend_ops()
+            snapshot = self._state
+            if self.backend is not None:
+                snapshot = {key: value for key, value in self._state.items()
+                            if key not in self.backend.collections}
+            payload = json.dumps(snapshot, indent=4).encode("utf-8")
+            atomic_write(self.snapshot_path, payload)
+            self._snapshot_crc = zlib.crc32(payload)
+            self._snapshot_bytes = len(payload)
+
+            header = (json.dumps({"base": self._snapshot_crc}) + "\n").encode("utf-8")
+            atomic_write(self.journal_path, header)
+            self._journal_ops = 0
+            self._journal_bytes = len(header)
+            self._signature = self._disk_signature()
+
+
+class UnitOfWork:
+    """
+    Per-thread transaction over a store (JournalStore or ShardedStore).
+
+    Inside `with uow.transaction():` every load() on that thread returns the
+    same document and save() only records it. When the block exits normally
+    the changes are diffed against the values first read and replayed onto
+    the store's current document, so writes made meanwhile by other threads
+    (reminders, the flusher) survive; if the block raises they are discarded.
+    Nested transactions join the outermost one.
+
+    Keep transactions around data mutations only, never around LLM calls or
+    listen(). Side effects that must match the committed data (search index,
+    log migration) go through after_commit().
+    """
+
+    def __init__(self, store, default=None):
+        self.store = store
+        self.default = default or (lambda: {})
+        self._local = threading.local()
+
+    @property
+    def active(self):
+        return getattr(self._local, "doc", None) is not None
+
+    def _begin(self):
+        doc = self.store.load()
+        if isinstance(doc, CowDocument):
+            doc.track_base()
+        self._local.doc = doc if doc is not None else self.default()
+        self._local.dirty = False
+        self._local.after = []
+
+    @contextlib.contextmanager
+    def transaction(self):
+        if self.active:
+            yield self._local.doc
+            return
+        self._begin()
+        try:
+            yield self._local.doc
+        except BaseException:
+            self._local.doc = None
+            self._local.after = []
+            print("[Storage] Command failed, changes rolled back")
+            raise
+        doc, dirty, after = self._local.doc, self._local.dirty, self._local.after
+        self._local.doc = None
+        self._local.after = []
+        if dirty:
+            self._commit(doc)
+        for fn in after:
+            try:
+                fn()
+            except Exception as e:
+                print(f"[Storage] After-commit step failed: {e}")
+
+    def _commit(self, doc):
+        if not isinstance(doc, CowDocument):
+            self.store.save(doc)
+            return
+        keys = doc.touched_keys()
+        base = doc.base_values()
+        ops = diff_documents(base, doc, keys)
+        if not ops:
+            return
+        with self.store._lock, _writing():
+            current = self.store.load()
+            if current is None:
+                self.store.save(doc)
+                return
+            rebase_operations(current, copy.deepcopy(ops), base)
+            self.store.save(current)
+
+    def after_commit(self, fn):
+        """Run fn once the current transaction commits (now, outside one; never on rollback)"""
+        if self.active:
+            self._local.after.append(fn)
+        else:
+            fn()
+
+    def load(self):
+        if self.active:
+            return self._local.doc
+        doc = self.store.load()
+        return doc if doc is not None else self.default()
+
+    def save(self, data):
+        if not self.active:
+            self.store.save(data)
+            return
+        doc = self._local.doc
+        if data is not doc:
+            # A separately built dict: fold its collections into the transaction
+            for key in list(dict.keys(data)):
+                doc[key] = data[key]
+        self._local.dirty = True
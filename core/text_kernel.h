@@ -0,0 +1,44 @@
+/*
+ * Jarvis text kernel - shared by acceleration.c (ctypes) and _textkernel.c (CPython)
+ *
+ * Preprocessing keeps ASCII letters, digits and spaces and lowercases them.
+ * The output is never longer than the input, so a buffer of the input's
+ * length (plus a terminator, if wanted) is always large enough.
+ */
+
+#ifndef JARVIS_TEXT_KERNEL_H
+#define JARVIS_TEXT_KERNEL_H
+
+#include <stddef.h>
+
+static inline int jk_keep(unsigned char c) {
+    return (c >= 'a' && c <= 'z') || (c >= 'A' && c <= 'Z') ||
+           (c >= '0' && c <= '9') || c == ' ';
+}
+
+static inline unsigned char jk_lower(unsigned char c) {
+    return (c >= 'A' && c <= 'Z') ? (unsigned char)(c + ('a' - 'A')) : c;
+}
+
+/* Length of the preprocessed form of input[0:len] */
+static inline size_t jk_preprocess_length(const char* input, size_t len) {
+    size_t n = 0;
+    for (size_t i = 0; i < len; i++) {
+        n += jk_keep((unsigned char)input[i]);
+    }
+    return n;
+}
+
+/* Write the preprocessed form of input[0:len] to out; returns bytes written */
+static inline size_t jk_preprocess(const char* input, size_t len, char* out) {
+    size_t j = 0;
+    for (size_t i = 0; i < len; i++) {
+        unsigned char c = (unsigned char)input[i];
+        if (jk_keep(c)) {
+            out[j++] = (char)jk_lower(c);
+        }
+    }
+    return j;
+}
+
+#endif
@@ -0,0 +1,277 @@
+"""
+TTS Audio Cache
+- Content-addressed: sha256 of (backend, voice, rate, pitch, normalized text)
+- Audio blobs on disk (<dir>/ab/abcd....mp3), total size bounded, LRU eviction
+- LRU order rebuilt from blob mtimes on startup; a hit touches the blob
+- Small in-memory hot tier for the phrases said over and over
+- Cached phrases play in milliseconds and keep working offline
+"""
+
+import asyncio
+import hashlib
+import io
+import json
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+
+from core.audio_output import get_audio_output
+from core.storage import atomic_write
+
+DEFAULT_DIR = Path(__file__).parent.parent / "tts_cache"
+STALL_TIMEOUT = 10.0            # Give up on edge-tts after this long without a chunk
+
+
+def normalize_text(text):
+    """Text as far as the synthesizer can tell: NFC, whitespace collapsed"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+class TTSCache:
+    """
+    Synthesized audio keyed by everything that changes how it sounds.
+
+        cache = TTSCache("tts_cache", max_bytes=64 * 2**20)
+        key = cache.key("edge", "en-US-EricNeural", "+10%", "+0Hz", text)
+        audio = cache.get(key)              # bytes, or None on a miss
+        cache.put(key, audio)
+
+    Texts longer than max_chars are not cached: long AI answers are
+    rarely repeated and would only push the fixed phrases out.
+    """
+
+    def __init__(self, directory=DEFAULT_DIR, max_bytes=64 * 1024 * 1024,
+                 memory_bytes=4 * 1024 * 1024, max_chars=240):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self.max_chars = max_chars
+        self._lock = threading.Lock()
+        self._index = None          # digest -> blob size, least recently used first
+        self._disk_bytes = 0
+        self._memory = OrderedDict()    # digest -> audio bytes
+        self._memory_used = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(backend, voice, rate, pitch, text):
+        material = json.dumps([backend, voice, rate, pitch, normalize_text(text)], ensure_ascii=False)
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    def accepts(self, text):
+        return 0 < len(normalize_text(text)) <= self.max_chars
+
+    def _path(self, digest):
+        return self.directory / digest[:2] / f"{digest}.mp3"
+
+    # ---- Index ----
+    def _ensure_index(self):
+        # Caller holds the lock
+        if self._index is not None:
+            return
+        blobs = []
+        if self.directory.is_dir():
+            for path in self.directory.glob("*/*.mp3"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                blobs.append((stat.st_mtime, path.stem, stat.st_size))
+        blobs.sort()
+        self._index = OrderedDict((digest, size) for _, digest, size in blobs)
+        self._disk_bytes = sum(self._index.values())
+        self._evict()
+
+    def _evict(self):
+        while self._disk_bytes > self.max_bytes and self._index:
+            digest, size = self._index.popitem(last=False)
+            self._disk_bytes -= size
+            self._drop_memory(digest)
+            self.evictions += 1
+            try:
+                os.remove(self._path(digest))
+            except OSError:
+                pass
+
+    # ---- Hot tier ----
+    def _remember(self, digest, audio):
+        if len(audio) > self.memory_bytes:
+            return
+        self._drop_memory(digest)
+        self._memory[digest] = audio
+        self._memory_used += len(audio)
+        while self._memory_used > self.memory_bytes:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_used -= len(dropped)
+
+    def _drop_memory(self, digest):
+        audio = self._memory.pop(digest, None)
+        if audio is not None:
+            self._memory_used -= len(audio)
+
+    # ---- Lookup ----
+    def get(self, digest):
+        """Cached audio for a key, or None"""
+        with self._lock:
+            self._ensure_index()
+            if digest not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(digest)
+            audio = self._memory.get(digest)
+            if audio is not None:
+                self._memory.move_to_end(digest)
+                self.memory_hits += 1
+                return audio
+        path = self._path(digest)
+        try:
+            audio = path.read_bytes()
+            os.utime(path)              # Recency survives restarts
+        except OSError:
+            with self._lock:
+                size = self._index.pop(digest, None)
+                if size is not None:
+                    self._disk_bytes -= size
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+            self._remember(digest, audio)
+        return audio
+
+    def put(self, digest, audio):
+        if not audio or len(audio) > self.max_bytes:
+            return
+        path = self._path(digest)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write(str(path), bytes(audio))
+        except OSError as e:
+            print(f"[TTS Cache] Could not store audio: {e}")
+            return
+        with self._lock:
+            self._ensure_index()
+            self._disk_bytes -= self._index.pop(digest, 0)
+            self._index[digest] = len(audio)
+            self._disk_bytes += len(audio)
+            self.stores += 1
+            self._remember(digest, bytes(audio))
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._ensure_index()
+            for digest in list(self._index):
+                try:
+                    os.remove(self._path(digest))
+                except OSError:
+                    pass
+            self._index.clear()
+            self._disk_bytes = 0
+            self._memory.clear()
+            self._memory_used = 0
+
+    def stats(self):
+        hits = self.memory_hits + self.disk_hits
+        lookups = hits + self.misses
+        return {
+            "entries": len(self._index or ()),
+            "disk_bytes": self._disk_bytes,
+            "memory_bytes": self._memory_used,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_tts_cache(directory=DEFAULT_DIR, **options):
+    """One TTSCache per directory, shared by SpeechEngine and the legacy speak()"""
+    directory = os.path.abspath(str(directory))
+    with _caches_lock:
+        cache = _caches.get(directory)
+        if cache is None:
+            cache = _caches[directory] = TTSCache(directory, **options)
+        return cache
+
+
+async def synthesize_edge(text, voice, rate="+0%", pitch="+0Hz", cache=None, stream=None):
+    """
+    mp3 bytes for text: from the cache, otherwise from edge-tts (then stored).
+    With an AudioStream, the audio is also fed to it as it arrives and the
+    stream is finished at the end (cancelled if synthesis fails or stalls).
+    """
+    digest = None
+    audio = None
+    if cache is not None and cache.accepts(text):
+        digest = cache.key("edge", voice, rate, pitch, text)
+        audio = cache.get(digest)
+
+    try:
+        if audio is not None:
+            if stream is not None:
+                await stream.feed_async(audio)
+        else:
+            import edge_tts
+            communicate = edge_tts.Communicate(text, voice=voice, rate=rate, pitch=pitch)
+            record = io.BytesIO()
+            chunks = communicate.stream()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), STALL_TIMEOUT)
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise TimeoutError(f"edge-tts stalled for {STALL_TIMEOUT:.0f}s") from None
+                if chunk["type"] != "audio":
+                    continue
+                record.write(chunk["data"])
+                if stream is not None:
+                    await stream.feed_async(chunk["data"])
+            audio = record.getvalue()
+            if digest is not None and audio:
+                await asyncio.to_thread(cache.put, digest, audio)
+    except BaseException:
+        if stream is not None:
+            stream.cancel()
+        raise
+    if stream is not None:
+        stream.finish()
+    return audio
+
+
+async def speak_edge(text, voice, rate="+0%", pitch="+0Hz", cache=None):
+    """
+    Say text with edge-tts on the shared output; True if it played out.
+    Cached audio plays at once, a miss starts playing on its first chunk
+    (streaming output) or once synthesized. get_audio_output().stop() interrupts.
+    """
+    output = get_audio_output()
+    stream = output.open_stream()
+    if stream is None:
+        audio = await synthesize_edge(text, voice, rate, pitch, cache)
+        return await output.play(audio).wait_async() if audio else False
+
+    task = asyncio.ensure_future(synthesize_edge(text, voice, rate, pitch, cache, stream))
+    try:
+        played = await stream.wait_async()
+    finally:
+        if not task.done():
+            task.cancel()
+            stream.cancel()
+        await asyncio.wait({task})
+    if not task.cancelled() and task.exception() is not None:
+        raise task.exception()
+    return played
@@ -0,0 +1,96 @@
+"""
+Utterance Normalization
+- One pass per utterance: lowercase, strip punctuation, tokenize, extract numbers
+- Uses the C c_preprocess_text kernel when compiled (pure Python otherwise)
+- Immutable result handed to the router and every handler
+- Subclasses str (the lowercased text), so existing handlers keep working
+- Router guards, fuzzy recovery and handlers read tokens/original instead of re-splitting
+"""
+
+import re
+from functools import cached_property
+
+from core.c_accel import preprocess_text
+
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?|[a-z]+")
+# Spoken forms speech recognition returns for small numbers (contact ids, list items)
+_NUMBER_WORDS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12,
+}
+
+
+class Utterance(str):
+    """
+    A normalized utterance.
+
+        u = normalize("Jarvis, set a timer for 5 minutes!")
+        u                   # "jarvis, set a timer for 5 minutes!"
+        u.original          # "Jarvis, set a timer for 5 minutes!" (case kept for arguments)
+        u.tokens            # ("jarvis", "set", "a", "timer", "for", "5", "minutes")
+        u.normalized        # "jarvis set a timer for 5 minutes"
+        u.numbers           # (5,)
+
+    The string value is the lowercased original (punctuation kept, so
+    phrases such as "what's today" still match); `tokens` is the
+    punctuation-free form. Intent argument patterns run on `original`.
+    """
+
+    def __new__(cls, text):
+        original = str(text)
+        self = super().__new__(cls, original.lower())
+        attrs = self.__dict__
+        attrs["original"] = original
+        attrs["tokens"] = tuple(preprocess_text(original).split())
+        return self
+
+    # Derived on first use (cached_property writes __dict__ directly)
+    @cached_property
+    def normalized(self):
+        return " ".join(self.tokens)
+
+    @cached_property
+    def token_set(self):
+        return frozenset(self.tokens)
+
+    @cached_property
+    def numbers(self):
+        """Numbers in order of appearance: digits ("5", "2.5") and the words zero to twelve"""
+        found = []
+        for word in _NUMBER_RE.findall(self):
+            if word[0].isdigit():
+                found.append(float(word) if "." in word else int(word))
+            elif word in _NUMBER_WORDS:
+                found.append(_NUMBER_WORDS[word])
+        return tuple(found)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Utterance is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError("Utterance is immutable")
+
+    def __reduce__(self):
+        return (Utterance, (self.original,))
+
+    @property
+    def text(self):
+        """Lowercased text as a plain str"""
+        return str(self)
+
+    def has_word(self, *words):
+        """True if any of the words appears as a whole token"""
+        return any(word in self.token_set for word in words)
+
+    def has_all(self, *words):
+        return all(word in self.token_set for word in words)
+
+    def __repr__(self):
+        return f"Utterance({self.original!r})"
+
+
+def normalize(text):
+    """Utterance for `text` (returned unchanged if it already is one)"""
+    if isinstance(text, Utterance):
+        return text
+    return Utterance(text or "")
@@ -48,6 +48,17 @@ SCRIPT_DIR = Path(__file__).parent
 CONFIG_PATH = SCRIPT_DIR / "config.json"
 DATA_PATH = SCRIPT_DIR / "assistant_data.json"
 
+from core.config import get_config_service
+CONFIG = get_config_service(CONFIG_PATH)  # Same instance the legacy core uses
+
+def get_config():
+    """Parsed config.json (empty sections if it is missing or invalid)"""
+    try:
+        return CONFIG.data
+    except Exception as e:
+        print("[config] load failed:", e)
+        return {"settings": {}, "api_keys": {}, "contacts": []}
+
 # Global state
 _is_running = True
 _is_muted = False
@@ -76,7 +87,7 @@ def lazy_import_speech():
     global _speech_engine
     if _speech_engine is None:
         from core.speech import SpeechEngine
-        _speech_engine = SpeechEngine()
+        _speech_engine = SpeechEngine(get_config()["settings"])
     return _speech_engine
 
 def lazy_import_voice():
@@ -84,7 +95,7 @@ def lazy_import_voice():
     global _voice_recognizer
     if _voice_recognizer is None:
         from core.voice import VoiceRecognizer
-        _voice_recognizer = VoiceRecognizer()
+        _voice_recognizer = VoiceRecognizer(get_config()["settings"])
     return _voice_recognizer
 
 def lazy_import_ai(model_name):
@@ -92,7 +103,7 @@ def lazy_import_ai(model_name):
     global _ai_clients
     if model_name not in _ai_clients:
         from core.ai_interface import AIInterface
-        _ai_clients[model_name] = AIInterface(model_name)
+        _ai_clients[model_name] = AIInterface(model_name, get_config())
     return _ai_clients[model_name]
 
 async def run_blocking(fn, *args, **kwargs):
@@ -167,45 +178,123 @@ async def contextual_prompts_loop():
         # run every 60 seconds in normal operation
         await asyncio.sleep(60)
 
+# Fast-path intents, checked in table order by one native keyword scan
+FAST_INTENTS = (
+    ("time", ("what time", "what's the time", "what is the time", "time is it")),
+    ("weather", ("weather",)),
+)
+_fast_table = None
+_fast_owners = ()
+
+def match_fast_intent(query):
+    """Name of the fast-path intent for query, or None"""
+    global _fast_table, _fast_owners
+    if _fast_table is None:
+        from core.c_accel import KeywordTable
+        phrases, owners = [], []
+        for name, intent_phrases in FAST_INTENTS:
+            for phrase in intent_phrases:
+                phrases.append(phrase)
+                owners.append(name)
+        _fast_owners = tuple(owners)
+        _fast_table = KeywordTable(phrases)
+    index = _fast_table.find_any(query)
+    return _fast_owners[index] if index >= 0 else None
+
+async def _fast_time(query):
+    from datetime import datetime
+    await speak(f"The current time is {datetime.now().strftime('%I:%M %p')}, Sir.")
+
+async def _fast_weather(query):
+    # try fast weather module, else fallback
+    try:
+        from modules.weather import get_weather_fast
+        weather = await get_weather_fast()
+        await speak(weather)
+        return
+    except Exception:
+        # fallback to legacy weather handler (blocking) if available
+        try:
+            if LEGACY_AVAILABLE and hasattr(legacy, "handle_weather_query"):
+                info = await run_blocking(legacy.handle_weather_query, query)
+                if isinstance(info, dict):
+                    summary = f"Weather in {info.get('city','unknown')}: {info.get('condition','n/a')}, {info.get('temperature','n/a')}°C"
+                    await speak(summary)
+                else:
+                    # if legacy already spoke or returned text
+                    await speak(str(info))
+                return
+        except Exception as e:
+            print("[weather fallback] error:", e)
+        await speak("Weather information is not available right now.")
+
+FAST_HANDLERS = {
+    "time": _fast_time,
+    "weather": _fast_weather,
+}
+
+_command_registry = None
+
+def get_command_registry():
+    """
+    Handler registry shared with the legacy core (its full command set),
+    with the async fast-path handlers registered over the blocking ones.
+    Without the legacy core only the fast-path intents are routable.
+    """
+    global _command_registry
+    if _command_registry is None:
+        if LEGACY_AVAILABLE and hasattr(legacy, "COMMAND_REGISTRY"):
+            registry = legacy.COMMAND_REGISTRY
+        else:
+            from core.intent_router import Intent, IntentRouter
+            from core.fuzzy_index import FuzzyIntentIndex
+            from core.handler_registry import HandlerRegistry
+            router = IntentRouter(Intent(name, phrases) for name, phrases in FAST_INTENTS)
+            settings = get_config().get("settings", {})
+            registry = HandlerRegistry(router, fuzzy=FuzzyIntentIndex(router),
+                                       max_workers=settings.get("handler_workers", 4),
+                                       cache_size=settings.get("intent_cache_size", 256))
+        for name, handler in FAST_HANDLERS.items():
+            registry.register(name, handler)
+        _command_registry = registry
+    return _command_registry
+
+def select_command(query):
+    """
+    Normalize and route without running anything.
+    Returns (utterance, fast intent name, registry match); both None -> AI fallback.
+    """
+    # Normalized once; the router and handlers share this object
+    from core.utterance import normalize
+    query = normalize(query)
+    
+    # Fast path for common commands
+    intent = match_fast_intent(query)
+    if intent:
+        return query, intent, None
+    
+    match, query = get_command_registry().match(query)
+    return query, None, match
+
 async def process_command_async(query):
     """Async command processor"""
     if not query:
         return
     
-    query_lower = query.lower()
-    
-    # Fast path for common commands
-    # Properly check for both words
-    if "time" in query_lower and "what" in query_lower:
-        from datetime import datetime
-        await speak(f"The current time is {datetime.now().strftime('%I:%M %p')}, Sir.")
+    query, intent, match = select_command(query)
+    if intent:
+        await FAST_HANDLERS[intent](query)
         return
     
-    if "weather" in query_lower:
-        # try fast weather module, else fallback
-        try:
-            from modules.weather import get_weather_fast
-            weather = await get_weather_fast()
-            await speak(weather)
-            return
-        except Exception:
-            # fallback to legacy weather handler (blocking) if available
-            try:
-                if LEGACY_AVAILABLE and hasattr(legacy, "handle_weather_query"):
-                    info = await run_blocking(legacy.handle_weather_query, query)
-                    if isinstance(info, dict):
-                        summary = f"Weather in {info.get('city','unknown')}: {info.get('condition','n/a')}, {info.get('temperature','n/a')}°C"
-                        await speak(summary)
-                    else:
-                        # if legacy already spoke or returned text
-                        await speak(str(info))
-                    return
-            except Exception as e:
-                print("[weather fallback] error:", e)
-            await speak("Weather information is not available right now.")
+    # Every other command: blocking handlers run on the registry's worker pool
+    try:
+        if match is not None:
+            await get_command_registry().run(match, query)
             return
-    
-    # You can add more command parsers here...
+    except Exception as e:
+        print("[dispatch] handler failed:", e)
+        await speak("That command failed, Sir.")
+        return
 
     # AI fallback
     try:
@@ -259,7 +348,9 @@ async def main_loop():
                 await asyncio.sleep(0.1)  # Reduce CPU spinning
                 continue
             
-            if "jarvis" not in command.lower():
+            from core.utterance import normalize
+            command = normalize(command)
+            if not command.has_word("jarvis"):
                 continue
             
             # Process command
@@ -286,6 +377,19 @@ async def main_loop():
         except Exception as e:
             print("[legacy shutdown] failed:", e)
 
+        if _command_registry is not None:
+            stats = _command_registry.cache_stats()
+            if stats:
+                print(f"[Router] Intent cache: {stats['hits']} hits, {stats['misses']} misses "
+                      f"({stats['hit_rate']:.0%}), {stats['evictions']} evictions")
+            _command_registry.shutdown(wait=False)
+
+        if _speech_engine is not None:
+            stats = _speech_engine.cache_stats()
+            if stats:
+                print(f"[Speech] TTS cache: {stats['memory_hits'] + stats['disk_hits']} hits, "
+                      f"{stats['misses']} misses ({stats['hit_rate']:.0%}), {stats['entries']} phrases")
+
         await speak("Jarvis shutting down.")
 
 def signal_handler(sig, frame):
@@ -0,0 +1,40 @@
+import asyncio
+
+from core.handler_registry import HandlerRegistry
+from core.intent_router import Intent, IntentRouter
+
+
+def test_blocking_handlers_are_wrapped_with_their_intent():
+    seen = []
+
+    def wrap(func, query, intent):
+        seen.append((intent.name, intent.prompts))
+        return func(query)
+
+    router = IntentRouter([
+        Intent("time", ["what time"], lambda q: "noon"),
+        Intent("take_note", ["take a note"], lambda q: "noted", prompts=True),
+    ])
+    registry = HandlerRegistry(router, wrap=wrap)
+    try:
+        assert asyncio.run(registry.dispatch("what time is it"))[1] == "noon"
+        assert asyncio.run(registry.dispatch("take a note"))[1] == "noted"
+    finally:
+        registry.shutdown()
+    assert seen == [("time", False), ("take_note", True)]
+
+
+def test_cached_decisions_follow_guard_state():
+    state = {"app_manager": None}
+    router = IntentRouter([
+        Intent("open_website", ["open"], priority=1, guard=lambda q: state["app_manager"] is None),
+        Intent("app_command", ["open"], guard=lambda q: state["app_manager"] is not None),
+    ])
+    registry = HandlerRegistry(router, guard_state=lambda: state["app_manager"] is not None)
+    assert registry.match("open notepad")[0].name == "open_website"
+    assert registry.match("open notepad")[0].name == "open_website"
+    assert registry.cache.stats()["hits"] == 1
+
+    state["app_manager"] = object()
+    assert registry.match("open notepad")[0].name == "app_command"
+    assert registry.cache.stats()["invalidations"] == 1
@@ -0,0 +1,19 @@
+import pytest
+
+from core.name_matcher import NameMatcher
+
+# KNOWN_SITES in Jarvis_v1.7r_core.py
+SITES = ["youtube", "wikipedia", "gmail", "calendar", "github", "stack overflow", "google", "reddit"]
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_site_lookup_is_as_lenient_as_difflib(use_numpy):
+    matcher = NameMatcher(use_numpy=use_numpy)
+    matcher.sync({name: name for name in SITES})
+    assert matcher.closest("utube") == "youtube"
+    assert matcher.closest("you tube") == "youtube"
+    assert matcher.closest("gmial") == "gmail"
+    assert matcher.closest("wiki") == "wikipedia"
+    assert matcher.closest("stackoverflow") == "stack overflow"
+    for unknown in ("facebook", "netflix", "twitter", "amazon", "weather"):
+        assert matcher.closest(unknown) is None, unknown
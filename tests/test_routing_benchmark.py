@@ -0,0 +1,28 @@
+import json
+
+from core.routing_benchmark import AI_FALLBACK, load_corpus, run_target
+
+
+def _stages(routes):
+    return (lambda text: text, lambda text: routes.get(text), lambda found: found or AI_FALLBACK)
+
+
+def test_known_mismatches_are_reported_apart(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    records = [
+        {"utterance": "what time is it", "intent": "time"},
+        {"utterance": "translate hello", "intent": "ai", "known_mismatch": "trigger word wins"},
+        {"utterance": "weather today", "intent": "weather"},
+        {"utterance": "hello there", "intent": "hello", "known_mismatch": "was fuzzy"},
+    ]
+    path.write_text("\n".join(json.dumps(r) for r in records) + "\n")
+    corpus = load_corpus(path)
+    routes = {"what time is it": "time", "translate hello": "hello", "hello there": "hello"}
+
+    result = run_target(_stages(routes), corpus, repeat=1)
+    assert result["mismatches"] == [{"utterance": "weather today", "expected": "weather", "got": AI_FALLBACK}]
+    assert [m["utterance"] for m in result["known_mismatches"]] == ["translate hello"]
+    assert result["known_mismatches"][0]["reason"] == "trigger word wins"
+    assert [m["utterance"] for m in result["resolved_known_mismatches"]] == ["hello there"]
+    assert result["accuracy"] == 0.5
+    assert result["accuracy_excluding_known"] == round(2 / 3, 4)
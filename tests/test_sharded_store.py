@@ -0,0 +1,52 @@
+import glob
+import os
+
+from core.sharded_store import ShardedStore
+from core.sqlite_store import SQLiteStore
+
+
+def _sharded_install(data_dir):
+    store = ShardedStore(data_dir)
+    store.save({
+        "tasks": [{"id": "1", "description": "buy milk"}],
+        "notes": [{"id": "n1", "title": "idea", "content": "solar kettle"}],
+        "habits": [{"name": "Read", "streak": 2}],
+        "schedule": {"2025-01-01": {"plans": ["gym"]}},
+        "reminders": [{"text": "call mom"}],
+    })
+    store.flush()
+
+
+def test_switching_to_sqlite_imports_shard_files(tmp_path):
+    data_dir = tmp_path / "assistant_data"
+    _sharded_install(data_dir)
+
+    backend = SQLiteStore(tmp_path / "assistant_data.db")
+    store = ShardedStore(data_dir, collection_backend=backend)
+    doc = store.load()
+    assert doc["tasks"] == [{"id": "1", "description": "buy milk"}]
+    assert doc["habits"] == [{"name": "Read", "streak": 2}]
+    assert doc["schedule"] == {"2025-01-01": {"plans": ["gym"]}}
+    assert doc["reminders"] == [{"text": "call mom"}]
+
+    # The next save must not write empty collections over the imported ones
+    doc["reminders"].append({"text": "water plants"})
+    store.save(doc)
+    store.flush()
+    assert backend.load_collection("notes") == [{"id": "n1", "title": "idea", "content": "solar kettle"}]
+    assert not os.path.exists(data_dir / "tasks.json")
+    assert os.path.exists(data_dir / "tasks.json.migrated")
+
+
+def test_database_copy_wins_and_shard_copy_is_kept(tmp_path):
+    data_dir = tmp_path / "assistant_data"
+    _sharded_install(data_dir)
+    backend = SQLiteStore(tmp_path / "assistant_data.db")
+    backend.import_collections({"tasks": [{"id": "9", "description": "from the database"}]})
+
+    doc = ShardedStore(data_dir, collection_backend=backend).load()
+    assert doc["tasks"] == [{"id": "9", "description": "from the database"}]
+    # Collections only the shards had are still imported
+    assert doc["habits"] == [{"name": "Read", "streak": 2}]
+    assert glob.glob(str(data_dir / "core.json.tasks-*.json"))
+    assert os.path.exists(data_dir / "tasks.json.migrated")
@@ -0,0 +1,139 @@
+import json
+import os
+
+from core.sharded_store import ShardedStore
+from core.sqlite_store import SQLiteStore, migrate_json_to_sqlite
+
+LEGACY = {
+    "tasks": [{"id": "1", "description": "buy milk"}, {"id": "2", "description": "file taxes"}],
+    "notes": [{"id": "n1", "title": "idea", "content": "solar kettle"}],
+    "habits": [{"name": "Read", "streak": 2}],
+    "schedule": {"2025-01-01": {"plans": ["gym"]}},
+    "reminders": [],
+}
+
+
+def _write_legacy(tmp_path):
+    json_path = tmp_path / "assistant_data.json"
+    json_path.write_text(json.dumps(LEGACY))
+    return json_path
+
+
+def test_migrate_sharded_tree(tmp_path):
+    json_path = _write_legacy(tmp_path)
+    # First run on the default layout: assistant_data.json is split and renamed
+    ShardedStore(tmp_path / "assistant_data", legacy_path=json_path).load()
+    assert not os.path.exists(json_path)
+
+    counts = migrate_json_to_sqlite(json_path, tmp_path / "assistant_data.db")
+    assert counts == {"tasks": 2, "notes": 1, "habits": 1, "schedule": 1}
+    backend = SQLiteStore(tmp_path / "assistant_data.db")
+    assert backend.load_collection("tasks") == LEGACY["tasks"]
+    assert backend.schedule_day("2025-01-01") == {"plans": ["gym"]}
+
+
+def test_migrate_from_split_copy(tmp_path):
+    json_path = _write_legacy(tmp_path)
+    os.replace(json_path, str(json_path) + ".migrated")
+
+    counts = migrate_json_to_sqlite(json_path, tmp_path / "assistant_data.db")
+    assert counts == {"tasks": 2, "notes": 1, "habits": 1, "schedule": 1}
+    # The copy is read, never rewritten
+    assert json.loads(open(str(json_path) + ".migrated").read()) == LEGACY
+
+
+# ---- Indexed queries agree with the JSON backend ----
+NOTES = [
+    {"id": "1", "title": "Project ideas", "content": "solar kettle and wind charger", "category": "ideas"},
+    {"id": "2", "title": "Meeting", "content": "budget review with the solar team", "category": "work"},
+    {"id": "3", "title": "Groceries", "content": "milk, bread, kettle descaler"},
+    {"id": "4", "title": "Old note", "note": "wind chimes for the porch", "category": "Ideas"},
+    {"id": "5", "title": "snake_case names", "content": "rename solar_panel module", "category": "work"},
+]
+TASKS = [
+    {"id": "1", "description": "a", "priority": "low", "deadline": "2025-01-03", "completed": False},
+    {"id": "2", "description": "b", "priority": "high", "deadline": "2025-02-01", "completed": False},
+    {"id": "3", "description": "c", "priority": "high", "deadline": None, "completed": True},
+    {"id": "4", "description": "d", "deadline": "2024-12-30", "completed": False},
+    {"id": "5", "description": "e", "priority": "medium", "completed": False},
+]
+
+
+def _backend(tmp_path):
+    backend = SQLiteStore(tmp_path / "assistant_data.db")
+    backend.import_collections({
+        "notes": NOTES,
+        "tasks": TASKS,
+        "habits": [{"name": "Read"}, {"name": "Stretch"}, {"name": "Journal"}],
+        "schedule": {"2025-01-01": {"plans": ["gym"]}, "2025-01-02": {"plans": []}},
+    })
+    return backend
+
+
+def test_search_notes_matches_note_index(tmp_path):
+    from core.note_index import NoteIndex
+
+    backend = _backend(tmp_path)
+    index = NoteIndex(tmp_path / "notes.index")
+    index.rebuild(NOTES)
+    queries = [
+        ("solar", None), ("sol", None), ("kettle", None), ("wind", None),
+        ('"solar team"', None), ('"team solar"', None), ("solar kettle", None),
+        ("wind", "ideas"), ("category:work", None), ("category:general", None),
+        ("snake_case", None), ("solar_panel", None), ("missing", None), ("", None),
+    ]
+    for query, category in queries:
+        expected = sorted(note["id"] for note in index.search(query, category=category))
+        found = sorted(note["id"] for note in backend.search_notes(query, category))
+        assert found == expected, query
+
+
+def test_search_notes_follows_edits(tmp_path):
+    backend = _backend(tmp_path)
+    backend.apply([
+        {"op": "set", "path": ["notes", 0], "value": dict(NOTES[0], content="tidal turbine")},
+        {"op": "remove", "path": ["notes"], "indices": [1]},
+    ])
+    assert [note["id"] for note in backend.search_notes("solar")] == ["5"]
+    assert [note["id"] for note in backend.search_notes("tidal")] == ["1"]
+
+
+def test_task_queries_match_list_scans(tmp_path):
+    backend = _backend(tmp_path)
+    order = {"high": 0, "medium": 1, "low": 2}
+
+    def listed(filter_type, priority):
+        tasks = [t for t in TASKS if filter_type == "all" or bool(t.get("completed")) == (filter_type == "completed")]
+        tasks = [t for t in tasks if not priority or t.get("priority") == priority]
+        return sorted(tasks, key=lambda t: (order.get(t.get("priority", "medium"), 1), t.get("deadline") or "9999-12-31"))
+
+    for filter_type in ("active", "completed", "all"):
+        for priority in (None, "high", "low"):
+            assert backend.query_tasks(filter_type, priority) == listed(filter_type, priority)
+    overdue = [t for t in TASKS if not t.get("completed") and t.get("deadline") and t["deadline"] < "2025-01-05"]
+    assert backend.overdue_tasks("2025-01-05") == overdue
+
+
+def test_habit_and_schedule_lookups_match(tmp_path):
+    backend = _backend(tmp_path)
+    habits = backend.load_collection("habits")
+    for name in ("read", "JOURNAL", "Stretch", "walk"):
+        expected = next((i for i, h in enumerate(habits) if h["name"].lower() == name.lower()), None)
+        assert backend.habit_position(name) == expected
+    schedule = backend.load_collection("schedule")
+    for date_key in ("2025-01-01", "2025-01-02", "2025-01-03"):
+        assert backend.schedule_day(date_key) == schedule.get(date_key)
+
+
+def test_full_text_table_is_backfilled(tmp_path):
+    import sqlite3
+
+    from core.sqlite_store import SCHEMA
+
+    # Database written before notes_fts existed
+    conn = sqlite3.connect(tmp_path / "assistant_data.db")
+    conn.executescript(SCHEMA)
+    conn.execute("INSERT INTO notes (doc) VALUES (?)", (json.dumps(NOTES[1]),))
+    conn.commit()
+    conn.close()
+    assert [note["id"] for note in SQLiteStore(tmp_path / "assistant_data.db").search_notes("budget")] == ["2"]
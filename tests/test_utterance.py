@@ -0,0 +1,13 @@
+import pickle
+
+from core.utterance import normalize
+
+
+def test_numbers_are_extracted_once():
+    u = normalize("Jarvis, set a timer for 5 minutes!")
+    assert u.numbers == (5,)
+    assert normalize("send message to contact twelve").numbers == (12,)
+    assert normalize("remove item 2.5 then 3").numbers == (2.5, 3)
+    # Whole words only: "someone" and "often" are not numbers
+    assert normalize("someone often calls").numbers == ()
+    assert pickle.loads(pickle.dumps(u)).numbers == (5,)